@@ -10,51 +10,112 @@ bl_info = {
 }
 
 import bpy
+# Imported eagerly: the property groups, their update callbacks and the file handlers registered below live
+# in this module and have to exist at registration. Its heavy dependencies (NumPy, snapshots, pointcache,
+# deform) are the part that is deferred until first use.
 from .lattice_manager_v01 import (
     LatticeManagerProperties,
     ManagedObject,
+    LatticeObjectRef,
+    LatticeSnapshot,
     LatticeData,
+    LatticeRegistry,
+    LatticeStrengthValue,
+    LatticeStrengthPreset,
     OBJECT_PT_LatticeManager,
+    OBJECT_PT_LatticeManagerDebug,
+    LATTICE_UL_lattices,
     OBJECT_OT_LatticeManageSelected,
     OBJECT_OT_LatticeUnmanageAll,
     OBJECT_OT_LatticeAddToAll,
     OBJECT_OT_LatticeAddToSelected,
+    OBJECT_OT_LatticeAddByCluster,
+    OBJECT_OT_LatticePresetSave,
+    OBJECT_OT_LatticePresetApply,
+    OBJECT_OT_LatticePresetKeyframe,
+    OBJECT_OT_LatticePresetRemove,
+    OBJECT_OT_LatticeSnapshotTake,
+    OBJECT_OT_LatticeSnapshotRestore,
+    OBJECT_OT_LatticeSnapshotRemove,
+    OBJECT_OT_LatticeRepairRegistry,
+    OBJECT_OT_LatticeProfileClear,
+    OBJECT_OT_LatticeProfileExport,
     OBJECT_OT_ToggleLatticeVisibility,
+    OBJECT_OT_LatticePreview,
+    OBJECT_OT_LatticeBakeCache,
+    OBJECT_OT_LatticeCacheToggle,
+    OBJECT_OT_LatticeCacheFree,
     OBJECT_OT_SelectObjectsWithModifier,
     OBJECT_OT_DeselectObjectsWithModifier,
     OBJECT_OT_ApplyLatticeModifier,
+    OBJECT_OT_ApplyAllLatticeModifiers,
+    OBJECT_OT_DeleteAllLatticeModifiers,
     OBJECT_OT_DeleteLatticeModifier,
+    register_handlers,
+    unregister_handlers,
 )
 
-# Ensure ManagedObject includes lattice_modifiers property
-class ManagedObject(bpy.types.PropertyGroup):
-    object_name: bpy.props.StringProperty()
-    lattice_modifiers: bpy.props.CollectionProperty(type=bpy.types.PropertyGroup)
-
 classes = (
+    LatticeObjectRef,
+    LatticeSnapshot,
     LatticeData,
+    LatticeRegistry,
+    LatticeStrengthValue,
+    LatticeStrengthPreset,
     LatticeManagerProperties,
     ManagedObject,
-    OBJECT_PT_LatticeManager,
     OBJECT_OT_LatticeManageSelected,
     OBJECT_OT_LatticeUnmanageAll,
     OBJECT_OT_LatticeAddToAll,
     OBJECT_OT_LatticeAddToSelected,
+    OBJECT_OT_LatticeAddByCluster,
+    OBJECT_OT_LatticePresetSave,
+    OBJECT_OT_LatticePresetApply,
+    OBJECT_OT_LatticePresetKeyframe,
+    OBJECT_OT_LatticePresetRemove,
+    OBJECT_OT_LatticeSnapshotTake,
+    OBJECT_OT_LatticeSnapshotRestore,
+    OBJECT_OT_LatticeSnapshotRemove,
+    OBJECT_OT_LatticeRepairRegistry,
+    OBJECT_OT_LatticeProfileClear,
+    OBJECT_OT_LatticeProfileExport,
     OBJECT_OT_ToggleLatticeVisibility,
+    OBJECT_OT_LatticePreview,
+    OBJECT_OT_LatticeBakeCache,
+    OBJECT_OT_LatticeCacheToggle,
+    OBJECT_OT_LatticeCacheFree,
     OBJECT_OT_SelectObjectsWithModifier,
     OBJECT_OT_DeselectObjectsWithModifier,
     OBJECT_OT_ApplyLatticeModifier,
+    OBJECT_OT_ApplyAllLatticeModifiers,
+    OBJECT_OT_DeleteAllLatticeModifiers,
     OBJECT_OT_DeleteLatticeModifier,
 )
 
+# Interface classes, not registered when Blender runs in the background
+ui_classes = (
+    LATTICE_UL_lattices,
+    OBJECT_PT_LatticeManager,
+    OBJECT_PT_LatticeManagerDebug,
+)
+
+def registered_classes():
+    if bpy.app.background:
+        return classes
+    return classes + ui_classes
+
 def register():
-    for cls in classes:
+    for cls in registered_classes():
         bpy.utils.register_class(cls)
     bpy.types.Scene.lattice_manager_props = bpy.props.PointerProperty(type=LatticeManagerProperties)
     bpy.types.Scene.managed_objects = bpy.props.CollectionProperty(type=ManagedObject)
+    bpy.types.Object.lattice_registry = bpy.props.PointerProperty(type=LatticeRegistry)
+    register_handlers()
 
 def unregister():
-    for cls in reversed(classes):
+    unregister_handlers()
+    for cls in reversed(registered_classes()):
         bpy.utils.unregister_class(cls)
     del bpy.types.Scene.lattice_manager_props
-    del bpy.types.Scene.managed_objects
\ No newline at end of file
+    del bpy.types.Scene.managed_objects
+    del bpy.types.Object.lattice_registry
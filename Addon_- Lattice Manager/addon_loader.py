@@ -0,0 +1,32 @@
+""" Loads the addon from its directory as the "lattice_manager" package.
+
+The addon directory is not a valid package name, and Blender does not import the addon for scripts run
+with --python, so batch.py, benchmark.py and the test suite import it from its path under the name an
+installed copy uses. Nothing here imports bpy or the addon itself, so this module can be loaded on its own.
+"""
+
+import importlib.util
+import os
+import sys
+
+PACKAGE_NAME = "lattice_manager"
+
+ADDON_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_addon(register=True):
+    """ Imports a fresh copy of the addon package and registers it unless register is False.
+
+    Modules of an earlier load are dropped first, so the package and its submodules start with new
+    module state.
+    """
+    for name in [name for name in sys.modules if name == PACKAGE_NAME or name.startswith(PACKAGE_NAME + ".")]:
+        del sys.modules[name]
+    spec = importlib.util.spec_from_file_location(
+        PACKAGE_NAME, os.path.join(ADDON_DIRECTORY, "__init__.py"), submodule_search_locations=[ADDON_DIRECTORY])
+    package = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = package
+    spec.loader.exec_module(package)
+    if register:
+        package.register()
+    return package
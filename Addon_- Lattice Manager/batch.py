@@ -0,0 +1,190 @@
+""" Headless lattice operations over many .blend files.
+
+Driver, run with any Python 3; processes the files with a pool of background Blender instances and
+writes a per-file manifest:
+
+    python batch.py --blender /path/to/blender --jobs 4 --operation add --manifest result.json assets/*.blend
+
+Worker, run inside Blender on one file (this is what the driver launches):
+
+    blender -b asset.blend --factory-startup --python batch.py -- --worker --operation apply --lattice "Lattice 1"
+
+With the addon installed the same functions are available to --python-expr, e.g.
+add_lattice_to_objects(), add_lattices(), apply_lattice_modifiers_batch() and delete_lattice_modifiers_batch()
+in lattice_manager_v01.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Prefix of the stdout line carrying a worker's result back to the driver
+RESULT_MARKER = "LATTICE_MANAGER_RESULT "
+
+OPERATIONS = ("add", "apply", "delete")
+
+
+# Worker (inside Blender)
+#################################################
+
+def run_worker(args):
+    import bpy
+
+    # Blender does not put the directory of a --python script on sys.path
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import addon_loader
+    lm = addon_loader.load_addon().lattice_manager_v01
+    context = bpy.context
+    objects = target_objects(context.scene, args.collection, args.objects)
+    result = {"operation": args.operation, "objects": len(objects)}
+
+    if args.operation == "add":
+        if objects:
+            lattice = lm.add_lattice_to_objects(context, objects)
+            result["lattice"] = lattice.name
+    else:
+        # Which objects carry each lattice is read before the stacks change, one row per object
+        rows = lm.lattice_modifier_table(objects, args.lattice)
+        users = {}
+        for obj, lattice_mods, _ in rows:
+            for mod in lattice_mods:
+                users.setdefault(mod.name, []).append(obj)
+        if args.operation == "apply":
+            # Every lattice of an object is applied in the same evaluation, see apply_lattice_modifiers_batch()
+            failed = {obj.as_pointer() for obj in lm.apply_lattice_modifier_rows(context, rows)[1]}
+        else:
+            lm.delete_lattice_modifiers_batch(objects, args.lattice)
+        result["lattices"] = {}
+        for lattice_name in args.lattice or sorted(users):
+            lattice_users = users.get(lattice_name, [])
+            if args.operation == "apply":
+                result["lattices"][lattice_name] = {
+                    "applied": sum(obj.as_pointer() not in failed for obj in lattice_users),
+                    "failed": [obj.name for obj in lattice_users if obj.as_pointer() in failed],
+                }
+            else:
+                result["lattices"][lattice_name] = {"removed": len(lattice_users)}
+
+    if args.output_dir:
+        filepath = os.path.join(args.output_dir, os.path.basename(bpy.data.filepath))
+        bpy.ops.wm.save_as_mainfile(filepath=filepath, copy=True)
+        result["saved"] = filepath
+    elif not args.no_save:
+        bpy.ops.wm.save_mainfile()
+        result["saved"] = bpy.data.filepath
+
+    print(RESULT_MARKER + json.dumps(result), flush=True)
+    return result
+
+
+def target_objects(scene, collection_name=None, object_names=None):
+    """ Returns the mesh objects to process: the named objects, a collection's objects or the whole scene. """
+    import bpy
+
+    if object_names:
+        objects = [bpy.data.objects.get(name) for name in object_names]
+    elif collection_name:
+        collection = bpy.data.collections.get(collection_name)
+        objects = list(collection.all_objects) if collection else []
+    else:
+        objects = list(scene.objects)
+    return [obj for obj in objects if obj is not None and obj.type == 'MESH']
+
+
+# Driver (outside Blender)
+#################################################
+
+def worker_command(blender, filepath, args):
+    command = [blender, "--background", "--factory-startup", filepath,
+               "--python", os.path.abspath(__file__), "--", "--worker", "--operation", args.operation]
+    for lattice_name in args.lattice or ():
+        command += ["--lattice", lattice_name]
+    if args.collection:
+        command += ["--collection", args.collection]
+    for object_name in args.objects or ():
+        command += ["--objects", object_name]
+    if args.output_dir:
+        command += ["--output-dir", os.path.abspath(args.output_dir)]
+    if args.no_save:
+        command.append("--no-save")
+    return command
+
+
+def process_file(filepath, args):
+    """ Runs one worker and returns its manifest entry. """
+    entry = {"file": filepath, "status": "failed"}
+    start = time.perf_counter()
+    try:
+        completed = subprocess.run(worker_command(args.blender, filepath, args), capture_output=True, text=True,
+                                   timeout=args.timeout)
+    except subprocess.TimeoutExpired:
+        entry["error"] = f"timed out after {args.timeout} s"
+    except OSError as e:
+        entry["error"] = str(e)
+    else:
+        entry["returncode"] = completed.returncode
+        for line in completed.stdout.splitlines():
+            if line.startswith(RESULT_MARKER):
+                entry["result"] = json.loads(line[len(RESULT_MARKER):])
+        if "result" in entry and completed.returncode == 0:
+            entry["status"] = "ok"
+        else:
+            entry["error"] = (completed.stderr or completed.stdout)[-2000:]
+    entry["duration"] = time.perf_counter() - start
+    return entry
+
+
+def run_driver(args):
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+    started = time.strftime("%Y-%m-%dT%H:%M:%S")
+    with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+        entries = list(pool.map(lambda filepath: process_file(filepath, args), args.files))
+
+    manifest = {
+        "started": started,
+        "blender": args.blender,
+        "operation": args.operation,
+        "succeeded": sum(entry["status"] == "ok" for entry in entries),
+        "failed": sum(entry["status"] != "ok" for entry in entries),
+        "files": entries,
+    }
+    with open(args.manifest, "w") as f:
+        json.dump(manifest, f, indent=2)
+    print(f"{manifest['succeeded']} of {len(entries)} files processed, manifest written to {args.manifest}")
+    return manifest
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Run Lattice Manager operations on .blend files.")
+    parser.add_argument("--operation", choices=OPERATIONS, required=True)
+    parser.add_argument("--lattice", action="append", help="lattice modifier name to apply/delete, repeatable; "
+                                                          "defaults to every lattice modifier on the targets")
+    parser.add_argument("--collection", help="only process the mesh objects in this collection")
+    parser.add_argument("--objects", action="append", help="only process this object, repeatable")
+    parser.add_argument("--output-dir", help="save results here instead of overwriting the input files")
+    parser.add_argument("--no-save", action="store_true", help="do not save the files")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--blender", default="blender", help="Blender executable used by the driver")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="parallel Blender instances")
+    parser.add_argument("--timeout", type=float, default=3600, help="seconds before a worker is killed")
+    parser.add_argument("--manifest", default="lattice_batch_manifest.json", help="result manifest path")
+    parser.add_argument("files", nargs="*", help=".blend files to process")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else sys.argv[1:]
+    args = parse_args(argv)
+    if args.worker:
+        return run_worker(args)
+    return run_driver(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+""" Benchmarks for the addon's hot paths, run in headless Blender:
+
+    blender --background --factory-startup --python benchmark.py -- --objects 2000 --lattices 40 --output run.json
+
+A synthetic scene is generated in the current file, so run it on an empty or factory startup file.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+import bpy
+
+if __package__:
+    from . import lattice_manager_v01 as lm
+else:
+    lm = None
+
+
+def build_scene(context, object_count, modifiers_per_object=1, lattice_count=1, shared_mesh=False, spacing=3.0):
+    """ Fills the scene with managed cubes, lattice_count lattices and a lattice modifier per object.
+
+    Each object gets one lattice modifier (assigned round-robin) followed by modifiers_per_object - 1
+    inert Displace modifiers, so modifier stacks have a realistic length.
+    """
+    clear_scene(context)
+    scene = context.scene
+    props = scene.lattice_manager_props
+
+    base_mesh = bpy.data.meshes.new("Bench Cube")
+    base_mesh.from_pydata(
+        [(x, y, z) for x in (-1, 1) for y in (-1, 1) for z in (-1, 1)],
+        [],
+        [(0, 1, 3, 2), (4, 6, 7, 5), (0, 4, 5, 1), (2, 3, 7, 6), (0, 2, 6, 4), (1, 5, 7, 3)],
+    )
+
+    collection = bpy.data.collections.new("Bench Objects")
+    scene.collection.children.link(collection)
+    lattices = []
+    for i in range(lattice_count):
+        lattice = bpy.data.objects.new(f"Bench Lattice {i}", bpy.data.lattices.new(f"Bench Lattice {i}"))
+        collection.objects.link(lattice)
+        lattices.append(lattice)
+
+    side = max(1, round(object_count ** (1 / 3)))
+    objects = []
+    for i in range(object_count):
+        mesh = base_mesh if shared_mesh else base_mesh.copy()
+        obj = bpy.data.objects.new(f"Bench Object {i}", mesh)
+        obj.location = (i % side * spacing, i // side % side * spacing, i // (side * side) * spacing)
+        collection.objects.link(obj)
+        lattice = lattices[i % lattice_count]
+        mod = obj.modifiers.new(name=lattice.name, type='LATTICE')
+        mod.object = lattice
+        mod.strength = 0.0
+        for j in range(modifiers_per_object - 1):
+            filler = obj.modifiers.new(name=f"Displace {j}", type='DISPLACE')
+            filler.strength = 0.0
+        objects.append(obj)
+
+    for obj in objects:
+        item = scene.managed_objects.add()
+        item.object = obj
+        item.object_name = obj.name
+    props.is_managing = True
+    lm.update_lattice_data(context)
+    return objects, lattices
+
+
+def clear_scene(context):
+    scene = context.scene
+    scene.managed_objects.clear()
+    scene.lattice_manager_props.lattice_data.clear()
+    for obj in list(bpy.data.objects):
+        bpy.data.objects.remove(obj)
+    for datablocks in (bpy.data.meshes, bpy.data.lattices):
+        for datablock in list(datablocks):
+            datablocks.remove(datablock)
+    for collection in list(bpy.data.collections):
+        bpy.data.collections.remove(collection)
+    lm.invalidate_lattice_index()
+
+
+def measure(function, repeat, setup=None):
+    """ Calls function repeat times and returns wall-time statistics in seconds. """
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return {
+        "runs": repeat,
+        "min": min(times),
+        "mean": statistics.fmean(times),
+        "max": max(times),
+    }
+
+
+def run(context, object_count, modifiers_per_object, lattice_count, repeat, shared_mesh=False):
+    """ Builds a synthetic scene and times every hot path on it, returning the result dictionary. """
+    objects, lattices = build_scene(context, object_count, modifiers_per_object, lattice_count, shared_mesh)
+    props = context.scene.lattice_manager_props
+    lattice_name = lattices[0].name
+    results = {}
+
+    results["gather_lattice_modifiers (cold)"] = measure(
+        lambda: lm.gather_lattice_modifiers(context), repeat, setup=lm.invalidate_lattice_index)
+    results["gather_lattice_modifiers (cached)"] = measure(lambda: lm.gather_lattice_modifiers(context), repeat)
+    results["update_lattice_data"] = measure(lambda: lm.update_lattice_data(context), repeat)
+    strengths = iter([i / (repeat + 1) for i in range(1, repeat + 1)])
+    results["update_strength"] = measure(
+        lambda: lm.update_strength(context, lattice_name, next(strengths), immediate=True), repeat)
+    results["calculate_bounding_box"] = measure(lambda: lm.calculate_bounding_box(objects), repeat)
+    results["calculate_bounding_box (exact)"] = measure(
+        lambda: lm.calculate_bounding_box(objects, exact=True), repeat)
+
+    # The remaining paths change the scene, so each is timed once on a fresh copy of it
+    props.use_existing_lattice = False
+    results["add_lattice"] = measure(lambda: lm.add_lattice(context, manage_all=True), 1)
+
+    objects, lattices = build_scene(context, object_count, modifiers_per_object, lattice_count, shared_mesh)
+    results["apply_lattice_modifier"] = measure(
+        lambda: bpy.ops.object.apply_lattice_modifier(modifier_name=lattices[0].name), 1)
+    results["delete_lattice_modifier"] = measure(
+        lambda: bpy.ops.object.delete_lattice_modifier(modifier_name=lattices[-1].name), 1)
+
+    clear_scene(context)
+    return {
+        "blender": bpy.app.version_string,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "parameters": {
+            "objects": object_count,
+            "modifiers_per_object": modifiers_per_object,
+            "lattices": lattice_count,
+            "repeat": repeat,
+            "shared_mesh": shared_mesh,
+        },
+        "results": results,
+    }
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Benchmark the Lattice Manager hot paths.")
+    parser.add_argument("--objects", type=int, default=1000, help="number of managed mesh objects")
+    parser.add_argument("--modifiers", type=int, default=1, help="modifiers per object, one of them a lattice")
+    parser.add_argument("--lattices", type=int, default=10, help="number of lattices")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per non-destructive measurement")
+    parser.add_argument("--shared-mesh", action="store_true", help="let all objects share one mesh")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    args = parse_args(argv)
+    result = run(bpy.context, args.objects, args.modifiers, max(1, args.lattices), args.repeat, args.shared_mesh)
+
+    for name, timing in result["results"].items():
+        print(f"{name:<36} mean {timing['mean'] * 1000:10.3f} ms   min {timing['min'] * 1000:10.3f} ms")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"Results written to {args.output}")
+    return result
+
+
+if __name__ == "__main__":
+    # Blender does not put the directory of a --python script on sys.path
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import addon_loader
+    lm = addon_loader.load_addon().lattice_manager_v01
+    main()
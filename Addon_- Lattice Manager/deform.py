@@ -0,0 +1,177 @@
+""" NumPy implementation of Blender's lattice deformation.
+
+Mirrors BKE_lattice_deform_data_create() / BKE_lattice_deform_data_eval_co(), so the result of a
+LATTICE modifier can be computed for previews or checked headlessly without evaluating the depsgraph.
+Nothing here imports bpy: the functions taking Blender data only use foreach_get and plain attributes,
+and everything else works on arrays.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+# Tension Blender's key_curve_position_weights() uses for the cardinal interpolations
+CARDINAL_TENSION = {
+    'KEY_CARDINAL': 0.71,
+    'KEY_CATMULL_ROM': 0.5,
+}
+
+DEFAULT_INTERPOLATION = ('KEY_BSPLINE', 'KEY_BSPLINE', 'KEY_BSPLINE')
+
+# Everything the deformation depends on, in the lattice object's terms. points are the deformed point
+# positions (co_deform) in lattice space with u varying fastest, point_weights the lattice's own vertex
+# group or None.
+LatticeState = namedtuple("LatticeState", "matrix resolution points interpolation point_weights")
+
+
+def key_curve_position_weights(t, interpolation):
+    """ Returns the (..., 4) weights of the points at offsets -1, 0, 1 and 2 for fractions t. """
+    t = np.asarray(t, dtype=np.float64)
+    if interpolation == 'KEY_LINEAR':
+        zeros = np.zeros_like(t)
+        return np.stack([zeros, 1.0 - t, t, zeros], axis=-1)
+
+    t2 = t * t
+    t3 = t2 * t
+    if interpolation == 'KEY_BSPLINE':
+        return np.stack([
+            -t3 / 6 + 0.5 * t2 - 0.5 * t + 1 / 6,
+            0.5 * t3 - t2 + 2 / 3,
+            -0.5 * t3 + 0.5 * t2 + 0.5 * t + 1 / 6,
+            t3 / 6,
+        ], axis=-1)
+
+    fc = CARDINAL_TENSION[interpolation]
+    return np.stack([
+        -fc * t3 + 2 * fc * t2 - fc * t,
+        (2 - fc) * t3 + (fc - 3) * t2 + 1,
+        (fc - 2) * t3 + (3 - 2 * fc) * t2 + fc * t,
+        fc * t3 - fc * t2,
+    ], axis=-1)
+
+
+def grid_positions(resolution):
+    """ Returns the (P, 3) rest positions of a lattice's points, the unit cube centred on the origin. """
+    axes = [np.linspace(-0.5, 0.5, count) if count > 1 else np.zeros(1) for count in resolution]
+    w, v, u = np.meshgrid(axes[2], axes[1], axes[0], indexing='ij')
+    return np.stack([u.ravel(), v.ravel(), w.ravel()], axis=1)
+
+
+def _axis_weights(coords, count, interpolation):
+    """ Returns the (N, 4) point indices and weights along one axis, indices clamped to the lattice like
+    Blender does for coordinates outside it. """
+    if count < 2:
+        weights = np.zeros((len(coords), 4))
+        weights[:, 1] = 1.0
+        return np.zeros((len(coords), 4), dtype=np.intp), weights
+    position = (coords + 0.5) * (count - 1)
+    first = np.floor(position)
+    weights = key_curve_position_weights(position - first, interpolation)
+    indices = np.clip(first.astype(np.intp)[:, None] + np.arange(-1, 3), 0, count - 1)
+    return indices, weights
+
+
+def lattice_displacement(coords, resolution, offsets, interpolation=DEFAULT_INTERPOLATION, point_weights=None):
+    """ Returns the displacement of the lattice-space coords (N, 3) at strength 1.
+
+    offsets are the (P, 3) moves of the lattice points away from grid_positions(). Returns
+    (displacement, blend): blend is the interpolated point_weights, or None without them.
+    """
+    u_count, v_count, w_count = resolution
+    u_indices, u_weights = _axis_weights(coords[:, 0], u_count, interpolation[0])
+    v_indices, v_weights = _axis_weights(coords[:, 1], v_count, interpolation[1])
+    w_indices, w_weights = _axis_weights(coords[:, 2], w_count, interpolation[2])
+    v_indices *= u_count
+    w_indices *= u_count * v_count
+
+    displacement = np.zeros((len(coords), 3))
+    blend = None if point_weights is None else np.zeros(len(coords))
+    # 16 (w, v) rows of 4 u points each; linear interpolation leaves most rows at weight 0
+    for w in range(4):
+        for v in range(4):
+            row_weights = w_weights[:, w] * v_weights[:, v]
+            if not row_weights.any():
+                continue
+            indices = (w_indices[:, w] + v_indices[:, v])[:, None] + u_indices
+            weights = row_weights[:, None] * u_weights
+            displacement += np.einsum('nk,nkj->nj', weights, offsets[indices])
+            if blend is not None:
+                blend += np.einsum('nk,nk->n', weights, point_weights[indices])
+    return displacement, blend
+
+
+def object_displacement(coords, object_matrix, lattice):
+    """ Returns (displacement, blend) of an object's local coords (N, 3), in the object's space. """
+    object_matrix = np.asarray(object_matrix, dtype=np.float64)
+    lattice_matrix = np.asarray(lattice.matrix, dtype=np.float64)
+    # latmat takes object space to lattice space, the point offsets go the other way
+    latmat = np.linalg.inv(lattice_matrix) @ object_matrix
+    local = coords @ latmat[:3, :3].T + latmat[:3, 3]
+    offsets = (lattice.points - grid_positions(lattice.resolution)) @ np.linalg.inv(latmat)[:3, :3].T
+    return lattice_displacement(local, lattice.resolution, offsets, lattice.interpolation, lattice.point_weights)
+
+
+def apply_displacement(coords, displacement, blend, strength, vertex_weights=None):
+    """ Returns coords deformed at strength, vertex_weights being the modifier's vertex group.
+
+    Blender scales the lattice's own vertex group blend by the per-vertex strength as well, so with
+    blend the displacement grows with the square of the strength.
+    """
+    factor = np.full(len(coords), float(strength)) if vertex_weights is None else vertex_weights * strength
+    if blend is not None:
+        factor = factor * factor * blend
+    return coords + displacement * factor[:, None]
+
+
+def deform_coords(coords, object_matrix, lattice, strength=1.0, vertex_weights=None):
+    """ Returns an object's local coords (N, 3) as a LATTICE modifier on it would deform them. """
+    displacement, blend = object_displacement(coords, object_matrix, lattice)
+    return apply_displacement(coords, displacement, blend, strength, vertex_weights)
+
+
+# Reading Blender data
+#################################################
+
+def lattice_state(lattice_object):
+    """ Returns the LatticeState of a lattice object, reading the points with one foreach_get. """
+    data = lattice_object.data
+    points = np.empty(len(data.points) * 3, dtype=np.float32)
+    data.points.foreach_get("co_deform", points)
+
+    point_weights = None
+    group = lattice_object.vertex_groups.get(data.vertex_group) if data.vertex_group else None
+    if group is not None:
+        point_weights = np.array([_group_weight(point.groups, group.index) for point in data.points])
+
+    return LatticeState(
+        matrix=np.array(lattice_object.matrix_world, dtype=np.float64),
+        resolution=(data.points_u, data.points_v, data.points_w),
+        points=points.reshape(-1, 3).astype(np.float64),
+        interpolation=(data.interpolation_type_u, data.interpolation_type_v, data.interpolation_type_w),
+        point_weights=point_weights,
+    )
+
+
+def mesh_coords(mesh):
+    """ Returns the (N, 3) vertex positions of mesh. """
+    co = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", co)
+    return co.reshape(-1, 3).astype(np.float64)
+
+
+def vertex_group_weights(obj, group_name, invert=False):
+    """ Returns the per-vertex weights of a modifier's vertex group, or None when obj has no such group
+    and the modifier deforms every vertex fully. Vertex groups have no bulk accessor, so this loops
+    and callers keep the result. """
+    group = obj.vertex_groups.get(group_name)
+    if group is None:
+        return None
+    weights = np.array([_group_weight(vertex.groups, group.index) for vertex in obj.data.vertices])
+    return 1.0 - weights if invert else weights
+
+
+def _group_weight(groups, index):
+    for element in groups:
+        if element.group == index:
+            return element.weight
+    return 0.0
@@ -0,0 +1,218 @@
+import csv
+import functools
+import json
+import time
+from collections import deque
+
+import bpy
+
+# Most recent call records, oldest dropped first
+MAX_RECORDS = 5000
+
+records = deque(maxlen=MAX_RECORDS)
+
+_state = {
+    "enabled": False,
+    "originals": [],
+    "stack": [],
+}
+
+
+def _pointers(objects):
+    return [obj.as_pointer() for obj in objects]
+
+
+def _modifier_keys(objects, modifier_name):
+    return [(obj.as_pointer(), modifier_name) for obj in objects]
+
+
+def _registry_member_keys(args, result):
+    objects = []
+    modifiers = []
+    for lattice in bpy.data.objects:
+        if lattice.type != 'LATTICE':
+            continue
+        for ref in lattice.lattice_registry.members:
+            if ref.object is None:
+                continue
+            objects.append(ref.object.as_pointer())
+            modifiers += [(ref.object.as_pointer(), mod.name) for mod in ref.object.modifiers
+                          if mod.type == 'LATTICE' and mod.object == lattice]
+    return objects, modifiers
+
+
+def _preview_entry_keys(args, result):
+    # Preview entries are per object but hold no reference to it
+    return [id(args[0])], [(id(args[0]), "preview")]
+
+
+# Helper functions of lattice_manager_v01 that are wrapped, with a function deriving the objects and
+# modifiers a call touched from its arguments and result, as object pointers and (object pointer, modifier
+# name) keys. Only the functions that do the actual reads and writes count. A caller records the distinct
+# objects and modifiers touched by the calls nested in it, so an operator whose helpers each visit the
+# same objects counts every object once.
+HELPER_COUNTERS = {
+    "add_lattice": None,
+    "add_lattices_by_cluster": None,
+    "add_lattices": None,
+    "fit_new_lattice": None,
+    "fit_lattice_bounds": None,
+    "add_lattice_modifiers": lambda args, result: (_pointers(args[0]), _modifier_keys(args[0], args[2])),
+    "find_lattice": None,
+    "repair_lattice_registry": _registry_member_keys,
+    "expand_instances": None,
+    "calculate_bounding_box": None,
+    "object_world_corners": lambda args, result: (_pointers(args[0]), ()),
+    "object_world_vertices": lambda args, result: (_pointers([args[0]]), ()),
+    "cluster_objects": None,
+    "gather_lattice_modifiers": None,
+    "_rebuild_lattice_index": lambda args, result: (
+        _pointers(item.object for item in args[0].managed_objects if item.object is not None), ()),
+    "update_lattice_data": None,
+    "sync_lattice_data": None,
+    "lattice_modifier_candidates": None,
+    "objects_with_modifier": None,
+    "gather_lattice_preview": None,
+    "lattice_preview_coords": _preview_entry_keys,
+    "lattice_modifier_table": lambda args, result: (
+        _pointers(args[0]), [(row[0].as_pointer(), mod.name) for row in result for mod in row[1]]),
+    "apply_lattice_modifier_batch": None,
+    "apply_lattice_modifiers_batch": None,
+    "apply_lattice_modifier_rows": None,
+    "delete_lattice_modifiers_batch": None,
+    "mesh_memory": None,
+    "update_strength": None,
+    "flush_pending_strength": None,
+    "apply_strength_preset": None,
+    "bake_lattice_cache": lambda args, result: (_pointers(result[0] + result[1]),
+                                                _modifier_keys(result[0], args[2])),
+    "set_lattice_cache_enabled": None,
+    "free_lattice_cache": None,
+    "take_lattice_snapshot": None,
+    "restore_lattice_snapshot": None,
+    "save_lattice_snapshots": None,
+    "keyframe_modifier_strengths": lambda args, result: (_pointers(key[0] for key in args[0]),
+                                                         [(key[0].as_pointer(), key[1]) for key in args[0]]),
+}
+
+
+def is_enabled():
+    return _state["enabled"]
+
+
+def set_enabled(enabled):
+    """ Installs or removes the timing wrappers.
+
+    Wrappers are only installed while profiling is on; when it is off the original functions and
+    methods are in place, so instrumentation costs nothing.
+    """
+    if enabled == _state["enabled"]:
+        return
+    if enabled:
+        _install()
+    else:
+        _uninstall()
+    _state["enabled"] = enabled
+
+
+def _install():
+    from . import lattice_manager_v01 as lm
+
+    targets = []
+    for name, counter in HELPER_COUNTERS.items():
+        targets.append((lm, name, name, counter))
+    for value in list(vars(lm).values()):
+        if isinstance(value, type) and issubclass(value, bpy.types.Operator):
+            for method in ("execute", "invoke", "modal"):
+                if method in vars(value):
+                    targets.append((value, method, f"{value.bl_idname}.{method}", None))
+        elif (isinstance(value, type) and issubclass(value, bpy.types.Panel) and "draw" in vars(value)
+              and not getattr(value, "profiling_exempt", False)):
+            targets.append((value, "draw", f"{value.bl_idname}.draw", None))
+
+    for owner, attribute, label, counter in targets:
+        original = getattr(owner, attribute)
+        _state["originals"].append((owner, attribute, original))
+        setattr(owner, attribute, _wrap(original, label, counter))
+
+
+def _uninstall():
+    for owner, attribute, original in reversed(_state["originals"]):
+        setattr(owner, attribute, original)
+    _state["originals"].clear()
+    _state["stack"].clear()
+
+
+def _wrap(function, label, counter):
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        stack = _state["stack"]
+        record = {"name": label, "depth": len(stack)}
+        objects = set()
+        modifiers = set()
+        stack.append((objects, modifiers))
+        start = time.perf_counter()
+        try:
+            result = function(*args, **kwargs)
+        finally:
+            record["duration"] = time.perf_counter() - start
+            record["start"] = start
+            stack.pop()
+        if counter is not None:
+            touched_objects, touched_modifiers = counter(args, result)
+            objects.update(touched_objects)
+            modifiers.update(touched_modifiers)
+        record["objects"] = len(objects)
+        record["modifiers"] = len(modifiers)
+        if stack:
+            # The operator or helper that made the call touched the same objects and modifiers
+            stack[-1][0].update(objects)
+            stack[-1][1].update(modifiers)
+        records.append(record)
+        return result
+    return wrapper
+
+
+def clear():
+    records.clear()
+
+
+def summary():
+    """ Returns per-name call statistics as a list of dicts, slowest total first. """
+    totals = {}
+    for record in records:
+        entry = totals.setdefault(record["name"], {
+            "name": record["name"], "calls": 0, "total": 0.0, "max": 0.0, "objects": 0, "modifiers": 0})
+        entry["calls"] += 1
+        entry["total"] += record["duration"]
+        entry["max"] = max(entry["max"], record["duration"])
+        entry["objects"] += record["objects"]
+        entry["modifiers"] += record["modifiers"]
+    return sorted(totals.values(), key=lambda entry: entry["total"], reverse=True)
+
+
+def export_csv(filepath):
+    with open(filepath, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["name", "start", "duration_ms", "depth", "objects", "modifiers"])
+        for record in records:
+            writer.writerow([record["name"], f"{record['start']:.6f}", f"{record['duration'] * 1000:.3f}",
+                             record["depth"], record["objects"], record["modifiers"]])
+
+
+def export_chrome_trace(filepath):
+    """ Writes the records as complete events, viewable in chrome://tracing or Perfetto. """
+    events = [
+        {
+            "name": record["name"],
+            "ph": "X",
+            "ts": record["start"] * 1e6,
+            "dur": record["duration"] * 1e6,
+            "pid": 0,
+            "tid": 0,
+            "args": {"objects": record["objects"], "modifiers": record["modifiers"]},
+        }
+        for record in records
+    ]
+    with open(filepath, "w") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
@@ -1,5 +1,17 @@
+import os
+import time
+import uuid
+from collections import namedtuple
+
 import bpy
-from mathutils import Vector
+from bpy.app.handlers import persistent
+from mathutils import Matrix, Vector
+
+from . import instrumentation
+
+# NumPy is imported inside the functions that use it, so registering the addon (for example on
+# render-farm nodes starting Blender in the background) does not pay for loading it. The same goes for
+# the snapshots and pointcache modules, which import NumPy at their top.
 
 bl_info = {
     "name": "Lattice Manager",
@@ -7,16 +19,176 @@ bl_info = {
     "category": "Object",
 }
 
+# Cached index of lattice modifiers on the managed objects, see gather_lattice_modifiers().
+# "signatures" holds each managed object's lattice modifiers so the depsgraph handler can tell
+# whether an update touched anything the index depends on.
+_lattice_index = {
+    "valid": False,
+    "scene": 0,
+    "object_count": -1,
+    "lattices": {},
+    "signatures": {},
+    "data_lookup": {},
+    # Incremented whenever sync_lattice_data() has brought lattice_data up to date
+    "generation": 0,
+}
+
+# Registered lattice objects by registry uid, see find_lattice(). Rebuilt after invalidation or when
+# objects were added or removed, which covers appends from other files.
+_registry_lookup = {
+    "valid": False,
+    "object_count": -1,
+    "lattices": {},
+    # Lattices whose uid another lattice already had and that could not be given a new one yet (the
+    # lookup was rebuilt where ID data is read-only), fixed by the next rebuild
+    "duplicates": 0,
+}
+
+# Filter and sort result of LATTICE_UL_lattices for the lattice_data generation in "key"
+_lattice_list_order = {"key": None, "flags": [], "order": []}
+
+# Number of entries shown in the debug panel's profile summary
+PROFILE_SUMMARY_ROWS = 12
+
+# Rows the lattice list shows before it scrolls
+LATTICE_LIST_ROWS = 8
+
+# Minimum time in seconds between strength writes while a slider is being dragged
+STRENGTH_PREVIEW_INTERVAL = 0.05
+
+# Objects handled per depsgraph evaluation when applying modifiers, and the time slice the
+# modal apply may spend per timer event
+APPLY_BATCH_SIZE = 64
+APPLY_TIME_BUDGET = 0.05
+APPLY_TIMER_STEP = 0.01
+
+# How modifiers on objects sharing a mesh are applied
+APPLY_MODE_ITEMS = [
+    ('PER_OBJECT', "Per Object", "Give every object its own deformed mesh, objects sharing a mesh only share "
+                                 "the result when their transforms match"),
+    ('SHARED', "Shared Data", "Deform each shared mesh once, as its first object sees the lattice, and relink "
+                              "all its users to the result so it stays shared"),
+]
+
+# Objects baked together by bake_lattice_cache(). Each batch steps through the whole frame range with
+# its caches open, so this bounds the open files and evaluated meshes at the cost of one frame pass
+# per batch
+BAKE_BATCH_SIZE = 32
+
+# ID property on baked objects: per lattice name, the cache modifier, file and frame range and the
+# lattice modifier's visibility before the bake
+BAKE_PROPERTY = "lattice_manager_bake"
+
+# Default megabytes of lattice snapshots held in memory, see snapshot_store()
+SNAPSHOT_MEMORY_LIMIT = 64
+
+# The snapshots module once the first snapshot operation has loaded it
+_snapshot_store = {"module": None}
+
+# Seconds to wait after a depsgraph update before syncing lattice_data, so bursts merge into one pass
+SYNC_DEBOUNCE_INTERVAL = 0.2
+
+# Set while sync_lattice_data() mirrors modifier strengths into lattice_data
+_sync_state = {"syncing": False}
+
+# Strength values waiting to be written by flush_pending_strength(), keyed by lattice name
+_pending_strength = {}
+
+# Bytes per element of a mesh's core geometry (positions, edge vertices, corner vertex and edge
+# indices, face offsets) and per value of each attribute data type, for the memory estimates
+MESH_BYTES_PER_VERTEX = 12
+MESH_BYTES_PER_EDGE = 8
+MESH_BYTES_PER_CORNER = 8
+MESH_BYTES_PER_FACE = 4
+ATTRIBUTE_BYTES = {
+    'FLOAT': 4, 'INT': 4, 'FLOAT_VECTOR': 12, 'FLOAT_COLOR': 16, 'BYTE_COLOR': 4, 'STRING': 1,
+    'BOOLEAN': 1, 'FLOAT2': 8, 'INT8': 1, 'INT16_2D': 4, 'INT32_2D': 8, 'QUATERNION': 16, 'FLOAT4X4': 64,
+}
+
+# One lattice for add_lattices(): the objects it deforms and, optionally, its bounds. Bounds left at None
+# are fitted to the objects with the fitting options in props; rotation and points are as for
+# create_and_position_lattice().
+LatticeSpec = namedtuple("LatticeSpec", "objects min_coords max_coords rotation points",
+                         defaults=(None, None, None, None))
+
+# Draw handler and lattice of the deformation preview, see OBJECT_OT_LatticePreview. The preview keeps
+# what it read per object pointer (weights, displacement), per mesh pointer (coords) and per lattice pointer
+# (LatticeState), plus the GPU batch it draws. invalidate_lattice_preview() drops what a depsgraph update
+# makes stale, so a redraw without changes only draws the batch.
+_preview = {
+    "handler": None,
+    "lattice_name": "",
+    "objects": {},
+    "meshes": {},
+    "lattices": {},
+    "batch": None,
+    "valid": False,
+    "strength": None,
+}
+
+# Colour and size of the points drawn by the deformation preview
+PREVIEW_COLOR = (1.0, 0.55, 0.1, 1.0)
+PREVIEW_POINT_SIZE = 3.0
+
+# Pointer to an object affected by a lattice
+class LatticeObjectRef(bpy.types.PropertyGroup):
+    object: bpy.props.PointerProperty(type=bpy.types.Object)
+
+# Point snapshot of a lattice, the points themselves are in the snapshots module
+class LatticeSnapshot(bpy.types.PropertyGroup):
+    point_count: bpy.props.IntProperty()
+    created: bpy.props.FloatProperty(description="Time the snapshot was taken in seconds since the epoch")
+
 # Properties for per-lattice data
 class LatticeData(bpy.types.PropertyGroup):
     lattice_name: bpy.props.StringProperty()
+    # Lets update_lattice_data() recognise a lattice whose modifiers were renamed
+    lattice_object: bpy.props.PointerProperty(type=bpy.types.Object)
+    # Registry uid of the lattice, operators resolve the lattice and its members through it
+    lattice_uid: bpy.props.StringProperty()
+    # Reverse index of the objects using this lattice, refreshed by update_lattice_data()
+    objects: bpy.props.CollectionProperty(type=LatticeObjectRef)
     strength: bpy.props.FloatProperty(
         name="Strength",
         default=0.0,
         min=0.0,
         max=1.0,
-        update=lambda self, context: update_strength(context, self.lattice_name, self.strength)
+        update=lambda self, context: _on_strength_changed(self, context)
     )
+    snapshots: bpy.props.CollectionProperty(type=LatticeSnapshot)
+    # Whether the objects play back baked caches or the live modifiers, see bake_lattice_cache()
+    bake_state: bpy.props.EnumProperty(
+        items=[
+            ('NONE', "Not Baked", ""),
+            ('CACHE', "Cache", "Objects play back the baked point caches"),
+            ('LIVE', "Live", "A bake exists but the live lattice modifiers are used"),
+        ],
+        default='NONE',
+    )
+
+# One lattice's value in a strength preset
+class LatticeStrengthValue(bpy.types.PropertyGroup):
+    lattice_name: bpy.props.StringProperty()
+    # Follows the lattice when its modifiers are renamed, like LatticeData.lattice_object
+    lattice_object: bpy.props.PointerProperty(type=bpy.types.Object)
+    strength: bpy.props.FloatProperty(min=0.0, max=1.0)
+
+# Registry stored on each lattice object the addon manages, see register_lattice()
+class LatticeRegistry(bpy.types.PropertyGroup):
+    # Stable identifier, survives renames of the lattice and its modifiers
+    uid: bpy.props.StringProperty()
+    # Objects with a modifier using this lattice
+    members: bpy.props.CollectionProperty(type=LatticeObjectRef)
+    # Fitting options the lattice was created with
+    created: bpy.props.FloatProperty(description="Creation time in seconds since the epoch")
+    fit_mode: bpy.props.StringProperty()
+    exact_fit: bpy.props.BoolProperty()
+    padding: bpy.props.FloatProperty()
+    points: bpy.props.IntVectorProperty(size=3, default=(2, 2, 2))
+
+# Named set of strengths for all lattices
+class LatticeStrengthPreset(bpy.types.PropertyGroup):
+    values: bpy.props.CollectionProperty(type=LatticeStrengthValue)
 
 # Properties for managing objects
 class LatticeManagerProperties(bpy.types.PropertyGroup):
@@ -31,15 +203,105 @@ class LatticeManagerProperties(bpy.types.PropertyGroup):
         type=bpy.types.Object,
         poll=lambda self, obj: obj.type == 'LATTICE',
     )
+    exact_fit: bpy.props.BoolProperty(
+        name="Exact Fit",
+        description="Fit new lattices to the evaluated vertex positions instead of the object bounding boxes",
+        default=False,
+    )
+    fit_mode: bpy.props.EnumProperty(
+        name="Fit",
+        items=[
+            ('AXIS_ALIGNED', "Axis Aligned", "Align new lattices with the world axes"),
+            ('ORIENTED', "Oriented", "Align new lattices with the principal axes of the objects"),
+        ],
+        default='AXIS_ALIGNED',
+    )
+    padding: bpy.props.FloatProperty(
+        name="Padding",
+        description="Extra lattice size as a fraction of the fitted extents",
+        default=0.0,
+        min=0.0,
+        soft_max=1.0,
+        subtype='FACTOR',
+    )
+    auto_resolution: bpy.props.BoolProperty(
+        name="Auto Resolution",
+        description="Choose the lattice point counts from the extents and a target cell size",
+        default=False,
+    )
+    target_cell_size: bpy.props.FloatProperty(
+        name="Cell Size",
+        description="Target distance between lattice points",
+        default=1.0,
+        min=0.001,
+        subtype='DISTANCE',
+    )
+    max_points_per_axis: bpy.props.IntProperty(
+        name="Max Points per Axis",
+        default=16,
+        min=2,
+        max=64,
+    )
+    max_points_total: bpy.props.IntProperty(
+        name="Max Points",
+        description="Upper bound on points_u * points_v * points_w, keeps evaluation cost predictable",
+        default=4096,
+        min=8,
+    )
     lattice_count: bpy.props.IntProperty(
         name="Lattice Count",
         default=0,
         description="Tracks the number of lattices created by the addon",
     )
     lattice_data: bpy.props.CollectionProperty(type=LatticeData)
+    active_lattice_index: bpy.props.IntProperty(name="Active Lattice", default=0)
+    strength_presets: bpy.props.CollectionProperty(type=LatticeStrengthPreset)
+    preset_name: bpy.props.StringProperty(
+        name="Preset Name",
+        description="Name the current strengths are saved under",
+        default="Preset",
+    )
+    apply_mode: bpy.props.EnumProperty(
+        name="Apply",
+        items=APPLY_MODE_ITEMS,
+        default='PER_OBJECT',
+    )
+    snapshot_name: bpy.props.StringProperty(
+        name="Snapshot Name",
+        description="Name the lattice points are snapshotted under",
+        default="Snapshot",
+    )
+    snapshot_factor: bpy.props.FloatProperty(
+        name="Blend",
+        description="How far restoring moves the points towards the snapshot",
+        default=1.0,
+        min=0.0,
+        max=1.0,
+        subtype='FACTOR',
+    )
+    snapshot_blend_from: bpy.props.StringProperty(
+        name="From",
+        description="Snapshot to blend from when restoring, the current points when empty",
+    )
+    snapshot_memory_limit: bpy.props.IntProperty(
+        name="Snapshot Memory (MB)",
+        description="Memory held by lattice snapshots before the least recently used ones move to the "
+                    "sidecar file next to the .blend file",
+        default=SNAPSHOT_MEMORY_LIMIT,
+        min=1,
+        update=lambda self, context: _configure_snapshot_store(),
+    )
+    profiling_enabled: bpy.props.BoolProperty(
+        name="Profiling",
+        description="Record the time and the objects/modifiers touched by every operator, helper and panel draw",
+        default=False,
+        update=lambda self, context: instrumentation.set_enabled(self.profiling_enabled),
+    )
 
 # Collection Property to Store Managed Objects
 class ManagedObject(bpy.types.PropertyGroup):
+    object: bpy.props.PointerProperty(type=bpy.types.Object)
+    # Name of the object in files saved before the pointer existed, see migrate_managed_objects()
     object_name: bpy.props.StringProperty()
     lattice_modifiers: bpy.props.CollectionProperty(type=bpy.types.PropertyGroup)
 
@@ -67,53 +329,224 @@ class OBJECT_PT_LatticeManager(bpy.types.Panel):
             layout.prop(props, "use_existing_lattice")
             if props.use_existing_lattice:
                 layout.prop_search(props, "lattice_object", context.scene, "objects")
+            else:
+                box = layout.box()
+                box.prop(props, "exact_fit")
+                box.prop(props, "fit_mode")
+                box.prop(props, "padding")
+                box.prop(props, "auto_resolution")
+                if props.auto_resolution:
+                    col = box.column(align=True)
+                    col.prop(props, "target_cell_size")
+                    col.prop(props, "max_points_per_axis")
+                    col.prop(props, "max_points_total")
 
             row = layout.row(align=True)
             row.operator("object.lattice_add_to_all", text="Add Lattice to All")
             row.operator("object.lattice_add_to_selected", text="Add Lattice to Selected")
+            layout.operator("object.lattice_add_by_cluster", text="Add Lattices by Cluster")
+
+            self.draw_strength_presets(props, layout)
 
             # Display lattice modifiers in managed objects
             self.draw_lattice_modifiers(context, layout)
 
-    def draw_lattice_modifiers(self, context, layout):
-        lattice_modifiers = gather_lattice_modifiers(context)
-        if lattice_modifiers:
-            layout.label(text="Lattice Modifiers:")
-            props = context.scene.lattice_manager_props
-            for lattice_name, data in lattice_modifiers.items():
-                box = layout.box()
-
-                # Draw lattice name
-                row = box.row(align=True)
-                row.label(text=lattice_name)
-
-                # Visibility toggle button
-                visibility_icon = 'HIDE_OFF' if data["visible"] else 'HIDE_ON'
-                op = row.operator("object.toggle_lattice_visibility", text="", icon=visibility_icon, emboss=False)
-                op.lattice_name = data["lattice_object"].name
-
-                # Action buttons: Select/Deselect
-                row = box.row(align=True)
-                select_op = row.operator("object.select_objects_with_modifier", text="Select Objects")
-                select_op.modifier_name = lattice_name
-
-                deselect_op = row.operator("object.deselect_objects_with_modifier", text="Deselect Objects")
-                deselect_op.modifier_name = lattice_name
+    def draw_strength_presets(self, props, layout):
+        box = layout.box()
+        row = box.row(align=True)
+        row.prop(props, "preset_name", text="")
+        row.operator("object.lattice_preset_save", text="Save Strengths").preset_name = props.preset_name
+        for preset in props.strength_presets:
+            row = box.row(align=True)
+            row.label(text=preset.name)
+            row.operator("object.lattice_preset_apply", text="Apply").preset_name = preset.name
+            row.operator("object.lattice_preset_keyframe", text="", icon='KEY_HLT').preset_name = preset.name
+            row.operator("object.lattice_preset_remove", text="", icon='X').preset_name = preset.name
 
-                # Action buttons: Apply/Delete
-                row = box.row(align=True)
-                apply_op = row.operator("object.apply_lattice_modifier", text="Apply Lattice Modifiers")
-                apply_op.modifier_name = lattice_name
+    def draw_lattice_modifiers(self, context, layout):
+        props = context.scene.lattice_manager_props
+        if not props.lattice_data:
+            return
+        layout.label(text="Lattice Modifiers:")
+        layout.template_list("LATTICE_UL_lattices", "", props, "lattice_data", props, "active_lattice_index",
+                             rows=LATTICE_LIST_ROWS)
+        row = layout.row(align=True)
+        op = row.operator("object.apply_all_lattice_modifiers", text="Apply All")
+        op.scope = 'MANAGED'
+        op.mode = props.apply_mode
+        row.operator("object.delete_all_lattice_modifiers", text="Delete All").scope = 'MANAGED'
+        layout.prop(props, "apply_mode")
+        if 0 <= props.active_lattice_index < len(props.lattice_data):
+            self.draw_lattice_details(props, props.lattice_data[props.active_lattice_index], layout.box())
+
+    def draw_lattice_details(self, props, lattice_data_item, layout):
+        """ Draws the actions of the lattice selected in the list. """
+        lattice_name = lattice_data_item.lattice_name
+        lattice_object = lattice_data_lattice(lattice_data_item)
+
+        # Draw lattice name
+        row = layout.row(align=True)
+        row.label(text=lattice_name)
+
+        # Visibility toggle button
+        if lattice_object is not None:
+            visibility_icon = 'HIDE_ON' if lattice_object.hide_viewport else 'HIDE_OFF'
+            op = row.operator("object.toggle_lattice_visibility", text="", icon=visibility_icon, emboss=False)
+            op.lattice_name = lattice_name
+
+        # Deformation preview toggle
+        op = row.operator("object.lattice_preview", text="", icon='MOD_LATTICE', emboss=False,
+                          depress=_preview["lattice_name"] == lattice_name)
+        op.lattice_name = lattice_name
+
+        # Action buttons: Select/Deselect
+        row = layout.row(align=True)
+        select_op = row.operator("object.select_objects_with_modifier", text="Select Objects")
+        select_op.modifier_name = lattice_name
+
+        deselect_op = row.operator("object.deselect_objects_with_modifier", text="Deselect Objects")
+        deselect_op.modifier_name = lattice_name
+
+        # Action buttons: Apply/Delete
+        row = layout.row(align=True)
+        apply_op = row.operator("object.apply_lattice_modifier", text="Apply Lattice Modifiers")
+        apply_op.modifier_name = lattice_name
+        apply_op.mode = props.apply_mode
+
+        delete_op = row.operator("object.delete_lattice_modifier", text="Delete Lattice Modifiers")
+        delete_op.modifier_name = lattice_name
+
+        # Strength slider
+        layout.prop(lattice_data_item, "strength", text="Strength", slider=True)
+
+        # Point cache bake
+        row = layout.row(align=True)
+        row.operator("object.lattice_bake_cache", text="Bake Cache", icon='FILE_CACHE').lattice_name = lattice_name
+        if lattice_data_item.bake_state != 'NONE':
+            use_cache = lattice_data_item.bake_state == 'CACHE'
+            op = row.operator("object.lattice_cache_toggle", text="Cache" if use_cache else "Live",
+                              icon='FILE_CACHE' if use_cache else 'MOD_LATTICE', depress=use_cache)
+            op.lattice_name = lattice_name
+            op.use_cache = not use_cache
+            row.operator("object.lattice_cache_free", text="", icon='X').lattice_name = lattice_name
+
+        self.draw_lattice_snapshots(props, lattice_data_item, layout)
+
+    def draw_lattice_snapshots(self, props, lattice_data_item, layout):
+        lattice_name = lattice_data_item.lattice_name
+        row = layout.row(align=True)
+        row.prop(props, "snapshot_name", text="")
+        op = row.operator("object.lattice_snapshot_take", text="Snapshot Points")
+        op.lattice_name = lattice_name
+        op.snapshot_name = props.snapshot_name
+        if not lattice_data_item.snapshots:
+            return
+
+        row = layout.row(align=True)
+        row.prop_search(props, "snapshot_blend_from", lattice_data_item, "snapshots", text="")
+        row.prop(props, "snapshot_factor", slider=True)
+        for snapshot in lattice_data_item.snapshots:
+            row = layout.row(align=True)
+            row.label(text=f"{snapshot.name} ({snapshot.point_count} points)")
+            op = row.operator("object.lattice_snapshot_restore", text="Restore")
+            op.lattice_name = lattice_name
+            op.snapshot_name = snapshot.name
+            op.blend_from = props.snapshot_blend_from
+            op.factor = props.snapshot_factor
+            op = row.operator("object.lattice_snapshot_remove", text="", icon='X')
+            op.lattice_name = lattice_name
+            op.snapshot_name = snapshot.name
+
+class LATTICE_UL_lattices(bpy.types.UIList):
+    """ Lattices of the managed objects, only the visible rows are drawn. """
+    use_order_by_count: bpy.props.BoolProperty(
+        name="Order by Object Count",
+        description="Sort lattices by the number of managed objects they deform",
+        default=False,
+    )
 
-                delete_op = row.operator("object.delete_lattice_modifier", text="Delete Lattice Modifiers")
-                delete_op.modifier_name = lattice_name
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        if self.layout_type in {'DEFAULT', 'COMPACT'}:
+            row = layout.row(align=True)
+            row.label(text=item.lattice_name, icon='MOD_LATTICE')
+            row.label(text=str(len(item.objects)))
+            row.prop(item, "strength", text="", slider=True, emboss=False)
+        elif self.layout_type == 'GRID':
+            layout.alignment = 'CENTER'
+            layout.label(text="", icon='MOD_LATTICE')
+
+    def draw_filter(self, context, layout):
+        row = layout.row(align=True)
+        row.prop(self, "filter_name", text="")
+        row.prop(self, "use_filter_invert", text="", icon='ARROW_LEFTRIGHT')
+        row = layout.row(align=True)
+        row.prop(self, "use_filter_sort_alpha", text="", icon='SORTALPHA')
+        row.prop(self, "use_order_by_count", text="", icon='SORTSIZE')
+        sort_icon = 'SORT_DESC' if self.use_filter_sort_reverse else 'SORT_ASC'
+        row.prop(self, "use_filter_sort_reverse", text="", icon=sort_icon)
+
+    def filter_items(self, context, data, propname):
+        """ Filters by name and sorts by name or by the object count of the reverse index.
+
+        The result only changes when lattice_data is synced or a filter setting changes, so it is cached
+        and redraws return the cached lists instead of walking every lattice again.
+        """
+        items = getattr(data, propname)
+        key = (data.as_pointer(), _lattice_index["generation"], len(items), self.filter_name,
+               self.use_filter_sort_alpha, self.use_order_by_count, self.use_filter_sort_reverse)
+        cache = _lattice_list_order
+        if cache["key"] == key:
+            return cache["flags"], cache["order"]
+
+        helper = bpy.types.UI_UL_list
+        flags = helper.filter_items_by_name(self.filter_name, self.bitflag_filter_item, items, "lattice_name")
+        order = []
+        if self.use_order_by_count:
+            order = helper.sort_items_helper([(i, len(item.objects)) for i, item in enumerate(items)],
+                                             key=lambda entry: entry[1], reverse=True)
+        elif self.use_filter_sort_alpha:
+            order = helper.sort_items_by_name(items, "lattice_name")
+        cache.update(key=key, flags=flags, order=order)
+        return flags, order
+
+class OBJECT_PT_LatticeManagerDebug(bpy.types.Panel):
+    bl_label = "Debug"
+    bl_idname = "OBJECT_PT_lattice_manager_debug"
+    bl_parent_id = "OBJECT_PT_lattice_manager"
+    bl_space_type = "VIEW_3D"
+    bl_region_type = "UI"
+    bl_category = "Tool"
+    bl_context = "objectmode"
+    bl_options = {'DEFAULT_CLOSED'}
+    # Drawing the statistics should not show up in them
+    profiling_exempt = True
 
-                # Strength slider
-                row = box.row()
-                # Find the corresponding lattice data item
-                lattice_data_item = next((item for item in props.lattice_data if item.lattice_name == lattice_name), None)
-                if lattice_data_item:
-                    row.prop(lattice_data_item, "strength", text="Strength", slider=True)
+    def draw(self, context):
+        layout = self.layout
+        props = context.scene.lattice_manager_props
+        layout.prop(props, "profiling_enabled")
+
+        summary = instrumentation.summary()
+        if summary:
+            col = layout.column(align=True)
+            for entry in summary[:PROFILE_SUMMARY_ROWS]:
+                row = col.row(align=True)
+                row.label(text=entry["name"])
+                row.label(text=f"{entry['calls']}x {entry['total'] * 1000 / entry['calls']:.2f} ms "
+                               f"(max {entry['max'] * 1000:.2f})")
+                row.label(text=f"{entry['objects']} obj / {entry['modifiers']} mod")
+
+        layout.operator("object.lattice_repair_registry", text="Repair Registry")
+        row = layout.row(align=True)
+        row.prop(props, "snapshot_memory_limit")
+        # Nothing is held before the first snapshot operation, drawing does not load the module
+        memory = _snapshot_store["module"].memory_usage() if _snapshot_store["module"] is not None else 0
+        row.label(text=f"{memory / (1024 * 1024):.1f} MB in use")
+
+        row = layout.row(align=True)
+        row.operator("object.lattice_profile_clear", text="Clear")
+        row.operator("object.lattice_profile_export", text="Export CSV").format = 'CSV'
+        row.operator("object.lattice_profile_export", text="Export Trace").format = 'CHROME'
 
 # Operators
 class OBJECT_OT_LatticeManageSelected(bpy.types.Operator):
@@ -127,10 +560,11 @@ class OBJECT_OT_LatticeManageSelected(bpy.types.Operator):
         # Clear previous managed objects
         context.scene.managed_objects.clear()
 
-        # Add selected objects to managed list
-        for obj in context.selected_objects:
+        # Add selected objects to managed list, collection instances through their source objects
+        for obj in expand_instances(context.selected_objects):
             if obj.type == 'MESH':
                 item = context.scene.managed_objects.add()
+                item.object = obj
                 item.object_name = obj.name
 
         # Update lattice data after managing objects
@@ -147,6 +581,7 @@ class OBJECT_OT_LatticeUnmanageAll(bpy.types.Operator):
         props = context.scene.lattice_manager_props
         props.is_managing = False
         context.scene.managed_objects.clear()
+        invalidate_lattice_index()
         self.report({'INFO'}, "Unmanaged all objects.")
         return {'FINISHED'}
 
@@ -155,7 +590,9 @@ class OBJECT_OT_LatticeAddToAll(bpy.types.Operator):
     bl_label = "Add Lattice to All"
 
     def execute(self, context):
-        add_lattice(context, manage_all=True)
+        if add_lattice(context, manage_all=True) is None:
+            self.report({'WARNING'}, "No managed mesh objects to add a lattice to.")
+            return {'CANCELLED'}
         # Update lattice data after adding lattices
         update_lattice_data(context)
         self.report({'INFO'}, "Added lattice to all managed objects.")
@@ -166,12 +603,232 @@ class OBJECT_OT_LatticeAddToSelected(bpy.types.Operator):
     bl_label = "Add Lattice to Selected"
 
     def execute(self, context):
-        add_lattice(context, manage_all=False)
+        if add_lattice(context, manage_all=False) is None:
+            self.report({'WARNING'}, "No selected mesh objects to add a lattice to.")
+            return {'CANCELLED'}
         # Update lattice data after adding lattices
         update_lattice_data(context)
         self.report({'INFO'}, "Added lattice to selected objects.")
         return {'FINISHED'}
 
+class OBJECT_OT_LatticeAddByCluster(bpy.types.Operator):
+    bl_idname = "object.lattice_add_by_cluster"
+    bl_label = "Add Lattices by Cluster"
+    bl_description = "Partition the managed objects spatially and add one fitted lattice per cluster"
+
+    method: bpy.props.EnumProperty(
+        name="Method",
+        items=[
+            ('GRID', "Grid", "Group objects whose bounding box centers fall into the same grid cell"),
+            ('KMEANS', "K-Means", "Group objects around cluster centers"),
+        ],
+        default='GRID',
+    )
+    cell_size: bpy.props.FloatProperty(name="Cell Size", default=10.0, min=0.001, subtype='DISTANCE')
+    cluster_count: bpy.props.IntProperty(
+        name="Clusters",
+        description="Number of k-means clusters, 0 derives it from Max Objects",
+        default=0,
+        min=0,
+    )
+    max_objects: bpy.props.IntProperty(
+        name="Max Objects per Lattice",
+        description="Split clusters larger than this, 0 for no limit",
+        default=50,
+        min=0,
+    )
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+
+    def draw(self, context):
+        layout = self.layout
+        layout.prop(self, "method")
+        if self.method == 'GRID':
+            layout.prop(self, "cell_size")
+        else:
+            layout.prop(self, "cluster_count")
+        layout.prop(self, "max_objects")
+
+    def execute(self, context):
+        objects = get_managed_objects(context.scene)
+        lattices, timings = add_lattices_by_cluster(context, objects, self.method, self.max_objects,
+                                                    cell_size=self.cell_size, cluster_count=self.cluster_count)
+        update_lattice_data(context)
+        self.report({'INFO'}, f"Added {len(lattices)} lattices to {len(objects)} managed objects in "
+                              f"{timings.get('total', 0.0) * 1000:.1f} ms.")
+        return {'FINISHED'}
+
+class OBJECT_OT_LatticePresetSave(bpy.types.Operator):
+    bl_idname = "object.lattice_preset_save"
+    bl_label = "Save Strength Preset"
+    bl_description = "Store the current strength of every lattice under a preset name"
+
+    preset_name: bpy.props.StringProperty()
+
+    def execute(self, context):
+        if not self.preset_name:
+            self.report({'WARNING'}, "Preset name is empty.")
+            return {'CANCELLED'}
+        preset = save_strength_preset(context.scene.lattice_manager_props, self.preset_name)
+        self.report({'INFO'}, f"Saved {len(preset.values)} lattice strengths to preset '{self.preset_name}'.")
+        return {'FINISHED'}
+
+class OBJECT_OT_LatticePresetApply(bpy.types.Operator):
+    bl_idname = "object.lattice_preset_apply"
+    bl_label = "Apply Strength Preset"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    preset_name: bpy.props.StringProperty()
+
+    def execute(self, context):
+        preset = context.scene.lattice_manager_props.strength_presets.get(self.preset_name)
+        if preset is None:
+            self.report({'WARNING'}, f"No strength preset named '{self.preset_name}'.")
+            return {'CANCELLED'}
+        apply_strength_preset(context, preset)
+        return {'FINISHED'}
+
+class OBJECT_OT_LatticePresetKeyframe(bpy.types.Operator):
+    bl_idname = "object.lattice_preset_keyframe"
+    bl_label = "Keyframe Strength Preset"
+    bl_description = "Apply the preset and key its strengths on every affected modifier at the current frame"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    preset_name: bpy.props.StringProperty()
+
+    def execute(self, context):
+        preset = context.scene.lattice_manager_props.strength_presets.get(self.preset_name)
+        if preset is None:
+            self.report({'WARNING'}, f"No strength preset named '{self.preset_name}'.")
+            return {'CANCELLED'}
+        frame = context.scene.frame_current
+        count = keyframe_strength_preset(context, preset, frame)
+        self.report({'INFO'}, f"Keyframed {count} lattice modifiers at frame {frame}.")
+        return {'FINISHED'}
+
+class OBJECT_OT_LatticePresetRemove(bpy.types.Operator):
+    bl_idname = "object.lattice_preset_remove"
+    bl_label = "Remove Strength Preset"
+
+    preset_name: bpy.props.StringProperty()
+
+    def execute(self, context):
+        presets = context.scene.lattice_manager_props.strength_presets
+        i = presets.find(self.preset_name)
+        if i >= 0:
+            presets.remove(i)
+        return {'FINISHED'}
+
+class OBJECT_OT_LatticeSnapshotTake(bpy.types.Operator):
+    bl_idname = "object.lattice_snapshot_take"
+    bl_label = "Snapshot Lattice Points"
+    bl_description = ("Store the lattice's point positions under a name, or of every lattice when no lattice "
+                      "is given")
+
+    lattice_name: bpy.props.StringProperty()
+    snapshot_name: bpy.props.StringProperty()
+
+    def execute(self, context):
+        if not self.snapshot_name:
+            self.report({'WARNING'}, "Snapshot name is empty.")
+            return {'CANCELLED'}
+        props = context.scene.lattice_manager_props
+        if self.lattice_name:
+            lattice_data_item = find_lattice_data(props, self.lattice_name)
+            items = [lattice_data_item] if lattice_data_item is not None else []
+        else:
+            items = list(props.lattice_data)
+        count = sum(take_lattice_snapshot(item, self.snapshot_name) is not None for item in items)
+        self.report({'INFO'}, f"Snapshotted the points of {count} lattices as '{self.snapshot_name}'.")
+        return {'FINISHED'}
+
+class OBJECT_OT_LatticeSnapshotRestore(bpy.types.Operator):
+    bl_idname = "object.lattice_snapshot_restore"
+    bl_label = "Restore Lattice Snapshot"
+    bl_description = "Move the lattice points to a snapshot, or part of the way with a blend factor below 1"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    lattice_name: bpy.props.StringProperty()
+    snapshot_name: bpy.props.StringProperty()
+    blend_from: bpy.props.StringProperty(
+        name="From",
+        description="Snapshot the blend starts at, the current points when empty",
+    )
+    factor: bpy.props.FloatProperty(name="Blend", default=1.0, min=0.0, max=1.0, subtype='FACTOR')
+
+    def execute(self, context):
+        lattice_data_item = find_lattice_data(context.scene.lattice_manager_props, self.lattice_name)
+        if lattice_data_item is None or not restore_lattice_snapshot(lattice_data_item, self.snapshot_name,
+                                                                     self.factor, self.blend_from):
+            self.report({'WARNING'}, f"Snapshot '{self.snapshot_name}' is missing or no longer matches the "
+                                     f"points of lattice '{self.lattice_name}'.")
+            return {'CANCELLED'}
+        return {'FINISHED'}
+
+class OBJECT_OT_LatticeSnapshotRemove(bpy.types.Operator):
+    bl_idname = "object.lattice_snapshot_remove"
+    bl_label = "Remove Lattice Snapshot"
+
+    lattice_name: bpy.props.StringProperty()
+    snapshot_name: bpy.props.StringProperty()
+
+    def execute(self, context):
+        lattice_data_item = find_lattice_data(context.scene.lattice_manager_props, self.lattice_name)
+        if lattice_data_item is not None:
+            remove_lattice_snapshot(lattice_data_item, self.snapshot_name)
+        return {'FINISHED'}
+
+class OBJECT_OT_LatticeRepairRegistry(bpy.types.Operator):
+    bl_idname = "object.lattice_repair_registry"
+    bl_label = "Repair Lattice Registry"
+    bl_description = ("Register lattices from older files, give duplicated lattices their own id and rebuild "
+                      "every lattice's member list from the modifiers")
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        stats = repair_lattice_registry()
+        self.report({'INFO'}, f"Registry: {stats['lattices']} lattices, {stats['registered']} newly registered, "
+                              f"{stats['reassigned']} duplicate ids replaced, {stats['members']} members.")
+        return {'FINISHED'}
+
+class OBJECT_OT_LatticeProfileClear(bpy.types.Operator):
+    bl_idname = "object.lattice_profile_clear"
+    bl_label = "Clear Lattice Manager Profile"
+
+    def execute(self, context):
+        instrumentation.clear()
+        return {'FINISHED'}
+
+class OBJECT_OT_LatticeProfileExport(bpy.types.Operator):
+    bl_idname = "object.lattice_profile_export"
+    bl_label = "Export Lattice Manager Profile"
+
+    filepath: bpy.props.StringProperty(subtype='FILE_PATH')
+    format: bpy.props.EnumProperty(
+        name="Format",
+        items=[
+            ('CSV', "CSV", "One row per recorded call"),
+            ('CHROME', "Chrome Trace", "Trace event JSON for chrome://tracing or Perfetto"),
+        ],
+        default='CSV',
+    )
+
+    def invoke(self, context, event):
+        if not self.filepath:
+            self.filepath = "lattice_profile.csv" if self.format == 'CSV' else "lattice_profile.json"
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+    def execute(self, context):
+        filepath = bpy.path.abspath(self.filepath)
+        if self.format == 'CSV':
+            instrumentation.export_csv(filepath)
+        else:
+            instrumentation.export_chrome_trace(filepath)
+        self.report({'INFO'}, f"Exported {len(instrumentation.records)} profile records to '{filepath}'.")
+        return {'FINISHED'}
+
 class OBJECT_OT_ToggleLatticeVisibility(bpy.types.Operator):
     bl_idname = "object.toggle_lattice_visibility"
     bl_label = "Toggle Lattice Visibility"
@@ -179,12 +836,105 @@ class OBJECT_OT_ToggleLatticeVisibility(bpy.types.Operator):
     lattice_name: bpy.props.StringProperty()
 
     def execute(self, context):
-        lattice_object = bpy.data.objects.get(self.lattice_name)
+        lattice_data_item = find_lattice_data(context.scene.lattice_manager_props, self.lattice_name)
+        if lattice_data_item is not None:
+            lattice_object = lattice_data_lattice(lattice_data_item)
+        else:
+            lattice_object = bpy.data.objects.get(self.lattice_name)
         if lattice_object:
             lattice_object.hide_viewport = not lattice_object.hide_viewport
             self.report({'INFO'}, f"Toggled visibility of lattice '{self.lattice_name}'.")
         return {'FINISHED'}
 
+class OBJECT_OT_LatticePreview(bpy.types.Operator):
+    bl_idname = "object.lattice_preview"
+    bl_label = "Preview Lattice Deformation"
+    bl_description = ("Draw the vertices of the objects using this lattice as it deforms them, computed "
+                      "without evaluating the modifiers")
+
+    lattice_name: bpy.props.StringProperty()
+
+    def execute(self, context):
+        if _preview["lattice_name"] == self.lattice_name:
+            stop_lattice_preview()
+        else:
+            start_lattice_preview(self.lattice_name)
+        for area in context.screen.areas if context.screen else ():
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+        return {'FINISHED'}
+
+class OBJECT_OT_LatticeBakeCache(bpy.types.Operator):
+    bl_idname = "object.lattice_bake_cache"
+    bl_label = "Bake Lattice Cache"
+    bl_description = ("Bake the deformation of every object using this lattice to PC2 point caches and play "
+                      "them back with Mesh Cache modifiers instead of the lattice modifiers")
+    bl_options = {'REGISTER', 'UNDO'}
+
+    lattice_name: bpy.props.StringProperty()
+    frame_start: bpy.props.IntProperty(name="Start Frame")
+    frame_end: bpy.props.IntProperty(name="End Frame")
+    directory: bpy.props.StringProperty(name="Directory", default="//lattice_cache/", subtype='DIR_PATH')
+    batch_size: bpy.props.IntProperty(
+        name="Batch Size",
+        description="Objects baked per pass over the frame range, bounds the memory used",
+        default=BAKE_BATCH_SIZE,
+        min=1,
+    )
+
+    def invoke(self, context, event):
+        self.frame_start = context.scene.frame_start
+        self.frame_end = context.scene.frame_end
+        return context.window_manager.invoke_props_dialog(self)
+
+    def execute(self, context):
+        if self.frame_end < self.frame_start:
+            self.report({'WARNING'}, "The end frame is before the start frame.")
+            return {'CANCELLED'}
+        objects = objects_with_modifier(context, self.lattice_name)
+        wm = context.window_manager
+        wm.progress_begin(0, len(objects))
+        try:
+            baked, failed = bake_lattice_cache(context, objects, self.lattice_name, self.frame_start,
+                                               self.frame_end, self.directory, self.batch_size,
+                                               progress=wm.progress_update)
+        finally:
+            wm.progress_end()
+        if failed:
+            self.report({'WARNING'}, f"Baked {len(baked)} objects, {len(failed)} failed because their vertex "
+                                     f"count changes over the frame range: {', '.join(obj.name for obj in failed)}")
+        else:
+            self.report({'INFO'}, f"Baked {len(baked)} objects over frames {self.frame_start}-{self.frame_end}.")
+        return {'FINISHED'}
+
+class OBJECT_OT_LatticeCacheToggle(bpy.types.Operator):
+    bl_idname = "object.lattice_cache_toggle"
+    bl_label = "Toggle Lattice Cache"
+    bl_description = "Switch the baked objects between the point caches and the live lattice modifiers"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    lattice_name: bpy.props.StringProperty()
+    use_cache: bpy.props.BoolProperty(name="Use Cache", default=True)
+
+    def execute(self, context):
+        objects = objects_with_modifier(context, self.lattice_name)
+        set_lattice_cache_enabled(context, objects, self.lattice_name, self.use_cache)
+        return {'FINISHED'}
+
+class OBJECT_OT_LatticeCacheFree(bpy.types.Operator):
+    bl_idname = "object.lattice_cache_free"
+    bl_label = "Free Lattice Cache"
+    bl_description = "Remove the cache modifiers, restore the live lattice modifiers and delete the cache files"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    lattice_name: bpy.props.StringProperty()
+
+    def execute(self, context):
+        objects = objects_with_modifier(context, self.lattice_name)
+        count = free_lattice_cache(context, objects, self.lattice_name)
+        self.report({'INFO'}, f"Freed the caches of {count} objects.")
+        return {'FINISHED'}
+
 class OBJECT_OT_SelectObjectsWithModifier(bpy.types.Operator):
     bl_idname = "object.select_objects_with_modifier"
     bl_label = "Select Objects with Modifier"
@@ -192,9 +942,12 @@ class OBJECT_OT_SelectObjectsWithModifier(bpy.types.Operator):
     modifier_name: bpy.props.StringProperty()
 
     def execute(self, context):
-        for obj in context.scene.objects:
-            if obj.type == 'MESH' and self.modifier_name in obj.modifiers:
+        for obj in objects_with_modifier(context, self.modifier_name):
+            try:
                 obj.select_set(True)
+            except RuntimeError:
+                # Object is no longer in the view layer
+                pass
         self.report({'INFO'}, f"Selected objects with modifier '{self.modifier_name}'.")
         return {'FINISHED'}
 
@@ -205,9 +958,12 @@ class OBJECT_OT_DeselectObjectsWithModifier(bpy.types.Operator):
     modifier_name: bpy.props.StringProperty()
 
     def execute(self, context):
-        for obj in context.scene.objects:
-            if obj.type == 'MESH' and self.modifier_name in obj.modifiers:
+        for obj in objects_with_modifier(context, self.modifier_name):
+            try:
                 obj.select_set(False)
+            except RuntimeError:
+                # Object is no longer in the view layer
+                pass
         self.report({'INFO'}, f"Deselected objects with modifier '{self.modifier_name}'.")
         return {'FINISHED'}
 
@@ -216,15 +972,159 @@ class OBJECT_OT_ApplyLatticeModifier(bpy.types.Operator):
     bl_label = "Apply Lattice Modifier"
 
     modifier_name: bpy.props.StringProperty()
+    mode: bpy.props.EnumProperty(
+        name="Mode",
+        items=APPLY_MODE_ITEMS,
+        default='PER_OBJECT',
+    )
 
     def execute(self, context):
-        for obj in context.scene.objects:
-            if obj.type == 'MESH' and self.modifier_name in obj.modifiers:
-                bpy.context.view_layer.objects.active = obj
-                bpy.ops.object.modifier_apply(modifier=self.modifier_name)
+        return self.apply_rows(context, self.modifier_rows(context))
+
+    def modifier_rows(self, context):
+        """ Reads the stacks of the objects that may carry the modifier once, see lattice_modifier_table(). """
+        return lattice_modifier_table(lattice_modifier_candidates(context, self.modifier_name), [self.modifier_name])
+
+    def apply_rows(self, context, rows):
+        objects = [row[0] for row in rows]
+        memory_before = mesh_memory(obj.data for obj in objects)
+        applied, failed = apply_lattice_modifier_rows(context, rows, shared=self.mode == 'SHARED')
         # Update lattice data after applying modifiers
         update_lattice_data(context)
-        self.report({'INFO'}, f"Applied lattice modifier '{self.modifier_name}' to all objects.")
+        memory = mesh_memory_report(objects, memory_before)
+        if failed:
+            self.report({'WARNING'}, f"Applied lattice modifier '{self.modifier_name}' to {len(applied)} objects, "
+                                     f"{len(failed)} failed. {memory}")
+        else:
+            self.report({'INFO'}, f"Applied lattice modifier '{self.modifier_name}' to all objects. {memory}")
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        rows = self.modifier_rows(context)
+        if len(rows) <= APPLY_BATCH_SIZE:
+            return self.apply_rows(context, rows)
+
+        self._objects = [row[0] for row in rows]
+        self._memory_before = mesh_memory(obj.data for obj in self._objects)
+        # The batches apply these rows instead of reading the stacks again. Objects sharing a mesh are
+        # kept next to each other so the shared result is reused across batches.
+        self._queue = sorted(rows, key=lambda row: row[0].data.as_pointer())
+        self._results = {}
+        self._total = len(self._queue)
+        self._applied = 0
+        self._failed = 0
+
+        # Apply in time-sliced batches from a timer so the UI keeps drawing the progress
+        wm = context.window_manager
+        self._timer = wm.event_timer_add(APPLY_TIMER_STEP, window=context.window)
+        wm.progress_begin(0, self._total)
+        wm.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context, event):
+        if event.type == 'ESC':
+            return self.finish(context, cancelled=True)
+        if event.type != 'TIMER':
+            # The queued rows hold modifiers and the results hold meshes. Passing events on would let
+            # the user delete them or undo between batches, leaving the next batch with freed data.
+            return {'RUNNING_MODAL'}
+
+        deadline = time.perf_counter() + APPLY_TIME_BUDGET
+        while self._queue and time.perf_counter() < deadline:
+            batch = self._queue[:APPLY_BATCH_SIZE]
+            del self._queue[:APPLY_BATCH_SIZE]
+            applied, failed = apply_lattice_modifier_rows(context, batch, self._results, shared=self.mode == 'SHARED')
+            self._applied += len(applied)
+            self._failed += len(failed)
+
+        done = self._total - len(self._queue)
+        context.window_manager.progress_update(done)
+        if context.area:
+            context.area.header_text_set(
+                f"Applying '{self.modifier_name}': {done}/{self._total} objects (Esc to cancel)")
+        if not self._queue:
+            return self.finish(context, cancelled=False)
+        return {'RUNNING_MODAL'}
+
+    def finish(self, context, cancelled):
+        wm = context.window_manager
+        wm.event_timer_remove(self._timer)
+        wm.progress_end()
+        if context.area:
+            context.area.header_text_set(None)
+        update_lattice_data(context)
+        memory = mesh_memory_report(self._objects, self._memory_before)
+
+        if cancelled:
+            self.report({'WARNING'}, f"Cancelled: applied lattice modifier '{self.modifier_name}' to "
+                                     f"{self._applied} of {self._total} objects. {memory}")
+            return {'CANCELLED'}
+        if self._failed:
+            self.report({'WARNING'}, f"Applied lattice modifier '{self.modifier_name}' to {self._applied} objects, "
+                                     f"{self._failed} failed. {memory}")
+        else:
+            self.report({'INFO'}, f"Applied lattice modifier '{self.modifier_name}' to all objects. {memory}")
+        return {'FINISHED'}
+
+class LatticeBulkOperator:
+    """ Shared properties of the operators acting on several lattices at once. """
+    scope: bpy.props.EnumProperty(
+        name="Objects",
+        items=[
+            ('SELECTED', "Selected", "Selected objects"),
+            ('MANAGED', "Managed", "All managed objects"),
+        ],
+        default='SELECTED',
+    )
+    # Lattice modifier names to act on, every lattice modifier when empty
+    lattice_names: bpy.props.CollectionProperty(type=bpy.types.PropertyGroup)
+
+    def target_objects(self, context):
+        if self.scope == 'MANAGED':
+            objects = get_managed_objects(context.scene)
+        else:
+            objects = context.selected_objects
+        return [obj for obj in objects if obj.type == 'MESH']
+
+    def target_lattice_names(self):
+        return [item.name for item in self.lattice_names] or None
+
+class OBJECT_OT_ApplyAllLatticeModifiers(LatticeBulkOperator, bpy.types.Operator):
+    bl_idname = "object.apply_all_lattice_modifiers"
+    bl_label = "Apply All Lattice Modifiers"
+    bl_description = "Apply every lattice modifier, or the listed ones, on the objects in one evaluation"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    mode: bpy.props.EnumProperty(
+        name="Mode",
+        items=APPLY_MODE_ITEMS,
+        default='PER_OBJECT',
+    )
+
+    def execute(self, context):
+        objects = self.target_objects(context)
+        memory_before = mesh_memory(obj.data for obj in objects)
+        applied, failed = apply_lattice_modifiers_batch(context, objects, self.target_lattice_names(),
+                                                        shared=self.mode == 'SHARED')
+        update_lattice_data(context)
+        memory = mesh_memory_report(objects, memory_before)
+        if failed:
+            self.report({'WARNING'}, f"Applied lattice modifiers on {len(applied)} objects, {len(failed)} failed. "
+                                     f"{memory}")
+        else:
+            self.report({'INFO'}, f"Applied lattice modifiers on {len(applied)} objects. {memory}")
+        return {'FINISHED'}
+
+class OBJECT_OT_DeleteAllLatticeModifiers(LatticeBulkOperator, bpy.types.Operator):
+    bl_idname = "object.delete_all_lattice_modifiers"
+    bl_label = "Delete All Lattice Modifiers"
+    bl_description = "Remove every lattice modifier, or the listed ones, from the objects"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        removed = delete_lattice_modifiers_batch(self.target_objects(context), self.target_lattice_names())
+        update_lattice_data(context)
+        self.report({'INFO'}, f"Removed {removed} lattice modifiers.")
         return {'FINISHED'}
 
 class OBJECT_OT_DeleteLatticeModifier(bpy.types.Operator):
@@ -234,9 +1134,8 @@ class OBJECT_OT_DeleteLatticeModifier(bpy.types.Operator):
     modifier_name: bpy.props.StringProperty()
 
     def execute(self, context):
-        for obj in context.scene.objects:
-            if obj.type == 'MESH' and self.modifier_name in obj.modifiers:
-                obj.modifiers.remove(obj.modifiers[self.modifier_name])
+        # delete_lattice_modifiers() looks the modifier up itself, once per object
+        delete_lattice_modifiers(lattice_modifier_candidates(context, self.modifier_name), self.modifier_name)
         # Update lattice data after deleting modifiers
         update_lattice_data(context)
         self.report({'INFO'}, f"Deleted lattice modifier '{self.modifier_name}' from all objects.")
@@ -244,107 +1143,1551 @@ class OBJECT_OT_DeleteLatticeModifier(bpy.types.Operator):
 
 # Helper Functions
 def add_lattice(context, manage_all):
+    """ Adds a lattice to the managed or the selected mesh objects, returns the lattice or None when there
+    are no such objects. """
     props = context.scene.lattice_manager_props
     if manage_all:
-        objects = [context.scene.objects[item.object_name] for item in context.scene.managed_objects if
-                   item.object_name in context.scene.objects]
+        objects = get_managed_objects(context.scene)
     else:
-        objects = [obj for obj in context.selected_objects if obj.type == 'MESH']
+        objects = [obj for obj in expand_instances(context.selected_objects) if obj.type == 'MESH']
 
-    # Check if we should use an existing lattice
-    if props.use_existing_lattice and props.lattice_object:
-        lattice = props.lattice_object
-        modifier_name = lattice.name
-    else:
-        # Calculate bounding box and create new lattice
-        min_coords, max_coords = calculate_bounding_box(objects)
-        lattice = create_and_position_lattice(context, min_coords, max_coords)
-
-        # Increment lattice count and rename lattice object
-        props.lattice_count += 1
-        lattice.name = f"Lattice {props.lattice_count}"
-        modifier_name = lattice.name
-
-        # Move the lattice to a "Lattices" collection in the Scene Collection
-        lattice_collection = bpy.data.collections.get("Lattices")
-        if not lattice_collection:
-            lattice_collection = bpy.data.collections.new("Lattices")
-            context.scene.collection.children.link(lattice_collection)
-
-        # Ensure lattice is only linked to "Lattices" collection
-        for col in lattice.users_collection:
-            col.objects.unlink(lattice)
-        lattice_collection.objects.link(lattice)
+    # Check if we should use an existing lattice, otherwise a new one is fitted to the objects
+    lattice = props.lattice_object if props.use_existing_lattice else None
 
     # Add lattice modifier to all selected or managed objects
-    for obj in objects:
-        mod = obj.modifiers.new(name=modifier_name, type='LATTICE')
-        mod.object = lattice
-        mod.strength = 0.0  # Set default strength to 0
-
-def calculate_bounding_box(objects):
-    # Start with the bounding box of the first object
-    min_coords = Vector((float('inf'), float('inf'), float('inf')))
-    max_coords = Vector((float('-inf'), float('-inf'), float('-inf')))
+    return add_lattice_to_objects(context, objects, lattice)
+
+def add_lattice_to_objects(context, objects, lattice=None):
+    """ Adds a modifier for lattice to each of objects, fitting a new lattice when none is given.
+
+    Unlike the operators this does not read the selection or active object, so scripts and background
+    jobs can pass any object list. Returns the lattice, or None without creating one when objects is
+    empty: there are no bounds to fit.
+    """
+    if not objects:
+        return None
+    if lattice is None:
+        lattice = fit_new_lattice(context, objects)
+    add_lattice_modifiers(objects, lattice, lattice.name)
+    return lattice
 
+def expand_instances(objects):
+    """ Returns objects with collection instances replaced by the objects of their collections.
+
+    A modifier on an instanced collection's object deforms every instance of it, so scatter setups
+    need one modifier per source object rather than one per instance. Duplicates are dropped, order
+    is kept.
+    """
+    expanded = {}
+    pending = list(objects)
+    seen_collections = set()
+    while pending:
+        obj = pending.pop(0)
+        if obj.instance_type == 'COLLECTION' and obj.instance_collection is not None:
+            collection = obj.instance_collection
+            if collection.as_pointer() not in seen_collections:
+                seen_collections.add(collection.as_pointer())
+                pending.extend(collection.all_objects)
+        expanded.setdefault(obj.as_pointer(), obj)
+    return list(expanded.values())
+
+def mesh_memory(meshes):
+    """ Returns an estimate in bytes of the geometry held by meshes, counting each datablock once. """
+    total = 0
+    seen = set()
+    for mesh in meshes:
+        if mesh.as_pointer() in seen:
+            continue
+        seen.add(mesh.as_pointer())
+        sizes = {
+            'POINT': len(mesh.vertices),
+            'EDGE': len(mesh.edges),
+            'CORNER': len(mesh.loops),
+            'FACE': len(mesh.polygons),
+        }
+        total += (sizes['POINT'] * MESH_BYTES_PER_VERTEX + sizes['EDGE'] * MESH_BYTES_PER_EDGE
+                  + sizes['CORNER'] * MESH_BYTES_PER_CORNER + sizes['FACE'] * MESH_BYTES_PER_FACE)
+        for attribute in mesh.attributes:
+            # Positions and the internal topology layers are in the constants above
+            if attribute.name != "position" and not attribute.name.startswith("."):
+                total += sizes.get(attribute.domain, 0) * ATTRIBUTE_BYTES.get(attribute.data_type, 4)
+    return total
+
+def mesh_memory_report(objects, memory_before):
+    """ Describes the mesh memory of objects before and after applying, for the apply operators' reports.
+
+    Only the meshes of the applied objects and their results are measured, not every mesh in the file.
+    """
+    memory_after = mesh_memory(obj.data for obj in objects)
+    return f"Mesh data: {memory_before / 2 ** 20:.1f} MB before, {memory_after / 2 ** 20:.1f} MB after."
+
+def lattice_modifier_table(objects, lattice_names=None):
+    """ Reads each object's modifier stack once and returns (object, lattice modifiers, other modifiers)
+    rows for the objects that carry any of the lattice_names, or any lattice modifier when None.
+
+    The lattice modifiers are in stack order, so several lattices per object are handled in the same
+    pass instead of one name lookup per lattice.
+    """
+    names = None if lattice_names is None else set(lattice_names)
+    rows = []
+    for obj in objects:
+        lattice_mods = []
+        other_mods = []
+        for mod in obj.modifiers:
+            if mod.type == 'LATTICE' and (names is None or mod.name in names):
+                lattice_mods.append(mod)
+            else:
+                other_mods.append(mod)
+        if lattice_mods:
+            rows.append((obj, lattice_mods, other_mods))
+    return rows
+
+def delete_lattice_modifiers_batch(objects, lattice_names=None):
+    """ Removes the lattice modifiers named in lattice_names, all of them when None, from objects in one
+    pass over each stack and returns the number removed. """
+    released = []
+    for obj, lattice_mods, _ in lattice_modifier_table(objects, lattice_names):
+        for mod in lattice_mods:
+            released.append((mod.object, obj))
+            obj.modifiers.remove(mod)
+    unregister_lattice_members(released)
+    return len(released)
+
+def delete_lattice_modifiers(objects, modifier_name):
+    """ Removes the modifier named modifier_name from each of objects, returns the number removed. """
+    released = []
     for obj in objects:
-        for vertex in obj.bound_box:
-            world_vertex = obj.matrix_world @ Vector(vertex)
-            min_coords = Vector((min(min_coords[i], world_vertex[i]) for i in range(3)))
-            max_coords = Vector((max(max_coords[i], world_vertex[i]) for i in range(3)))
+        mod = obj.modifiers.get(modifier_name)
+        if mod is not None:
+            released.append((mod.object, obj))
+            obj.modifiers.remove(mod)
+    unregister_lattice_members(released)
+    return len(released)
+
+def add_lattices_by_cluster(context, objects, method, max_objects, cell_size=10.0, cluster_count=0):
+    """ Creates one fitted lattice per spatial cluster of objects, returns (lattices, timings) like
+    add_lattices() with the clustering counted in "fit". """
+    if not objects:
+        return [], {}
+
+    start = time.perf_counter()
+    corners = object_world_corners(objects)
+    specs = []
+    for indices in cluster_objects(corners, method, max_objects, cell_size, cluster_count):
+        cluster = [objects[i] for i in indices]
+        specs.append(LatticeSpec(cluster, *fit_lattice_bounds(context, cluster, corners[indices])))
+    clustered = time.perf_counter() - start
+
+    lattices, timings = add_lattices(context, specs)
+    timings["fit"] += clustered
+    timings["total"] += clustered
+    return lattices, timings
+
+def add_lattices(context, specs):
+    """ Creates a managed lattice per LatticeSpec and adds its modifiers, returns (lattices, timings).
+
+    All lattices are built and placed before any of them is linked, then linked straight into the
+    "Lattices" collection, which is looked up once for the batch; each modifier is written once. Specs
+    without objects are skipped. timings holds the seconds spent per phase ("fit", "create", "link",
+    "modifiers") and in "total", plus the "lattices" and "modifiers_added" counts.
+    """
+    props = context.scene.lattice_manager_props
+    specs = [spec for spec in specs if spec.objects]
+    timings = {"lattices": len(specs), "modifiers_added": sum(len(spec.objects) for spec in specs)}
+    start = mark = time.perf_counter()
+
+    def phase(name):
+        nonlocal mark
+        now = time.perf_counter()
+        timings[name] = now - mark
+        mark = now
+
+    # Fit the specs without bounds from one batched corner transform of all their objects
+    unfitted = [obj for spec in specs if spec.min_coords is None for obj in spec.objects]
+    corners = object_world_corners(unfitted) if unfitted and not props.exact_fit else None
+    bounds = []
+    offset = 0
+    for spec in specs:
+        if spec.min_coords is None:
+            count = len(spec.objects)
+            spec_corners = None if corners is None else corners[offset:offset + count]
+            offset += count
+            bounds.append(fit_lattice_bounds(context, spec.objects, spec_corners))
+        else:
+            bounds.append((spec.min_coords, spec.max_coords, spec.rotation, spec.points))
+    phase("fit")
+
+    # Objects get their final names on creation, renaming would search bpy.data for a free name again
+    first = props.lattice_count + 1
+    lattices = [
+        create_and_position_lattice(context, min_coords, max_coords, rotation=rotation, padding=props.padding,
+                                    points=points, name=f"Lattice {first + i}")
+        for i, (min_coords, max_coords, rotation, points) in enumerate(bounds)
+    ]
+    props.lattice_count += len(lattices)
+    for lattice in lattices:
+        register_lattice(lattice, fit_mode=props.fit_mode, exact_fit=props.exact_fit, padding=props.padding)
+    phase("create")
+
+    collection_objects = get_lattice_collection(context).objects
+    for lattice in lattices:
+        collection_objects.link(lattice)
+    phase("link")
+
+    for spec, lattice in zip(specs, lattices):
+        add_lattice_modifiers(spec.objects, lattice, lattice.name)
+    phase("modifiers")
+
+    timings["total"] = time.perf_counter() - start
+    return lattices, timings
+
+def fit_new_lattice(context, objects, corners=None):
+    """ Creates a managed lattice around objects using the fitting options in props.
+
+    corners may pass the objects' rows of object_world_corners() when the caller already has them.
+    """
+    return new_managed_lattice(context, *fit_lattice_bounds(context, objects, corners))
+
+def fit_lattice_bounds(context, objects, corners=None):
+    """ Returns the (min_coords, max_coords, rotation, points) of a lattice fitted to objects with the
+    fitting options in props, corners as for fit_new_lattice(). """
+    import numpy as np
+    props = context.scene.lattice_manager_props
+    rotation = None
+    if props.fit_mode == 'ORIENTED':
+        if props.exact_fit:
+            depsgraph = context.evaluated_depsgraph_get()
+            local_cache = {}
+            points = np.concatenate([object_world_vertices(obj, depsgraph, local_cache) for obj in objects]
+                                    or [np.zeros((0, 3))])
+        else:
+            points = (object_world_corners(objects) if corners is None else corners).reshape(-1, 3)
+        rotation = principal_axes(points)
+        local = points @ rotation
+        min_coords, max_coords = Vector(local.min(axis=0)), Vector(local.max(axis=0))
+    elif props.exact_fit or corners is None:
+        min_coords, max_coords = calculate_bounding_box(objects, exact=props.exact_fit)
+    else:
+        min_coords, max_coords = Vector(corners.min(axis=(0, 1))), Vector(corners.max(axis=(0, 1)))
+
+    points_uvw = None
+    if props.auto_resolution:
+        extents = np.array(max_coords - min_coords) * (1 + props.padding)
+        points_uvw = lattice_resolution(extents, props.target_cell_size, props.max_points_per_axis,
+                                        props.max_points_total)
+    return min_coords, max_coords, rotation, points_uvw
+
+def principal_axes(points):
+    """ Returns a right-handed 3x3 rotation whose columns are the principal axes of points, largest first. """
+    import numpy as np
+    if len(points) < 3:
+        return np.identity(3)
+    centered = points - points.mean(axis=0)
+    eigenvalues, eigenvectors = np.linalg.eigh(centered.T @ centered)
+    axes = eigenvectors[:, ::-1]
+    if np.linalg.det(axes) < 0:
+        axes[:, 2] = -axes[:, 2]
+    return axes
+
+def lattice_resolution(extents, cell_size, max_per_axis, max_total):
+    """ Returns (points_u, points_v, points_w) for a target cell size, capped per axis and in total. """
+    import numpy as np
+    points = np.clip(np.ceil(np.asarray(extents) / cell_size).astype(int) + 1, 2, max_per_axis)
+    if points.prod() > max_total:
+        # Shrink all axes by the same factor so the cap keeps the cells roughly cubic
+        factor = (max_total / points.prod()) ** (1 / 3)
+        points = np.maximum(2, np.floor(points * factor).astype(int))
+    return tuple(int(n) for n in points)
+
+def new_managed_lattice(context, min_coords, max_coords, rotation=None, points=None):
+    """ Creates a lattice fitted to the bounds, numbered and linked into the "Lattices" collection. """
+    props = context.scene.lattice_manager_props
+    props.lattice_count += 1
+    lattice = create_and_position_lattice(context, min_coords, max_coords, rotation=rotation,
+                                          padding=props.padding, points=points,
+                                          name=f"Lattice {props.lattice_count}")
 
-    return min_coords, max_coords
+    # New objects are not in any collection yet, so linking makes "Lattices" their only one
+    get_lattice_collection(context).objects.link(lattice)
 
-def create_and_position_lattice(context, min_coords, max_coords):
-    # Create a new lattice object
-    lattice_data = bpy.data.lattices.new("Lattice")
-    lattice = bpy.data.objects.new("Lattice", lattice_data)
+    register_lattice(lattice, fit_mode=props.fit_mode, exact_fit=props.exact_fit, padding=props.padding)
+    return lattice
 
-    # Position the lattice at the center of the bounding box
-    lattice.location = (min_coords + max_coords) / 2
+def get_lattice_collection(context):
+    """ Returns the "Lattices" collection, creating it in the Scene Collection when missing. """
+    lattice_collection = bpy.data.collections.get("Lattices")
+    if not lattice_collection:
+        lattice_collection = bpy.data.collections.new("Lattices")
+        context.scene.collection.children.link(lattice_collection)
+    return lattice_collection
 
-    # Set the dimensions of the lattice to fit the bounding box with a scaling factor of 2
-    lattice.scale = (max_coords - min_coords) / 2 * 2  # Scaling up by a factor of 2
+def add_lattice_modifiers(objects, lattice, modifier_name):
+    for obj in objects:
+        mod = obj.modifiers.new(name=modifier_name, type='LATTICE')
+        mod.object = lattice
+        mod.strength = 0.0  # Set default strength to 0
+    register_lattice_members(lattice, objects)
+
+# Lattice registry
+def register_lattice(lattice, **creation_params):
+    """ Gives lattice a registry uid if it has none and stores the creation parameters, returns the uid. """
+    registry = lattice.lattice_registry
+    if not registry.uid:
+        registry.uid = uuid.uuid4().hex
+        registry.created = time.time()
+        registry.points = (lattice.data.points_u, lattice.data.points_v, lattice.data.points_w)
+        lookup = _registry_lookup
+        if lookup["valid"]:
+            lookup["lattices"][registry.uid] = lattice
+            # Keep the object count current so the new lattice does not cost a rebuild
+            lookup["object_count"] = len(bpy.data.objects)
+    for name, value in creation_params.items():
+        setattr(registry, name, value)
+    return registry.uid
+
+def lattice_uid(lattice):
+    """ Returns the registry uid of lattice, registering it first. A duplicated lattice carries the uid of
+    the lattice it was copied from until it is given its own here, so data keyed by the uid (snapshots)
+    never resolves to the other lattice. """
+    uid = register_lattice(lattice)
+    if find_lattice(uid) is not lattice:
+        uid = lattice.lattice_registry.uid = uuid.uuid4().hex
+        invalidate_lattice_registry()
+    return uid
+
+def register_lattice_members(lattice, objects):
+    """ Adds objects to the members of lattice, registering lattices that were not created by the addon. """
+    register_lattice(lattice)
+    members = lattice.lattice_registry.members
+    known = {ref.object.as_pointer() for ref in members if ref.object is not None}
+    for obj in objects:
+        if obj.as_pointer() not in known:
+            known.add(obj.as_pointer())
+            members.add().object = obj
+
+def unregister_lattice_members(pairs):
+    """ Drops the objects of (lattice, object) pairs from the lattices' members, one rewrite per lattice. """
+    released = {}
+    for lattice, obj in pairs:
+        if lattice is not None:
+            released.setdefault(lattice.as_pointer(), (lattice, set()))[1].add(obj.as_pointer())
+    for lattice, object_pointers in released.values():
+        members = lattice.lattice_registry.members
+        kept = [ref.object for ref in members
+                if ref.object is not None and ref.object.as_pointer() not in object_pointers]
+        if len(kept) != len(members):
+            members.clear()
+            for obj in kept:
+                members.add().object = obj
+
+def find_lattice(uid):
+    """ Returns the lattice object registered under uid, or None, through a cached uid lookup. """
+    lookup = _registry_lookup
+    if not lookup["valid"] or lookup["object_count"] != len(bpy.data.objects):
+        _rebuild_registry_lookup()
+    lattice = lookup["lattices"].get(uid)
+    if lattice is None:
+        return None
+    try:
+        if lattice.lattice_registry.uid == uid:
+            return lattice
+    except ReferenceError:
+        # Removed since the lookup was built
+        pass
+    _rebuild_registry_lookup()
+    return lookup["lattices"].get(uid)
+
+def lattice_data_lattice(lattice_data_item):
+    """ Returns the lattice object of a lattice_data item, resolved through its registry uid. """
+    lattice = find_lattice(lattice_data_item.lattice_uid) if lattice_data_item.lattice_uid else None
+    # Items synced before they stored a uid still have the object pointer
+    return lattice if lattice is not None else lattice_data_item.lattice_object
+
+def lattice_members(lattice):
+    """ Returns the registered members of lattice that still have a lattice modifier using it. """
+    members = []
+    for ref in lattice.lattice_registry.members:
+        obj = ref.object
+        if obj is not None and any(mod.type == 'LATTICE' and mod.object == lattice for mod in obj.modifiers):
+            members.append(obj)
+    return members
+
+def _rebuild_registry_lookup():
+    """ Maps every registered lattice by uid. A lattice that shares its uid with one seen before it,
+    usually a duplicate made in Blender, is given a new uid, so the original keeps its own. """
+    lattices = {}
+    duplicates = 0
+    for obj in bpy.data.objects:
+        if obj.type == 'LATTICE':
+            registry = obj.lattice_registry
+            uid = registry.uid
+            if uid and uid in lattices:
+                try:
+                    registry.uid = uid = uuid.uuid4().hex
+                except AttributeError:
+                    # ID data cannot be written while drawing
+                    duplicates += 1
+                    continue
+            if uid:
+                lattices[uid] = obj
+    _registry_lookup.update(valid=True, object_count=len(bpy.data.objects), lattices=lattices,
+                            duplicates=duplicates)
+
+def invalidate_lattice_registry():
+    _registry_lookup["valid"] = False
+
+def repair_lattice_registry():
+    """ Rebuilds the registry of every lattice used by a lattice modifier in one pass over the modifier
+    stacks: legacy lattices get a uid, copies of a lattice that share its uid get a new one, and member
+    lists are rewritten from the modifiers. Returns counts of what was done. """
+    users = {}
+    lattices = {}
+    for obj in bpy.data.objects:
+        if obj.type == 'LATTICE':
+            lattices.setdefault(obj.as_pointer(), obj)
+        for mod in obj.modifiers:
+            if mod.type == 'LATTICE' and mod.object is not None and mod.object.type == 'LATTICE':
+                lattices.setdefault(mod.object.as_pointer(), mod.object)
+                objects = users.setdefault(mod.object.as_pointer(), [])
+                if not objects or objects[-1] != obj:
+                    objects.append(obj)
+
+    stats = {"lattices": 0, "registered": 0, "reassigned": 0, "members": 0}
+    seen = set()
+    for pointer, lattice in lattices.items():
+        objects = users.get(pointer, [])
+        registry = lattice.lattice_registry
+        if not registry.uid:
+            if not objects:
+                # Not a lattice the addon handles
+                continue
+            register_lattice(lattice)
+            stats["registered"] += 1
+        elif registry.uid in seen:
+            registry.uid = uuid.uuid4().hex
+            stats["reassigned"] += 1
+        seen.add(registry.uid)
+        stats["lattices"] += 1
+        stats["members"] += len(objects)
+        if [ref.object for ref in registry.members] != objects:
+            registry.members.clear()
+            for obj in objects:
+                registry.members.add().object = obj
+
+    invalidate_lattice_registry()
+    return stats
+
+def cluster_objects(corners, method, max_objects, cell_size=10.0, cluster_count=0):
+    """ Partitions objects by the centers of their world bounding boxes.
+
+    corners is the (N, 8, 3) array from object_world_corners(). method is 'GRID' (cells of cell_size)
+    or 'KMEANS' (cluster_count clusters, derived from max_objects when 0). Clusters with more than
+    max_objects members are split at the median of their longest axis; 0 means no limit.
+    Returns a list of index arrays into the original object list.
+    """
+    import numpy as np
+    centers = (corners.min(axis=1) + corners.max(axis=1)) / 2
+    count = len(centers)
+    if method == 'GRID':
+        cells = np.floor(centers / max(cell_size, 1e-6)).astype(np.int64)
+        labels = np.unique(cells, axis=0, return_inverse=True)[1].reshape(-1)
+    else:
+        if cluster_count <= 0:
+            cluster_count = -(-count // max_objects) if max_objects > 0 else 1
+        labels = kmeans_labels(centers, min(cluster_count, count))
+
+    order = np.argsort(labels, kind='stable')
+    groups = np.split(order, np.flatnonzero(np.diff(labels[order])) + 1)
+    if max_objects <= 0:
+        return groups
+
+    clusters = []
+    while groups:
+        indices = groups.pop()
+        if len(indices) <= max_objects:
+            clusters.append(indices)
+            continue
+        points = centers[indices]
+        axis = np.ptp(points, axis=0).argmax()
+        indices = indices[np.argsort(points[:, axis], kind='stable')]
+        half = len(indices) // 2
+        groups.extend((indices[:half], indices[half:]))
+    clusters.reverse()
+    return clusters
+
+def kmeans_labels(points, k, iterations=20, seed=0):
+    """ Returns the k-means cluster label of each point, computed with vectorized Lloyd iterations. """
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    centers = points[rng.choice(len(points), size=k, replace=False)]
+    labels = None
+    for _ in range(iterations):
+        # Squared distances via |p|^2 - 2 p.c + |c|^2, an (N, k) matrix without a (N, k, 3) temporary
+        distances = (points * points).sum(axis=1)[:, None] - 2 * points @ centers.T + (centers * centers).sum(axis=1)
+        new_labels = distances.argmin(axis=1)
+        if labels is not None and np.array_equal(labels, new_labels):
+            break
+        labels = new_labels
+        counts = np.bincount(labels, minlength=k)
+        sums = np.stack([np.bincount(labels, weights=points[:, axis], minlength=k) for axis in range(3)], axis=1)
+        filled = counts > 0
+        centers[filled] = sums[filled] / counts[filled, None]
+    return labels
+
+def calculate_bounding_box(objects, exact=False, depsgraph=None):
+    """ Returns the world-space (min, max) corners enclosing all objects.
+
+    By default the bound_box corners of every object are transformed in one batched matmul. With
+    exact=True the evaluated vertex positions are used, which fits rotated meshes tightly.
+    """
+    import numpy as np
+    min_coords = np.full(3, np.inf)
+    max_coords = np.full(3, -np.inf)
+
+    if exact:
+        if depsgraph is None:
+            depsgraph = bpy.context.evaluated_depsgraph_get()
+        local_cache = {}
+        for obj in objects:
+            points = object_world_vertices(obj, depsgraph, local_cache)
+            if len(points):
+                min_coords = np.minimum(min_coords, points.min(axis=0))
+                max_coords = np.maximum(max_coords, points.max(axis=0))
+    elif objects:
+        corners = object_world_corners(objects)
+        min_coords = corners.min(axis=(0, 1))
+        max_coords = corners.max(axis=(0, 1))
+
+    return Vector(min_coords), Vector(max_coords)
+
+def object_world_corners(objects):
+    """ Returns the world-space bound_box corners of objects as an (N, 8, 3) array. """
+    import numpy as np
+    count = len(objects)
+    matrices = np.empty((count, 4, 4))
+    corners = np.empty((count, 8, 3))
+    for i, obj in enumerate(objects):
+        matrices[i] = obj.matrix_world
+        corners[i] = obj.bound_box
+
+    # Rotate/scale all corners in one batched matmul, then add each object's translation
+    return np.einsum('nij,nkj->nki', matrices[:, :3, :3], corners) + matrices[:, None, :3, 3]
+
+def object_world_vertices(obj, depsgraph, local_cache=None):
+    """ Returns the evaluated vertex positions of obj in world space as a (V, 3) array.
+
+    Objects without modifiers or shape keys evaluate to their mesh as is. With a local_cache dict such
+    objects read each shared mesh once and only the transform is applied per object.
+    """
+    import numpy as np
+    cacheable = local_cache is not None and not obj.modifiers and not obj.data.shape_keys
+    co = local_cache.get(obj.data.as_pointer()) if cacheable else None
+    if co is None:
+        co = evaluated_vertex_coords(obj, depsgraph)
+        if cacheable:
+            local_cache[obj.data.as_pointer()] = co
+
+    matrix = np.array(obj.matrix_world)
+    return co @ matrix[:3, :3].T + matrix[:3, 3]
+
+def evaluated_vertex_coords(obj, depsgraph):
+    """ Returns the evaluated vertex positions of obj in its local space as a (V, 3) float32 array. """
+    import numpy as np
+    obj_eval = obj.evaluated_get(depsgraph)
+    mesh = obj_eval.to_mesh()
+    try:
+        co = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+        mesh.vertices.foreach_get("co", co)
+    finally:
+        obj_eval.to_mesh_clear()
+    return co.reshape(-1, 3)
+
+def create_and_position_lattice(context, min_coords, max_coords, rotation=None, padding=0.0, points=None,
+                                name="Lattice"):
+    """ Creates a lattice object spanning min_coords..max_coords, not linked to any collection.
+
+    With rotation (a 3x3 array whose columns are the lattice axes) the bounds are given in that rotated
+    frame. padding grows the lattice by a fraction of its extents and points sets (points_u, points_v,
+    points_w).
+    """
+    # Create a new lattice object
+    lattice_data = bpy.data.lattices.new(name)
+    lattice = bpy.data.objects.new(name, lattice_data)
+
+    # Set the point counts once the lattice has an object, so Blender keeps the unit size
+    if points is not None:
+        lattice_data.points_u, lattice_data.points_v, lattice_data.points_w = points
+
+    # The default lattice is one unit across, so its scale is the size of the box it spans
+    center = (min_coords + max_coords) / 2
+    size = (max_coords - min_coords) * (1 + padding)
+    if rotation is None:
+        lattice.location = center
+        lattice.scale = size
+    else:
+        basis = Matrix(rotation.tolist())
+        lattice.matrix_world = Matrix.Translation(basis @ center) @ basis.to_4x4() @ Matrix.Diagonal(size).to_4x4()
 
     return lattice
 
+def get_managed_objects(scene):
+    """ Returns the managed objects of scene by dereferencing their pointers, skipping objects that were
+    deleted or unlinked from the scene since they were managed.
+
+    The source objects of instanced collections count as in the scene: managing an instancer manages
+    them (see expand_instances()), and scatter assets are usually not linked to the scene themselves.
+    """
+    # One pass over the scene rather than a name lookup per object, scene.objects has no name index
+    in_scene = set()
+    instancers = []
+    for obj in scene.objects:
+        in_scene.add(obj.as_pointer())
+        if obj.instance_type == 'COLLECTION' and obj.instance_collection is not None:
+            instancers.append(obj)
+    in_scene.update(obj.as_pointer() for obj in expand_instances(instancers))
+    return [item.object for item in scene.managed_objects
+            if item.object is not None and item.object.as_pointer() in in_scene]
+
+def migrate_managed_objects(scene):
+    """ Fills in the object pointer of managed objects stored by name only in older files. """
+    for item in scene.managed_objects:
+        if item.object is None and item.object_name:
+            item.object = scene.objects.get(item.object_name)
+
 def gather_lattice_modifiers(context):
-    """ Gathers all lattice modifiers by modifier name across managed objects without modifying props. """
+    """ Returns the cached lattice modifiers of the managed objects, keyed by modifier name.
+
+    The index is rebuilt only after it has been invalidated, so calling this from draw code is a
+    dictionary lookup rather than a walk over every managed object's modifier stack.
+    """
+    return scene_lattice_modifiers(context.scene)
+
+def scene_lattice_modifiers(scene):
+    """ Scene-level variant of gather_lattice_modifiers() for callers without a context. """
+    index = _lattice_index
+    if (not index["valid"] or index["scene"] != scene.as_pointer()
+            or index["object_count"] != len(bpy.data.objects)):
+        _rebuild_lattice_index(scene)
+    return index["lattices"]
+
+def _rebuild_lattice_index(scene):
+    """ Walks the managed objects' modifier stacks once and stores the result in the index. """
     lattice_modifiers = {}
-    managed_objects = [context.scene.objects[item.object_name] for item in context.scene.managed_objects if
-                       item.object_name in context.scene.objects]
-
-    for obj in managed_objects:
+    signatures = {}
+    for obj in get_managed_objects(scene):
+        signature = []
         for mod in obj.modifiers:
             if mod.type == 'LATTICE' and mod.object:
                 lattice_name = mod.name
+                signature.append((lattice_name, mod.object.as_pointer()))
                 if lattice_name not in lattice_modifiers:
                     lattice_modifiers[lattice_name] = {
                         "lattice_object": mod.object,
                         "strength_modifiers": [mod],
-                        "visible": not mod.object.hide_viewport
+                        "objects": [obj],
                     }
                 else:
                     lattice_modifiers[lattice_name]["strength_modifiers"].append(mod)
+                    lattice_modifiers[lattice_name]["objects"].append(obj)
+        signatures[obj.as_pointer()] = tuple(signature)
+
+    _lattice_index.update(
+        valid=True,
+        scene=scene.as_pointer(),
+        object_count=len(bpy.data.objects),
+        lattices=lattice_modifiers,
+        signatures=signatures,
+        data_lookup={},
+    )
 
-    return lattice_modifiers
+def lattice_signature(obj):
+    """ Returns the (modifier name, lattice pointer) pairs of an object's lattice modifiers. """
+    return tuple((mod.name, mod.object.as_pointer()) for mod in obj.modifiers
+                 if mod.type == 'LATTICE' and mod.object)
+
+def invalidate_lattice_index():
+    """ Marks the cached lattice modifier index as stale so the next lookup rebuilds it. """
+    _lattice_index["valid"] = False
+
+def invalidate_lattice_list_order():
+    """ Drops the cached order of LATTICE_UL_lattices. Loading, undo and redo replace lattice_data
+    without a sync, and the new data can have the pointer, generation and length the key was made of. """
+    _lattice_list_order["key"] = None
+
+def find_lattice_data(props, lattice_name):
+    """ Returns the lattice_data item for lattice_name, or None, using a cached name lookup. """
+    lookup = _lattice_index["data_lookup"]
+    i = lookup.get(lattice_name)
+    if i is None or i >= len(props.lattice_data) or props.lattice_data[i].lattice_name != lattice_name:
+        lookup.clear()
+        lookup.update((item.lattice_name, i) for i, item in enumerate(props.lattice_data))
+        i = lookup.get(lattice_name)
+        if i is None:
+            return None
+    return props.lattice_data[i]
 
 def update_lattice_data(context):
     """ Updates the lattice_data collection in props based on current lattice modifiers. """
-    props = context.scene.lattice_manager_props
-    props.lattice_data.clear()
-    lattice_modifiers = gather_lattice_modifiers(context)
-
+    invalidate_lattice_index()
+    sync_lattice_data(context.scene)
+
+def sync_lattice_data(scene):
+    """ Brings lattice_data and the managed objects' forward index in line with the lattice modifiers.
+
+    Only the difference is written: lattices that appeared are added, vanished ones removed and
+    renamed ones (same lattice object, new modifier name) renamed in place, so existing items and the
+    UI state attached to them survive. Unchanged items are not written at all.
+    """
+    props = scene.lattice_manager_props
+    lattice_modifiers = scene_lattice_modifiers(scene)
+
+    existing = {item.lattice_name: item for item in props.lattice_data}
+    vanished = {}
+    for lattice_name, item in existing.items():
+        if lattice_name not in lattice_modifiers and item.lattice_object is not None:
+            vanished.setdefault(item.lattice_object.as_pointer(), item)
+
+    _sync_state["syncing"] = True
+    try:
+        for lattice_name, data in lattice_modifiers.items():
+            lattice_data_item = existing.get(lattice_name)
+            if lattice_data_item is None:
+                lattice_data_item = vanished.pop(data["lattice_object"].as_pointer(), None)
+                if lattice_data_item is None:
+                    lattice_data_item = props.lattice_data.add()
+                lattice_data_item.lattice_name = lattice_name
+            if lattice_data_item.lattice_object != data["lattice_object"]:
+                lattice_data_item.lattice_object = data["lattice_object"]
+            uid = lattice_uid(data["lattice_object"])
+            if lattice_data_item.lattice_uid != uid:
+                lattice_data_item.lattice_uid = uid
+            # Reflect the strength of the existing modifiers without writing it back to them
+            first_mod = data["strength_modifiers"][0]
+            if lattice_data_item.strength != first_mod.strength:
+                lattice_data_item.strength = first_mod.strength
+            if [ref.object for ref in lattice_data_item.objects] != data["objects"]:
+                lattice_data_item.objects.clear()
+                for obj in data["objects"]:
+                    lattice_data_item.objects.add().object = obj
+                # Modifiers added outside the addon join the registry members here
+                register_lattice_members(data["lattice_object"], data["objects"])
+    finally:
+        _sync_state["syncing"] = False
+
+    for i in reversed(range(len(props.lattice_data))):
+        if props.lattice_data[i].lattice_name not in lattice_modifiers:
+            props.lattice_data.remove(i)
+
+    _lattice_index["generation"] += 1
+
+    # Forward index on the managed objects: the lattice modifiers each of them carries
+    lattice_names = {}
     for lattice_name, data in lattice_modifiers.items():
-        lattice_data_item = props.lattice_data.add()
-        lattice_data_item.lattice_name = lattice_name
-        # Set default strength or retrieve from existing modifiers
-        first_mod = data["strength_modifiers"][0]
-        lattice_data_item.strength = first_mod.strength
-
-def update_strength(context, lattice_name, strength_value):
-    """ Update the strength of all lattice modifiers with the given lattice_name. """
+        for obj in data["objects"]:
+            lattice_names.setdefault(obj.as_pointer(), []).append(lattice_name)
+    for item in scene.managed_objects:
+        obj = item.object
+        names = lattice_names.get(obj.as_pointer(), []) if obj is not None else []
+        if [mod_item.name for mod_item in item.lattice_modifiers] != names:
+            item.lattice_modifiers.clear()
+            for lattice_name in names:
+                item.lattice_modifiers.add().name = lattice_name
+
+def schedule_lattice_data_sync():
+    """ Syncs lattice_data from a timer, so a burst of depsgraph updates results in a single pass. """
+    if not bpy.app.timers.is_registered(_sync_lattice_data_timer):
+        bpy.app.timers.register(_sync_lattice_data_timer, first_interval=SYNC_DEBOUNCE_INTERVAL)
+
+def _sync_lattice_data_timer():
+    scene = bpy.context.scene
+    if scene is not None and scene.lattice_manager_props.is_managing:
+        sync_lattice_data(scene)
+    return None
+
+def _on_strength_changed(self, context):
+    if not _sync_state["syncing"]:
+        update_strength(context, self.lattice_name, self.strength)
+
+def lattice_modifier_candidates(context, modifier_name):
+    """ Returns the mesh objects that may have a modifier named modifier_name, without reading their stacks.
+
+    Managed lattices are resolved through the registry: the lattice_data item's uid gives the lattice
+    and its members the objects using it, so only the affected objects are touched. Members are
+    validated lazily: objects that were deleted since they joined are skipped here, the caller looks the
+    modifier up once and skips the ones that lost it. Unknown lattices fall back to the scene's meshes.
+    """
+    lattice_data_item = find_lattice_data(context.scene.lattice_manager_props, modifier_name)
+    lattice = lattice_data_lattice(lattice_data_item) if lattice_data_item is not None else None
+    if lattice is None:
+        return [obj for obj in context.scene.objects if obj.type == 'MESH']
+    return [ref.object for ref in lattice.lattice_registry.members
+            if ref.object is not None and ref.object.type == 'MESH']
+
+def objects_with_modifier(context, modifier_name):
+    """ Returns the mesh objects that have a modifier named modifier_name, see lattice_modifier_candidates(). """
+    return [obj for obj in lattice_modifier_candidates(context, modifier_name) if modifier_name in obj.modifiers]
+
+def _lattice_preview_entry(obj, modifier):
+    """ Returns the preview cache entry of obj, reading from Blender only what invalidate_lattice_preview()
+    dropped since it was cached. """
+    import numpy as np
+    from . import deform
+    mesh_key = obj.data.as_pointer()
+    coords = _preview["meshes"].get(mesh_key)
+    if coords is None:
+        coords = _preview["meshes"][mesh_key] = deform.mesh_coords(obj.data)
+
+    entry = _preview["objects"].get(obj.as_pointer())
+    if entry is None:
+        weights = None
+        if modifier.vertex_group:
+            weights = deform.vertex_group_weights(obj, modifier.vertex_group, modifier.invert_vertex_group)
+        entry = _preview["objects"][obj.as_pointer()] = {
+            "mesh": mesh_key,
+            "weights": weights,
+            "strength": modifier.strength,
+        }
+    if "displacement" not in entry:
+        lattice_key = modifier.object.as_pointer()
+        lattice = _preview["lattices"].get(lattice_key)
+        if lattice is None:
+            lattice = _preview["lattices"][lattice_key] = deform.lattice_state(modifier.object)
+        entry["matrix"] = np.array(obj.matrix_world)
+        entry["displacement"] = deform.object_displacement(coords, entry["matrix"], lattice)
+    return entry
+
+def lattice_preview_coords(entry, strength=None):
+    """ Returns the world-space vertices of a preview cache entry's object deformed by its lattice
+    modifier, as a (V, 3) array. Only reads the cache.
+
+    The deformation is computed by deform.py from the original mesh, so it matches the modifier when it
+    is first in the stack. strength comes from lattice_data, which follows a dragged slider immediately
+    while the modifier itself is only written every STRENGTH_PREVIEW_INTERVAL; None uses the modifier's.
+    """
+    from . import deform
+    displacement, blend = entry["displacement"]
+    strength = entry["strength"] if strength is None else strength
+    deformed = deform.apply_displacement(_preview["meshes"][entry["mesh"]], displacement, blend, strength,
+                                         entry["weights"])
+    matrix = entry["matrix"]
+    return deformed @ matrix[:3, :3].T + matrix[:3, 3]
+
+def start_lattice_preview(lattice_name):
+    stop_lattice_preview()
+    _preview["handler"] = bpy.types.SpaceView3D.draw_handler_add(_draw_lattice_preview, (), 'WINDOW', 'POST_VIEW')
+    _preview["lattice_name"] = lattice_name
+
+def stop_lattice_preview():
+    if _preview["handler"] is not None:
+        bpy.types.SpaceView3D.draw_handler_remove(_preview["handler"], 'WINDOW')
+    _preview["handler"] = None
+    _preview["lattice_name"] = ""
+    clear_lattice_preview()
+
+def clear_lattice_preview():
+    """ Drops everything the preview cached, the next draw reads it again. """
+    _preview["objects"].clear()
+    _preview["meshes"].clear()
+    _preview["lattices"].clear()
+    _preview["batch"] = None
+    _preview["valid"] = False
+
+def invalidate_lattice_preview(depsgraph):
+    """ Drops the preview data that the updates in depsgraph make stale.
+
+    A geometry update of a previewed object (mesh edit, weight paint, modifier change) drops its coords
+    and weights, a transform only its displacement, and any update of a lattice all displacements. Other
+    objects and collection changes only mark the batch stale, as they may add or remove objects using
+    the lattice.
+    """
+    if _preview["handler"] is None:
+        return
+    objects = _preview["objects"]
+    if depsgraph.id_type_updated('COLLECTION'):
+        _preview["valid"] = False
+    for update in depsgraph.updates:
+        if isinstance(update.id, bpy.types.Mesh):
+            if _drop_preview_mesh(update.id.original.as_pointer()):
+                _preview["valid"] = False
+            continue
+        if not isinstance(update.id, bpy.types.Object):
+            continue
+        key = update.id.original.as_pointer()
+        entry = objects.get(key)
+        if _preview["lattices"].pop(key, None) is not None:
+            for other in objects.values():
+                other.pop("displacement", None)
+        elif entry is not None and update.is_updated_geometry:
+            del objects[key]
+            _drop_preview_mesh(entry["mesh"])
+        elif entry is not None and update.is_updated_transform:
+            entry.pop("displacement", None)
+        elif entry is None and not update.is_updated_geometry:
+            continue
+        _preview["valid"] = False
+
+def _drop_preview_mesh(mesh_key):
+    """ Drops the cached coords of a mesh and the displacements computed from them, returns whether the
+    preview had them. """
+    if _preview["meshes"].pop(mesh_key, None) is None:
+        return False
+    for entry in _preview["objects"].values():
+        if entry["mesh"] == mesh_key:
+            entry.pop("displacement", None)
+    return True
+
+def _draw_lattice_preview():
+    import gpu
+    import numpy as np
+    from gpu_extras.batch import batch_for_shader
+
+    context = bpy.context
+    lattice_name = _preview["lattice_name"]
+    lattice_data_item = find_lattice_data(context.scene.lattice_manager_props, lattice_name)
+    strength = lattice_data_item.strength if lattice_data_item is not None else None
+    shader = gpu.shader.from_builtin('UNIFORM_COLOR')
+    if not _preview["valid"] or strength != _preview["strength"]:
+        if not _preview["valid"]:
+            gather_lattice_preview(context, lattice_name)
+        # A strength change alone only blends the cached displacements again
+        coords = [lattice_preview_coords(entry, strength) for entry in _preview["objects"].values()]
+        _preview["batch"] = None
+        if coords:
+            _preview["batch"] = batch_for_shader(shader, 'POINTS',
+                                                 {"pos": np.concatenate(coords).astype(np.float32)})
+        _preview["strength"] = strength
+    if _preview["batch"] is None:
+        return
+
+    shader.uniform_float("color", PREVIEW_COLOR)
+    gpu.state.point_size_set(PREVIEW_POINT_SIZE)
+    _preview["batch"].draw(shader)
+
+def gather_lattice_preview(context, lattice_name):
+    """ Fills the preview cache for the objects using lattice_name, keeping the entries that are still
+    valid. Objects and meshes that stopped using the lattice are dropped. """
+    objects = _preview["objects"]
+    meshes = _preview["meshes"]
+    _preview["objects"] = {}
+    _preview["meshes"] = {}
+    for obj in objects_with_modifier(context, lattice_name):
+        modifier = obj.modifiers[lattice_name]
+        if modifier.type != 'LATTICE' or modifier.object is None or modifier.object.type != 'LATTICE':
+            continue
+        entry = objects.get(obj.as_pointer())
+        if entry is not None:
+            _preview["objects"][obj.as_pointer()] = entry
+            if entry["mesh"] in meshes:
+                _preview["meshes"][entry["mesh"]] = meshes[entry["mesh"]]
+        _lattice_preview_entry(obj, modifier)
+    _preview["valid"] = True
+
+def apply_lattice_modifier_batch(context, objects, modifier_name, results=None, shared=False):
+    """ Applies modifier_name on objects, see apply_lattice_modifiers_batch(). """
+    return apply_lattice_modifiers_batch(context, objects, [modifier_name], results, shared)
+
+def apply_lattice_modifiers_batch(context, objects, lattice_names=None, results=None, shared=False):
+    """ Applies the lattice modifiers named in lattice_names (all of them when None) on objects and
+    returns the (applied, failed) object lists.
+
+    Instead of one bpy.ops call per object and modifier, every other modifier in the batch is muted,
+    the depsgraph is evaluated once and each result, carrying all of an object's applied lattices in
+    stack order, is copied into a new mesh with bpy.data.meshes.new_from_object. Objects that share a
+    mesh, transform and lattice settings get the same result, so each of those datablocks is evaluated
+    only once; pass the same results dict to reuse them across batches. With shared=True the transform
+    is left out of that key: a shared mesh is deformed once, as its first object sees the lattices, and
+    all its users are relinked to the result, so the data stays shared instead of becoming single-user.
+    Meshes with shape keys fall back to bpy.ops.
+    """
+    return apply_lattice_modifier_rows(context, lattice_modifier_table(objects, lattice_names), results, shared)
+
+def apply_lattice_modifier_rows(context, rows, results=None, shared=False):
+    """ Applies the lattice modifiers of rows as returned by lattice_modifier_table(), so callers that
+    already read the stacks do not look the modifiers up again.
+
+    Lattice modifiers hidden in the viewport, by the user or by a baked cache, are shown for the
+    evaluation: applying one bakes its deformation rather than dropping it.
+    """
+    if results is None:
+        results = {}
+    applied = []
+    failed = []
+    targets = []
+    released = []
+    for obj, lattice_mods, other_mods in rows:
+        if obj.data.shape_keys:
+            for mod in lattice_mods:
+                lattice = mod.object
+                shown = mod.show_viewport
+                # modifier_apply refuses modifiers that are disabled in the viewport
+                mod.show_viewport = True
+                if not _apply_modifier_with_operator(context, obj, mod.name):
+                    mod.show_viewport = shown
+                    failed.append(obj)
+                    break
+                released.append((lattice, obj))
+            else:
+                applied.append(obj)
+        else:
+            targets.append((obj, lattice_mods, other_mods))
+    if not targets:
+        unregister_lattice_members(released)
+        return applied, failed
+
+    keys = []
+    for obj, lattice_mods, _ in targets:
+        placement = () if shared else tuple(v for row in obj.matrix_world for v in row)
+        settings = tuple((mod.object.as_pointer() if mod.object else 0, mod.strength, mod.vertex_group)
+                         for mod in lattice_mods)
+        keys.append((obj.data.as_pointer(), placement, settings))
+
+    # Mute every other modifier so the evaluated mesh only carries the ones being applied. Objects
+    # whose result comes from another object are muted entirely, the depsgraph does not deform them.
+    muted = []
+    evaluated = set(results)
+    for (obj, lattice_mods, other_mods), key in zip(targets, keys):
+        shown = key not in evaluated
+        for mod in lattice_mods:
+            if mod.show_viewport != shown:
+                mod.show_viewport = shown
+        evaluated.add(key)
+        for other in other_mods:
+            if other.show_viewport:
+                other.show_viewport = False
+                muted.append(other)
+    depsgraph = context.evaluated_depsgraph_get()
+
+    for (obj, lattice_mods, _), key in zip(targets, keys):
+        mesh = results.get(key)
+        if mesh is None:
+            mesh = bpy.data.meshes.new_from_object(obj.evaluated_get(depsgraph))
+            results[key] = mesh
+        old_mesh = obj.data
+        obj.data = mesh
+        for mod in lattice_mods:
+            released.append((mod.object, obj))
+            obj.modifiers.remove(mod)
+        if old_mesh.users == 0:
+            # The applied mesh takes over the name once nothing uses the original any more
+            name = old_mesh.name
+            bpy.data.meshes.remove(old_mesh)
+            mesh.name = name
+        applied.append(obj)
+
+    for other in muted:
+        other.show_viewport = True
+    unregister_lattice_members(released)
+    return applied, failed
+
+def _apply_modifier_with_operator(context, obj, modifier_name):
+    with context.temp_override(object=obj, active_object=obj):
+        try:
+            bpy.ops.object.modifier_apply(modifier=modifier_name)
+        except RuntimeError:
+            return False
+    return True
+
+def update_strength(context, lattice_name, strength_value, immediate=False):
+    """ Update the strength of all lattice modifiers with the given lattice_name.
+
+    Slider drags fire this on every tick, so values are queued and written by a timer at most once
+    every STRENGTH_PREVIEW_INTERVAL seconds. Each flush writes the latest queued value per lattice,
+    which means the value at release is always the one that ends up on the modifiers.
+    """
+    _pending_strength[lattice_name] = strength_value
+    if immediate or bpy.app.background:
+        flush_pending_strength(context)
+    elif not bpy.app.timers.is_registered(_flush_pending_strength_timer):
+        bpy.app.timers.register(_flush_pending_strength_timer, first_interval=STRENGTH_PREVIEW_INTERVAL)
+
+def flush_pending_strength(context):
+    """ Writes queued strength values to the cached modifiers, skipping ones that already match. """
+    if not _pending_strength:
+        return
     lattice_modifiers = gather_lattice_modifiers(context)
-    if lattice_name in lattice_modifiers:
-        for mod in lattice_modifiers[lattice_name]["strength_modifiers"]:
-            mod.strength = strength_value
+    pending = list(_pending_strength.items())
+    _pending_strength.clear()
+    for lattice_name, strength_value in pending:
+        data = lattice_modifiers.get(lattice_name)
+        if data is None:
+            continue
+        for mod in data["strength_modifiers"]:
+            # Writing an unchanged value would still tag the object for re-evaluation
+            if mod.strength != strength_value:
+                mod.strength = strength_value
+
+def _flush_pending_strength_timer():
+    flush_pending_strength(bpy.context)
+    return None
+
+def save_strength_preset(props, preset_name):
+    """ Stores the strength of every lattice in lattice_data under preset_name, replacing a preset of
+    the same name. """
+    preset = props.strength_presets.get(preset_name)
+    if preset is None:
+        preset = props.strength_presets.add()
+        preset.name = preset_name
+    preset.values.clear()
+    for lattice_data_item in props.lattice_data:
+        value = preset.values.add()
+        value.lattice_name = lattice_data_item.lattice_name
+        value.lattice_object = lattice_data_item.lattice_object
+        value.strength = lattice_data_item.strength
+    return preset
+
+def preset_strengths(props, preset):
+    """ Returns the preset's strengths keyed by the current modifier names of its lattices. """
+    names = {item.lattice_object.as_pointer(): item.lattice_name
+             for item in props.lattice_data if item.lattice_object is not None}
+    strengths = {}
+    for value in preset.values:
+        lattice_name = value.lattice_name
+        if value.lattice_object is not None:
+            lattice_name = names.get(value.lattice_object.as_pointer(), lattice_name)
+        strengths[lattice_name] = value.strength
+    return strengths
+
+def apply_strength_preset(context, preset):
+    """ Sets every lattice in the preset to its stored strength in one pass over the cached modifiers
+    and returns the strengths by lattice name. """
+    props = context.scene.lattice_manager_props
+    strengths = preset_strengths(props, preset)
+    # Update the sliders without each of them queueing its own write
+    _sync_state["syncing"] = True
+    try:
+        for lattice_data_item in props.lattice_data:
+            strength_value = strengths.get(lattice_data_item.lattice_name)
+            if strength_value is not None and lattice_data_item.strength != strength_value:
+                lattice_data_item.strength = strength_value
+    finally:
+        _sync_state["syncing"] = False
+    _pending_strength.update(strengths)
+    flush_pending_strength(context)
+    return strengths
+
+def keyframe_strength_preset(context, preset, frame):
+    """ Applies the preset and keys it on all affected modifiers at frame, returning the number keyed. """
+    strengths = apply_strength_preset(context, preset)
+    lattice_modifiers = gather_lattice_modifiers(context)
+    keys = []
+    for lattice_name, strength_value in strengths.items():
+        data = lattice_modifiers.get(lattice_name)
+        if data is not None:
+            keys.extend((obj, lattice_name, strength_value) for obj in data["objects"])
+    keyframe_modifier_strengths(keys, frame)
+    return len(keys)
+
+def keyframe_modifier_strengths(keys, frame):
+    """ Inserts a strength keyframe at frame for each (object, modifier name, value) in keys.
+
+    keyframe_insert() resolves the data path and updates the animation system once per call. Here each
+    F-curve's keyframe arrays are read and written whole with foreach_get/foreach_set and the handles
+    recalculated once, and an existing key on frame is moved to the new value instead.
+    """
+    import numpy as np
+    attributes = ("co", "handle_left", "handle_right")
+    for obj, modifier_name, strength_value in keys:
+        fcurve = modifier_strength_fcurve(obj, modifier_name)
+        points = fcurve.keyframe_points
+        count = len(points)
+        arrays = {}
+        for attribute in attributes:
+            array = np.empty(count * 2, dtype=np.float32)
+            points.foreach_get(attribute, array)
+            arrays[attribute] = array.reshape(-1, 2)
+
+        existing = np.flatnonzero(arrays["co"][:, 0] == frame)
+        if existing.size:
+            i = existing[0]
+            delta = strength_value - arrays["co"][i, 1]
+            for attribute in attributes:
+                arrays[attribute][i, 1] += delta
+        else:
+            points.add(1)
+            for attribute in attributes:
+                arrays[attribute] = np.append(arrays[attribute], [[frame, strength_value]], axis=0)
+
+        for attribute in attributes:
+            points.foreach_set(attribute, arrays[attribute].ravel())
+        # Sorts the new key into place and recalculates the automatic handles
+        fcurve.update()
+
+def modifier_strength_fcurve(obj, modifier_name):
+    """ Returns the F-curve animating a modifier's strength, creating the action and curve if needed. """
+    data_path = f'modifiers["{bpy.utils.escape_identifier(modifier_name)}"].strength'
+    fcurves = object_action_fcurves(obj)
+    return fcurves.find(data_path) or fcurves.new(data_path)
+
+def object_action_fcurves(obj):
+    """ Returns the F-curve collection of obj's action, for both legacy and layered actions. """
+    anim_data = obj.animation_data or obj.animation_data_create()
+    action = anim_data.action
+    if action is None:
+        action = bpy.data.actions.new(f"{obj.name}Action")
+        anim_data.action = action
+    if not hasattr(action, "layers"):
+        return action.fcurves
+
+    # Blender 4.4+ keeps F-curves in a channelbag per slot, and 5.0 dropped action.fcurves
+    from bpy_extras import anim_utils
+    if anim_data.action_slot is None:
+        suitable = anim_data.action_suitable_slots
+        anim_data.action_slot = suitable[0] if suitable else action.slots.new(id_type='OBJECT', name=obj.name)
+    return anim_utils.action_ensure_channelbag_for_slot(action, anim_data.action_slot).fcurves
+
+# Lattice caches
+def bake_lattice_cache(context, objects, lattice_name, frame_start, frame_end, directory, batch_size=BAKE_BATCH_SIZE,
+                       progress=None):
+    """ Bakes each object's stack up to its lattice_name modifier over the frame range to a PC2 file in
+    directory and swaps a Mesh Cache modifier in for the lattice modifier. Returns (baked, failed).
+
+    Objects are processed batch_size at a time, each batch stepping through the frames once with its
+    caches memory-mapped, so memory does not grow with the shot length. Modifiers after the lattice
+    modifier are hidden while baking and keep running live on top of the cache. Objects whose vertex
+    count changes between frames fail and keep their live modifier, objects already baked for the
+    lattice are skipped. progress, when given, is called with the number of objects done after each
+    batch.
+    """
+    from . import pointcache
+    scene = context.scene
+    frame_current = scene.frame_current
+    directory = bpy.path.abspath(directory)
+    sample_count = frame_end - frame_start + 1
+    objects = [obj for obj in objects
+               if lattice_name in obj.modifiers and lattice_cache_state(obj, lattice_name) is None]
+    baked = []
+    failed = []
+    taken = set()
+    try:
+        for first in range(0, len(objects), batch_size):
+            batch = objects[first:first + batch_size]
+            filepaths = {obj.as_pointer(): lattice_cache_filepath(directory, obj, lattice_name, taken) for obj in batch}
+            caches = {}
+            hidden = []
+            for obj in batch:
+                index = obj.modifiers.find(lattice_name)
+                for mod in list(obj.modifiers)[index + 1:]:
+                    if mod.show_viewport:
+                        mod.show_viewport = False
+                        hidden.append(mod)
+            try:
+                for sample, frame in enumerate(range(frame_start, frame_end + 1)):
+                    scene.frame_set(frame)
+                    depsgraph = context.evaluated_depsgraph_get()
+                    for obj in batch:
+                        key = obj.as_pointer()
+                        if sample > 0 and key not in caches:
+                            continue
+                        co = evaluated_vertex_coords(obj, depsgraph)
+                        if sample == 0:
+                            caches[key] = pointcache.create_pc2(filepaths[key], len(co), sample_count, frame_start)
+                        elif caches[key].shape[1] != len(co):
+                            del caches[key]
+                            os.remove(filepaths[key])
+                            continue
+                        caches[key][sample] = co
+            finally:
+                for mod in hidden:
+                    mod.show_viewport = True
+                for cache in caches.values():
+                    cache.flush()
+
+            for obj in batch:
+                if obj.as_pointer() in caches:
+                    swap_in_lattice_cache(obj, lattice_name, filepaths[obj.as_pointer()], frame_start, frame_end)
+                    baked.append(obj)
+                else:
+                    failed.append(obj)
+            caches.clear()
+            if progress is not None:
+                progress(first + len(batch))
+    finally:
+        scene.frame_set(frame_current)
+
+    if baked:
+        set_lattice_bake_state(context.scene.lattice_manager_props, lattice_name, 'CACHE')
+    return baked, failed
+
+def lattice_cache_filepath(directory, obj, lattice_name, taken):
+    """ Returns a path in directory for obj's lattice_name cache that is neither an existing file nor in
+    taken, and adds it to taken.
+
+    Cleaning the names is not one-to-one ("Cube.001" and "Cube_001" give the same name, so do "A_B" + "C"
+    and "A" + "B_C"), so a counter is appended until the path is free. Files of other objects or of
+    another bake into the same directory are never overwritten.
+    """
+    name = bpy.path.clean_name(f"{obj.name}_{lattice_name}")
+    filepath = os.path.join(directory, name + ".pc2")
+    counter = 1
+    while filepath in taken or os.path.exists(filepath):
+        filepath = os.path.join(directory, f"{name}_{counter}.pc2")
+        counter += 1
+    taken.add(filepath)
+    return filepath
+
+def swap_in_lattice_cache(obj, lattice_name, filepath, frame_start, frame_end):
+    """ Adds a Mesh Cache modifier reading filepath right after the lattice_name modifier, hides the
+    lattice modifier and records both in the object's BAKE_PROPERTY. """
+    lattice_mod = obj.modifiers[lattice_name]
+    cache_mod = obj.modifiers.new(name=f"{lattice_name} Cache", type='MESH_CACHE')
+    cache_mod.cache_format = 'PC2'
+    cache_mod.filepath = bpy.path.relpath(filepath) if bpy.data.filepath else filepath
+    # Cache sample 0 plays at frame_start, the cache overwrites the positions the stack had so far
+    cache_mod.play_mode = 'SCENE'
+    cache_mod.time_mode = 'FRAME'
+    cache_mod.frame_start = frame_start
+    cache_mod.frame_scale = 1.0
+    cache_mod.deform_mode = 'OVERWRITE'
+    cache_mod.forward_axis = 'POS_Y'
+    cache_mod.up_axis = 'POS_Z'
+    obj.modifiers.move(len(obj.modifiers) - 1, obj.modifiers.find(lattice_name) + 1)
+
+    if BAKE_PROPERTY not in obj:
+        obj[BAKE_PROPERTY] = {}
+    obj[BAKE_PROPERTY][lattice_name] = {
+        "modifier": cache_mod.name,
+        "filepath": filepath,
+        "frame_start": frame_start,
+        "frame_end": frame_end,
+        "show_viewport": lattice_mod.show_viewport,
+        "show_render": lattice_mod.show_render,
+    }
+    lattice_mod.show_viewport = False
+    lattice_mod.show_render = False
+
+def lattice_cache_state(obj, lattice_name):
+    """ Returns the bake record of obj's lattice_name modifier, None when it is not baked. """
+    bakes = obj.get(BAKE_PROPERTY)
+    return bakes.get(lattice_name) if bakes is not None else None
+
+def set_lattice_cache_enabled(context, objects, lattice_name, use_cache):
+    """ Switches baked objects between their cache modifier and the live lattice modifier, returns the
+    number of objects switched. """
+    count = 0
+    for obj in objects:
+        state = lattice_cache_state(obj, lattice_name)
+        cache_mod = obj.modifiers.get(state["modifier"]) if state is not None else None
+        lattice_mod = obj.modifiers.get(lattice_name)
+        if cache_mod is None or lattice_mod is None:
+            continue
+        cache_mod.show_viewport = cache_mod.show_render = use_cache
+        lattice_mod.show_viewport = False if use_cache else state["show_viewport"]
+        lattice_mod.show_render = False if use_cache else state["show_render"]
+        count += 1
+    if count:
+        set_lattice_bake_state(context.scene.lattice_manager_props, lattice_name, 'CACHE' if use_cache else 'LIVE')
+    return count
+
+def free_lattice_cache(context, objects, lattice_name, delete_files=True):
+    """ Removes the cache modifiers of lattice_name from objects, restores the lattice modifiers and
+    deletes the cache files. Returns the number of objects freed. """
+    count = 0
+    for obj in objects:
+        state = lattice_cache_state(obj, lattice_name)
+        if state is None:
+            continue
+        set_lattice_cache_enabled(context, [obj], lattice_name, False)
+        cache_mod = obj.modifiers.get(state["modifier"])
+        if cache_mod is not None:
+            obj.modifiers.remove(cache_mod)
+        if delete_files and os.path.exists(state["filepath"]):
+            os.remove(state["filepath"])
+        del obj[BAKE_PROPERTY][lattice_name]
+        if not obj[BAKE_PROPERTY]:
+            del obj[BAKE_PROPERTY]
+        count += 1
+    set_lattice_bake_state(context.scene.lattice_manager_props, lattice_name, 'NONE')
+    return count
+
+def set_lattice_bake_state(props, lattice_name, state):
+    lattice_data_item = find_lattice_data(props, lattice_name)
+    if lattice_data_item is not None and lattice_data_item.bake_state != state:
+        lattice_data_item.bake_state = state
+
+# Lattice point snapshots
+def snapshot_store():
+    """ Returns the snapshots module, importing it on the first call and pointing it at the open file's
+    sidecar and the scene's memory limit. """
+    if _snapshot_store["module"] is None:
+        from . import snapshots
+        _snapshot_store["module"] = snapshots
+        _configure_snapshot_store()
+    return _snapshot_store["module"]
+
+def _configure_snapshot_store():
+    snapshots = _snapshot_store["module"]
+    if snapshots is None:
+        # Set up by snapshot_store() once it is needed
+        return
+    snapshots.set_sidecar(snapshots.sidecar_path(bpy.data.filepath))
+    snapshots.set_memory_limit(bpy.context.scene.lattice_manager_props.snapshot_memory_limit * 1024 * 1024)
+
+def lattice_snapshot_key(lattice, snapshot_name):
+    """ Returns the snapshots module key of a lattice object's snapshot, keyed by its registry uid so
+    snapshots follow the lattice through renames. """
+    return snapshot_store().snapshot_key(lattice_uid(lattice), snapshot_name)
+
+def lattice_points(lattice):
+    """ Returns the deformed point positions of a lattice object as a (P, 3) float32 array. """
+    import numpy as np
+    points = np.empty(len(lattice.data.points) * 3, dtype=np.float32)
+    lattice.data.points.foreach_get("co_deform", points)
+    return points.reshape(-1, 3)
+
+def take_lattice_snapshot(lattice_data_item, snapshot_name):
+    """ Snapshots the points of a lattice_data item's lattice with one foreach_get, replacing a snapshot of
+    the same name. Returns the LatticeSnapshot, or None when the item has no lattice object. """
+    lattice = lattice_data_lattice(lattice_data_item)
+    if lattice is None:
+        return None
+    points = snapshot_store().put(lattice_snapshot_key(lattice, snapshot_name), lattice_points(lattice))
+
+    snapshot = lattice_data_item.snapshots.get(snapshot_name)
+    if snapshot is None:
+        snapshot = lattice_data_item.snapshots.add()
+        snapshot.name = snapshot_name
+    snapshot.point_count = len(points)
+    snapshot.created = time.time()
+    return snapshot
+
+def restore_lattice_snapshot(lattice_data_item, snapshot_name, factor=1.0, blend_from=""):
+    """ Moves the lattice's points factor of the way to a snapshot, starting at the snapshot blend_from or
+    the current points, with one foreach_set. Returns False when a snapshot is missing or was taken with a
+    different point count. """
+    lattice = lattice_data_lattice(lattice_data_item)
+    if lattice is None or snapshot_name not in lattice_data_item.snapshots:
+        return False
+    snapshots = snapshot_store()
+    target = snapshots.get(lattice_snapshot_key(lattice, snapshot_name))
+    point_count = len(lattice.data.points)
+    if target is None or len(target) != point_count:
+        return False
+
+    if factor == 1.0:
+        base = None
+    elif blend_from:
+        base = snapshots.get(lattice_snapshot_key(lattice, blend_from))
+        if base is None or len(base) != point_count:
+            return False
+    else:
+        base = lattice_points(lattice)
+
+    lattice.data.points.foreach_set("co_deform", snapshots.blend(base, target, factor).ravel())
+    lattice.data.update_tag()
+    return True
+
+def remove_lattice_snapshot(lattice_data_item, snapshot_name):
+    i = lattice_data_item.snapshots.find(snapshot_name)
+    if i < 0:
+        return
+    lattice_data_item.snapshots.remove(i)
+    lattice = lattice_data_lattice(lattice_data_item)
+    if lattice is not None:
+        snapshot_store().remove(lattice_snapshot_key(lattice, snapshot_name))
+
+def save_lattice_snapshots(blend_filepath):
+    """ Writes the snapshots listed in every scene's lattice_data to the sidecar of blend_filepath. """
+    listed = []
+    for scene in bpy.data.scenes:
+        for item in scene.lattice_manager_props.lattice_data:
+            lattice = lattice_data_lattice(item) if item.snapshots else None
+            if lattice is not None:
+                listed.extend((lattice, snapshot.name) for snapshot in item.snapshots)
+    if not listed and _snapshot_store["module"] is None:
+        # No snapshot was listed or touched since the file was opened, the sidecar is left as it is
+        return 0
+    snapshots = snapshot_store()
+    keys = [lattice_snapshot_key(lattice, snapshot_name) for lattice, snapshot_name in listed]
+    filepath = snapshots.sidecar_path(blend_filepath)
+    if keys or os.path.exists(filepath):
+        snapshots.save(filepath, keys)
+    return len(keys)
+
+# Handlers
+@persistent
+def _on_depsgraph_update_post(scene, depsgraph):
+    """ Invalidates the lattice index and schedules a lattice_data sync when an update changes a
+    managed object's lattice modifiers, including edits made outside the addon. """
+    invalidate_lattice_preview(depsgraph)
+    index = _lattice_index
+    if not scene.lattice_manager_props.is_managing:
+        return
+    if not index["valid"]:
+        # Nothing has looked at the scene since the last invalidation, lattice_data may be stale
+        schedule_lattice_data_sync()
+        return
+    if depsgraph.id_type_updated('COLLECTION'):
+        invalidate_lattice_index()
+        schedule_lattice_data_sync()
+        return
+    signatures = index["signatures"]
+    for update in depsgraph.updates:
+        if not isinstance(update.id, bpy.types.Object):
+            continue
+        obj = update.id.original
+        signature = signatures.get(obj.as_pointer())
+        if signature is not None and signature != lattice_signature(obj):
+            invalidate_lattice_index()
+            schedule_lattice_data_sync()
+            return
+
+@persistent
+def _on_file_changed(*args):
+    """ Drops the lattice index whenever Blender replaces the scene data (load, undo, redo). """
+    invalidate_lattice_index()
+    invalidate_lattice_list_order()
+    invalidate_lattice_registry()
+    clear_lattice_preview()
+
+@persistent
+def _on_load_post(*args):
+    invalidate_lattice_index()
+    invalidate_lattice_list_order()
+    invalidate_lattice_registry()
+    clear_lattice_preview()
+    props = bpy.context.scene.lattice_manager_props
+    instrumentation.set_enabled(props.profiling_enabled)
+    _configure_snapshot_store()
+    for scene in bpy.data.scenes:
+        migrate_managed_objects(scene)
+
+@persistent
+def _on_save_post(*args):
+    # bpy.data.filepath rather than the saved path, a saved copy leaves the open file's sidecar in use
+    save_lattice_snapshots(bpy.data.filepath)
+
+def _migrate_open_file():
+    # bpy.data is not accessible while the addon registers, so the file that is already open is
+    # migrated from a timer right after
+    _on_load_post()
+    return None
+
+_handlers = (
+    ("depsgraph_update_post", _on_depsgraph_update_post),
+    ("load_post", _on_load_post),
+    ("save_post", _on_save_post),
+    ("undo_post", _on_file_changed),
+    ("redo_post", _on_file_changed),
+)
+
+def register_handlers():
+    for handler_name, handler in _handlers:
+        handler_list = getattr(bpy.app.handlers, handler_name)
+        if handler not in handler_list:
+            handler_list.append(handler)
+    if not bpy.app.timers.is_registered(_migrate_open_file):
+        bpy.app.timers.register(_migrate_open_file, first_interval=0.0)
+
+def unregister_handlers():
+    for handler_name, handler in _handlers:
+        handler_list = getattr(bpy.app.handlers, handler_name)
+        if handler in handler_list:
+            handler_list.remove(handler)
+    for timer in (_flush_pending_strength_timer, _sync_lattice_data_timer):
+        if bpy.app.timers.is_registered(timer):
+            bpy.app.timers.unregister(timer)
+    _pending_strength.clear()
+    stop_lattice_preview()
+    instrumentation.set_enabled(False)
+    invalidate_lattice_index()
+    invalidate_lattice_registry()
@@ -0,0 +1,43 @@
+""" Reading and writing PC2 point caches through memory maps.
+
+PC2 is the format of Blender's Mesh Cache modifier: a 32 byte header followed by float32 positions
+for every sample, point by point. The positions are memory-mapped, so a bake writes each sample straight
+into the file and the operating system decides how much of it stays in memory. Nothing here imports bpy.
+"""
+
+import os
+
+import numpy as np
+
+HEADER = np.dtype([
+    ("signature", "S12"),
+    ("version", "<i4"),
+    ("points", "<i4"),
+    ("start_frame", "<f4"),
+    ("sample_rate", "<f4"),
+    ("samples", "<i4"),
+])
+
+SIGNATURE = b"POINTCACHE2"
+
+
+def create_pc2(filepath, point_count, sample_count, start_frame=0.0, sample_rate=1.0):
+    """ Creates a PC2 file for sample_count samples of point_count points and returns its writable
+    (samples, points, 3) memory map, zero filled. Flush or drop the map to finish the file. """
+    os.makedirs(os.path.dirname(os.path.abspath(filepath)), exist_ok=True)
+    positions = np.memmap(filepath, dtype="<f4", mode="w+", offset=HEADER.itemsize,
+                          shape=(sample_count, point_count, 3))
+    header = np.array([(SIGNATURE, 1, point_count, start_frame, sample_rate, sample_count)], dtype=HEADER)
+    with open(filepath, "r+b") as f:
+        f.write(header.tobytes())
+    return positions
+
+
+def read_pc2(filepath):
+    """ Returns (header, positions) of a PC2 file, positions as a read-only (samples, points, 3) map. """
+    header = np.fromfile(filepath, dtype=HEADER, count=1)[0]
+    if header["signature"] != SIGNATURE:
+        raise ValueError(f"{filepath} is not a PC2 file")
+    positions = np.memmap(filepath, dtype="<f4", mode="r", offset=HEADER.itemsize,
+                          shape=(int(header["samples"]), int(header["points"]), 3))
+    return header, positions
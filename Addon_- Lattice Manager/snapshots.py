@@ -0,0 +1,160 @@
+""" Compact storage for lattice point snapshots.
+
+A snapshot is a lattice's deformed point positions as a float32 (P, 3) array, stored under a key
+naming the lattice and the snapshot. Snapshots are kept in memory up to a byte budget, least recently
+used evicted first, and written to an .npz sidecar next to the .blend file when it is saved. Evicted
+snapshots are spilled to the sidecar (when the file has a path) and read back when next needed; only
+snapshots of a file that was never saved are lost to eviction. Nothing here imports bpy.
+"""
+
+import os
+import warnings
+import zipfile
+from collections import OrderedDict
+
+import numpy as np
+
+# Default byte budget of the snapshots held in memory
+MEMORY_LIMIT = 64 * 1024 * 1024
+
+# Appended to the .blend file's name, without extension, to name its sidecar
+SIDECAR_SUFFIX = "_lattice_snapshots.npz"
+
+# Snapshot arrays by key, least recently used first
+_store = OrderedDict()
+
+_state = {
+    "bytes": 0,
+    "limit": MEMORY_LIMIT,
+    "sidecar": "",
+    # Keys whose current array is not in the sidecar yet
+    "unsaved": set(),
+}
+
+
+def snapshot_key(lattice_uid, snapshot_name):
+    return f"{lattice_uid}/{snapshot_name}"
+
+
+def sidecar_path(blend_filepath):
+    """ Returns the sidecar path belonging to a .blend file, "" for a file that was never saved. """
+    if not blend_filepath:
+        return ""
+    return os.path.splitext(blend_filepath)[0] + SIDECAR_SUFFIX
+
+
+def set_sidecar(filepath):
+    """ Switches to the sidecar of another file, dropping the snapshots held for the previous one. """
+    if filepath != _state["sidecar"]:
+        clear()
+        _state["sidecar"] = filepath
+
+
+def put(key, points):
+    """ Stores a copy of points (P * 3 values) under key as float32, replacing an earlier snapshot. """
+    points = np.array(points, dtype=np.float32).reshape(-1, 3)
+    _discard(key)
+    _store[key] = points
+    _state["bytes"] += points.nbytes
+    _state["unsaved"].add(key)
+    _evict()
+    return points
+
+
+def get(key):
+    """ Returns the (P, 3) float32 snapshot stored under key, or None. Evicted snapshots are read back
+    from the sidecar and become the most recently used. Callers must not modify the array. """
+    points = _store.get(key)
+    if points is not None:
+        _store.move_to_end(key)
+        return points
+
+    points = _read_sidecar(_state["sidecar"], key)
+    if points is not None:
+        _store[key] = points
+        _state["bytes"] += points.nbytes
+        _evict()
+    return points
+
+
+def remove(key):
+    """ Forgets the snapshot under key. The sidecar keeps it until the next save(). """
+    _discard(key)
+    _state["unsaved"].discard(key)
+
+
+def blend(base, target, factor):
+    """ Returns the points factor of the way from base to target. """
+    if factor == 1.0:
+        return target
+    return base + (target - base) * np.float32(factor)
+
+
+def save(filepath, keys):
+    """ Writes the snapshots under keys to the sidecar filepath, replacing its contents, and makes it
+    the current sidecar. Snapshots not in keys are dropped from it; keys whose snapshot was lost are
+    skipped. Returns the number written. """
+    arrays = {}
+    for key in keys:
+        points = get(key)
+        if points is not None:
+            arrays[key] = points
+
+    # Write next to the target and swap, the old sidecar may still be the source of evicted snapshots
+    temporary = filepath + ".tmp"
+    with open(temporary, "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(temporary, filepath)
+    _state["sidecar"] = filepath
+    _state["unsaved"].clear()
+    return len(arrays)
+
+
+def memory_usage():
+    return _state["bytes"]
+
+
+def set_memory_limit(limit):
+    _state["limit"] = limit
+    _evict()
+
+
+def clear():
+    _store.clear()
+    _state["bytes"] = 0
+    _state["unsaved"].clear()
+
+
+def _discard(key):
+    points = _store.pop(key, None)
+    if points is not None:
+        _state["bytes"] -= points.nbytes
+
+
+def _evict():
+    # The most recent snapshot always stays, however large it is
+    while _state["bytes"] > _state["limit"] and len(_store) > 1:
+        key, points = _store.popitem(last=False)
+        _state["bytes"] -= points.nbytes
+        if key in _state["unsaved"]:
+            _state["unsaved"].discard(key)
+            if _state["sidecar"]:
+                _append_sidecar(_state["sidecar"], key, points)
+
+
+def _read_sidecar(filepath, key):
+    if not filepath or not os.path.exists(filepath):
+        return None
+    with np.load(filepath) as data:
+        # Only the requested member is read
+        return data[key] if key in data.files else None
+
+
+def _append_sidecar(filepath, key, points):
+    """ Adds one array to the sidecar without rewriting it. A key spilled twice is stored twice; reading
+    returns the later copy and the next save() drops the earlier one. """
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", UserWarning)
+        with zipfile.ZipFile(filepath, "a") as archive:
+            with archive.open(key + ".npy", "w", force_zip64=True) as f:
+                np.lib.format.write_array(f, points)
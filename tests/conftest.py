@@ -0,0 +1,132 @@
+""" Test setup for the Lattice Manager addon.
+
+Inside Blender (see run_in_blender.py) the tests run against the real bpy; everywhere else the
+stand-in modules in tests/stand_in are put on sys.path first. The addon directory is not a valid
+package name, so it is loaded from its path as "lattice_manager" by addon_loader.py, like batch.py does.
+
+Tests marked `stand_in` need the stand-in's counters or its operator reports and are skipped in
+Blender.
+"""
+
+import importlib
+import importlib.util
+import os
+import sys
+
+import numpy as np
+import pytest
+
+TESTS = os.path.dirname(os.path.abspath(__file__))
+ADDON = os.path.join(os.path.dirname(TESTS), "Addon_- Lattice Manager")
+
+try:
+    import bpy
+except ImportError:
+    sys.path.insert(0, os.path.join(TESTS, "stand_in"))
+    import bpy
+
+STAND_IN = getattr(bpy, "IS_STAND_IN", False)
+
+# Vertices of a cube two units across, like Blender's default cube
+CUBE_VERTICES = [(x, y, z) for x in (-1, 1) for y in (-1, 1) for z in (-1, 1)]
+CUBE_FACES = [(0, 1, 3, 2), (4, 6, 7, 5), (0, 4, 5, 1), (2, 3, 7, 6), (0, 2, 6, 4), (1, 5, 7, 3)]
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "stand_in: needs the in-process bpy stand-in")
+
+
+def pytest_collection_modifyitems(config, items):
+    if STAND_IN:
+        return
+    skip = pytest.mark.skip(reason="needs the bpy stand-in")
+    for item in items:
+        if "stand_in" in item.keywords:
+            item.add_marker(skip)
+
+
+def addon_module(name):
+    """ Imports one of the addon's modules that do not need bpy (deform, snapshots, pointcache, addon_loader)
+    on its own. """
+    spec = importlib.util.spec_from_file_location("lattice_manager_" + name, os.path.join(ADDON, name + ".py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def lattice_evaluator(deform):
+    """ Returns a stand-in evaluator deforming like Blender's LATTICE modifier, with the addon's engine. """
+    def evaluate(obj, mod, co):
+        if mod.object is None:
+            return co
+        weights = None
+        if mod.vertex_group:
+            weights = deform.vertex_group_weights(obj, mod.vertex_group, mod.invert_vertex_group)
+        return deform.deform_coords(np.asarray(co, dtype=np.float64), np.array(obj.matrix_world),
+                                    deform.lattice_state(mod.object), mod.strength, weights)
+    return evaluate
+
+
+@pytest.fixture
+def addon():
+    """ The registered addon package, in an empty file. """
+    if STAND_IN:
+        bpy.reset()
+    else:
+        bpy.ops.wm.read_factory_settings(use_empty=True)
+    # A fresh copy, dropping the modules of earlier tests
+    package = addon_module("addon_loader").load_addon(register=False)
+    package.register()
+    if STAND_IN:
+        bpy.evaluators["LATTICE"] = lattice_evaluator(importlib.import_module("lattice_manager.deform"))
+    yield package
+    package.unregister()
+
+
+@pytest.fixture
+def lm(addon):
+    return addon.lattice_manager_v01
+
+
+@pytest.fixture
+def context(addon):
+    return bpy.context
+
+
+@pytest.fixture
+def props(context):
+    return context.scene.lattice_manager_props
+
+
+@pytest.fixture
+def make_cube(context):
+    """ Returns a function creating a cube object linked to the scene. """
+    def make_cube(name="Cube", location=(0.0, 0.0, 0.0), mesh=None):
+        if mesh is None:
+            mesh = bpy.data.meshes.new(name)
+            mesh.from_pydata(CUBE_VERTICES, [], CUBE_FACES)
+        obj = bpy.data.objects.new(name, mesh)
+        context.scene.collection.objects.link(obj)
+        obj.location = location
+        return obj
+    return make_cube
+
+
+@pytest.fixture
+def managed_scene(context, make_cube):
+    """ Returns a function creating count cubes in a row and managing them. """
+    def managed_scene(count, spacing=3.0):
+        objects = [make_cube(f"Cube {i}", (i * spacing, 0.0, 0.0)) for i in range(count)]
+        for obj in context.scene.objects:
+            obj.select_set(obj in objects)
+        bpy.ops.object.lattice_manage_selected()
+        return objects
+    return managed_scene
+
+
+def move_lattice_points(lattice, offset):
+    """ Moves every point of a lattice object by offset, so its modifiers visibly deform. """
+    points = np.empty(len(lattice.data.points) * 3, dtype=np.float32)
+    lattice.data.points.foreach_get("co_deform", points)
+    points = points.reshape(-1, 3) + np.asarray(offset, dtype=np.float32)
+    lattice.data.points.foreach_set("co_deform", points.ravel())
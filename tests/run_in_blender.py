@@ -0,0 +1,15 @@
+""" Runs the test suite against Blender's own bpy:
+
+    blender --background --factory-startup --python tests/run_in_blender.py -- [pytest arguments]
+
+pytest has to be installed in Blender's Python. Blender exits with pytest's exit code. Without Blender,
+run `python -m pytest tests` and the stand-in in tests/stand_in takes bpy's place.
+"""
+
+import os
+import sys
+
+import pytest
+
+arguments = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+sys.exit(pytest.main([os.path.dirname(os.path.abspath(__file__))] + arguments))
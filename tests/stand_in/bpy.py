@@ -0,0 +1,1677 @@
+"""Lightweight in-process stand-in for the parts of Blender's bpy API used by the addon.
+
+Models objects, meshes, lattices, modifiers, collections, scenes, bound_box, property groups, handlers,
+timers and a simulated depsgraph, enough to run the addon's helpers and operators on plain Python.
+Modifier stack reads, bpy.ops calls and drawn list rows are counted in `stats`, so tests can assert how
+the work of a code path grows with the scene. Everything not modelled raises AttributeError rather than guessing.
+"""
+
+import sys
+import types as _pytypes
+
+import numpy as np
+from mathutils import Matrix, Vector
+
+
+def _module(name):
+    module = _pytypes.ModuleType(name)
+    sys.modules[name] = module
+    return module
+
+
+app = _module("bpy.app")
+props = _module("bpy.props")
+types = _module("bpy.types")
+utils = _module("bpy.utils")
+ops = _module("bpy.ops")
+path = _module("bpy.path")
+handlers = _module("bpy.app.handlers")
+timers = _module("bpy.app.timers")
+app.handlers = handlers
+app.timers = timers
+
+
+# Lets tests tell the stand-in from Blender's own module
+IS_STAND_IN = True
+
+# Counters used by scaling tests
+stats = {"modifier_reads": 0, "operator_calls": 0, "list_rows_drawn": 0}
+
+HANDLER_NAMES = ("depsgraph_update_post", "load_post", "undo_post", "redo_post", "frame_change_post", "save_pre",
+                 "save_post", "load_pre")
+
+
+def reset_stats():
+    for key in stats:
+        stats[key] = 0
+
+
+# bpy.props
+#################################################
+
+class _PropertyDeferred:
+    def __init__(self, function, keywords):
+        self.function = function
+        self.keywords = keywords
+        self._name = None
+
+    def __repr__(self):
+        return "<%s %s>" % (self.function.__name__, self._name)
+
+    def _default(self, owner):
+        kw = self.keywords
+        fn = self.function.__name__
+        if fn == "CollectionProperty":
+            return _Collection(kw["type"], owner)
+        if fn == "PointerProperty":
+            ptype = kw["type"]
+            if isinstance(ptype, type) and issubclass(ptype, PropertyGroup):
+                return _instantiate(ptype, owner)
+            return None
+        if "default" in kw:
+            default = kw["default"]
+            if fn in ("FloatVectorProperty", "IntVectorProperty", "BoolVectorProperty"):
+                return list(default)
+            return default
+        if fn == "FloatProperty":
+            return 0.0
+        if fn == "IntProperty":
+            return 0
+        if fn == "BoolProperty":
+            return False
+        if fn == "StringProperty":
+            return ""
+        if fn == "EnumProperty":
+            items = kw.get("items")
+            if callable(items) or not items:
+                return ""
+            if kw.get("options") and "ENUM_FLAG" in kw["options"]:
+                return set()
+            return items[0][0]
+        if fn in ("FloatVectorProperty", "IntVectorProperty", "BoolVectorProperty"):
+            size = kw.get("size", 3)
+            return [0] * size
+        return None
+
+    def __get__(self, inst, owner):
+        if inst is None:
+            return self
+        storage = inst.__dict__.setdefault("_props", {})
+        if self._name not in storage:
+            storage[self._name] = self._default(inst)
+        return storage[self._name]
+
+    def __set__(self, inst, value):
+        fn = self.function.__name__
+        kw = self.keywords
+        if fn == "CollectionProperty":
+            raise AttributeError("collection properties are read-only")
+        if fn in ("FloatProperty", "IntProperty"):
+            if "min" in kw:
+                value = max(kw["min"], value)
+            if "max" in kw:
+                value = min(kw["max"], value)
+            value = float(value) if fn == "FloatProperty" else int(value)
+        if fn == "PointerProperty" and value is not None:
+            poll = kw.get("poll")
+            if poll is not None and not poll(inst, value):
+                raise ValueError("pointer poll failed")
+        storage = inst.__dict__.setdefault("_props", {})
+        storage[self._name] = value
+        update = kw.get("update")
+        if update is not None:
+            update(inst, context)
+
+
+def _make_prop(name):
+    def prop(**keywords):
+        return _PropertyDeferred(prop, keywords)
+    prop.__name__ = name
+    return prop
+
+
+for _name in ("BoolProperty", "BoolVectorProperty", "CollectionProperty", "EnumProperty", "FloatProperty",
+              "FloatVectorProperty", "IntProperty", "IntVectorProperty", "PointerProperty", "StringProperty"):
+    setattr(props, _name, _make_prop(_name))
+props._PropertyDeferred = _PropertyDeferred
+
+
+class _StructMeta(type):
+    def __new__(mcls, name, bases, namespace):
+        cls = super().__new__(mcls, name, bases, namespace)
+        # Like Blender, annotations of mix-in classes are properties too
+        annotations = {}
+        for base in reversed(cls.__mro__):
+            annotations.update(base.__dict__.get("__annotations__", {}))
+        for attr, value in annotations.items():
+            if isinstance(value, _PropertyDeferred):
+                value._name = attr
+                type.__setattr__(cls, attr, value)
+        return cls
+
+    def __setattr__(cls, name, value):
+        if isinstance(value, _PropertyDeferred):
+            value._name = name
+        type.__setattr__(cls, name, value)
+
+
+class bpy_struct(metaclass=_StructMeta):
+    is_registered = False
+
+    def as_pointer(self):
+        return id(self)
+
+    def path_from_id(self, *args):
+        return ""
+
+
+def _instantiate(cls, owner=None):
+    inst = cls.__new__(cls)
+    inst.__dict__["_owner"] = owner
+    init = getattr(inst, "_init", None)
+    if init is not None:
+        init()
+    return inst
+
+
+class _Collection:
+    def __init__(self, item_type, owner=None):
+        self._type = item_type
+        self._items = []
+        self._owner = owner
+
+    def add(self):
+        item = _instantiate(self._type, self._owner)
+        self._items.append(item)
+        return item
+
+    def clear(self):
+        self._items.clear()
+
+    def remove(self, index):
+        del self._items[index]
+
+    def move(self, src, dst):
+        item = self._items.pop(src)
+        self._items.insert(dst, item)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(list(self._items))
+
+    def __bool__(self):
+        return bool(self._items)
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            for item in self._items:
+                if item.name == key:
+                    return item
+            raise KeyError(key)
+        return self._items[key]
+
+    def __contains__(self, key):
+        return any(item.name == key for item in self._items)
+
+    def get(self, key, default=None):
+        for item in self._items:
+            if item.name == key:
+                return item
+        return default
+
+    def find(self, key):
+        for i, item in enumerate(self._items):
+            if item.name == key:
+                return i
+        return -1
+
+    def values(self):
+        return list(self._items)
+
+    def keys(self):
+        return [item.name for item in self._items]
+
+    def items(self):
+        return [(item.name, item) for item in self._items]
+
+
+# bpy.types
+#################################################
+
+class PropertyGroup(bpy_struct):
+    name: props.StringProperty()
+
+    @property
+    def id_data(self):
+        owner = self.__dict__.get("_owner")
+        while isinstance(owner, PropertyGroup):
+            owner = owner.__dict__.get("_owner")
+        return owner
+
+
+class Operator(bpy_struct):
+    bl_options = set()
+
+    def __init__(self, **kwargs):
+        self.__dict__["_owner"] = None
+        self.reports = []
+        for key, value in kwargs.items():
+            setattr(self, key, value)
+
+    def report(self, level, message):
+        self.reports.append((set(level), message))
+
+
+class Panel(bpy_struct):
+    def __init__(self):
+        self.layout = UILayout()
+
+
+class UIList(bpy_struct):
+    layout_type = 'DEFAULT'
+    filter_name = ""
+    use_filter_sort_alpha = False
+    use_filter_sort_reverse = False
+    use_filter_invert = False
+    bitflag_filter_item = 1 << 30
+
+
+class Menu(bpy_struct):
+    pass
+
+
+class Header(bpy_struct):
+    pass
+
+
+class AddonPreferences(bpy_struct):
+    pass
+
+
+for _name in ("Node", "NodeSocket", "NodeTree", "RenderEngine", "Gizmo", "GizmoGroup"):
+    setattr(types, _name, type(_name, (bpy_struct,), {}))
+
+
+class UI_UL_list:
+    @staticmethod
+    def filter_items_by_name(pattern, bitflag, items, propname="name", flags=None, reverse=False):
+        if not pattern:
+            return flags or []
+        pattern = pattern.lower()
+        return [bitflag if (pattern in getattr(item, propname).lower()) != reverse else 0 for item in items]
+
+    @staticmethod
+    def sort_items_by_name(items, propname="name"):
+        order = sorted(range(len(items)), key=lambda i: getattr(items[i], propname).lower())
+        neworder = [0] * len(items)
+        for new, old in enumerate(order):
+            neworder[old] = new
+        return neworder
+
+    @staticmethod
+    def sort_items_helper(sort_data, key, reverse=False):
+        sort_data.sort(key=key, reverse=reverse)
+        neworder = [0] * len(sort_data)
+        for new, (old, *_rest) in enumerate(sort_data):
+            neworder[old] = new
+        return neworder
+
+
+class UILayout:
+    def __init__(self):
+        self.calls = []
+        self.enabled = True
+        self.active = True
+        self.use_property_split = False
+        self.use_property_decorate = False
+        self.alignment = 'EXPAND'
+        self.scale_y = 1.0
+
+    def _child(self, kind):
+        child = UILayout()
+        self.calls.append((kind, child))
+        return child
+
+    def row(self, **kwargs):
+        return self._child("row")
+
+    def column(self, **kwargs):
+        return self._child("column")
+
+    def box(self):
+        return self._child("box")
+
+    def split(self, **kwargs):
+        return self._child("split")
+
+    def grid_flow(self, **kwargs):
+        return self._child("grid_flow")
+
+    def operator(self, idname, **kwargs):
+        op = _pytypes.SimpleNamespace()
+        self.calls.append(("operator", idname, op))
+        return op
+
+    def template_list(self, listtype_name, list_id, dataptr, propname, active_dataptr, active_propname, rows=5,
+                      **kwargs):
+        self.calls.append(("template_list", (listtype_name, list_id, dataptr, propname), kwargs))
+        _draw_ui_list(self, listtype_name, list_id, dataptr, propname, active_dataptr, active_propname, rows)
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        def record(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+        return record
+
+    def iter_calls(self):
+        for call in self.calls:
+            yield call
+            if isinstance(call[1], UILayout):
+                yield from call[1].iter_calls()
+
+
+# UIList instances by (type, list id), Blender keeps them with their filter settings between redraws
+_ui_lists = {}
+
+
+def _draw_ui_list(layout, listtype_name, list_id, data, propname, active_data, active_propname, rows):
+    """Filters and sorts like Blender's list template and draws the rows that fit, unscrolled."""
+    cls = next((cls for cls in _registered_classes if cls.__name__ == listtype_name
+                or getattr(cls, "bl_idname", None) == listtype_name), None)
+    if cls is None:
+        return
+    ui_list = _ui_lists.get((listtype_name, list_id))
+    if ui_list is None:
+        ui_list = _ui_lists[(listtype_name, list_id)] = _instantiate(cls)
+    items = getattr(data, propname)
+    flags, order = [], []
+    if hasattr(ui_list, "filter_items"):
+        flags, order = ui_list.filter_items(context, data, propname)
+    visible = [i for i in range(len(items)) if not flags or flags[i] & UIList.bitflag_filter_item]
+    if order:
+        visible.sort(key=lambda i: order[i])
+    for index in visible[:rows]:
+        stats["list_rows_drawn"] += 1
+        ui_list.draw_item(context, layout._child("row"), data, items[index], 0, active_data, active_propname, index)
+
+
+class ID(bpy_struct):
+    _collection_name = None
+
+    def _init(self):
+        self._idprops = {}
+        self._users = 0
+        self.use_fake_user = False
+        self.library = None
+
+    def __init__(self, name=""):
+        self.__dict__["_owner"] = None
+        self._init()
+        self._name = name
+
+    @property
+    def name(self):
+        return self._name
+
+    @name.setter
+    def name(self, value):
+        coll = getattr(data, self._collection_name, None) if self._collection_name else None
+        if coll is not None and self in coll._items:
+            value = coll._unique_name(value, self)
+        self._name = value
+
+    def update_tag(self, refresh=None):
+        tag = getattr(self, "_tag", None)
+        if tag is not None:
+            tag()
+
+    @property
+    def name_full(self):
+        return self._name
+
+    @property
+    def original(self):
+        return self
+
+    is_evaluated = False
+
+    def evaluated_get(self, depsgraph):
+        return self
+
+    def __getitem__(self, key):
+        return self._idprops[key]
+
+    def __setitem__(self, key, value):
+        self._idprops[key] = value
+
+    def __delitem__(self, key):
+        del self._idprops[key]
+
+    def __contains__(self, key):
+        return key in self._idprops
+
+    def get(self, key, default=None):
+        return self._idprops.get(key, default)
+
+    def keys(self):
+        return self._idprops.keys()
+
+    def user_clear(self):
+        self._users = 0
+
+    def _count_users(self):
+        return self._users
+
+    @property
+    def users(self):
+        return self._count_users() + (1 if self.use_fake_user else 0)
+
+    def __repr__(self):
+        return "<%s %r>" % (type(self).__name__, self._name)
+
+
+class Modifier(bpy_struct):
+    def __init__(self, name, type, owner):
+        self.__dict__["_owner"] = owner
+        self.name = name
+        self.type = type
+        self.show_viewport = True
+        self.show_render = True
+        self.object = None
+        self.strength = 1.0
+        self.vertex_group = ""
+        self.invert_vertex_group = False
+        self.cache_format = 'MDD'
+        self.filepath = ""
+        self.frame_start = 0.0
+        self.frame_scale = 1.0
+        self.play_mode = 'SCENE'
+        self.time_mode = 'FRAME'
+        self.deform_mode = 'OVERWRITE'
+        self.forward_axis = 'POS_Y'
+        self.up_axis = 'POS_Z'
+        self.factor = 1.0
+        self.is_override_data = False
+
+    @property
+    def id_data(self):
+        return self._owner
+
+    def __setattr__(self, name, value):
+        self.__dict__[name] = value
+        owner = self.__dict__.get("_owner")
+        if owner is not None and name != "name":
+            depsgraph_tag(owner)
+
+    def __repr__(self):
+        return "<Modifier %r %s>" % (self.name, self.type)
+
+
+class ObjectModifiers:
+    def __init__(self, owner):
+        self._owner = owner
+        self._items = []
+
+    def new(self, name, type):
+        existing = {mod.name for mod in self._items}
+        base, n = name, 0
+        while name in existing:
+            n += 1
+            name = "%s.%03d" % (base, n)
+        mod = Modifier(name, type, self._owner)
+        self._items.append(mod)
+        depsgraph_tag(self._owner)
+        return mod
+
+    def remove(self, mod):
+        self._items.remove(mod)
+        depsgraph_tag(self._owner)
+
+    def move(self, src, dst):
+        mod = self._items.pop(src)
+        self._items.insert(dst, mod)
+
+    def find(self, name):
+        stats["modifier_reads"] += 1
+        for i, mod in enumerate(self._items):
+            if mod.name == name:
+                return i
+        return -1
+
+    def __iter__(self):
+        stats["modifier_reads"] += 1
+        return iter(list(self._items))
+
+    def __len__(self):
+        return len(self._items)
+
+    def __bool__(self):
+        return bool(self._items)
+
+    def __getitem__(self, key):
+        stats["modifier_reads"] += 1
+        if isinstance(key, str):
+            for mod in self._items:
+                if mod.name == key:
+                    return mod
+            raise KeyError(key)
+        return self._items[key]
+
+    def __contains__(self, key):
+        stats["modifier_reads"] += 1
+        return any(mod.name == key for mod in self._items)
+
+    def get(self, key, default=None):
+        stats["modifier_reads"] += 1
+        for mod in self._items:
+            if mod.name == key:
+                return mod
+        return default
+
+    def keys(self):
+        return [mod.name for mod in self._items]
+
+    def values(self):
+        return list(self._items)
+
+
+def _matrix_from_loc_rot_scale(location, rotation, scale):
+    m = np.eye(4)
+    m[:3, :3] = np.array(rotation) * np.array(scale)[None, :]
+    m[:3, 3] = location
+    return Matrix(m.tolist())
+
+
+class Object(ID):
+    _collection_name = "objects"
+
+    def __init__(self, name, object_data):
+        super().__init__(name)
+        self.data = object_data
+        self.modifiers = ObjectModifiers(self)
+        self.location = Vector((0.0, 0.0, 0.0))
+        self.scale = Vector((1.0, 1.0, 1.0))
+        self._rotation = np.eye(3)
+        self.hide_viewport = False
+        self.hide_render = False
+        self._hidden = False
+        self._select = False
+        self.instance_type = 'NONE'
+        self.instance_collection = None
+        self.animation_data = None
+        self.parent = None
+        self.vertex_groups = _VertexGroups()
+
+    def __setattr__(self, name, value):
+        if name in ("location", "scale") and not isinstance(value, Vector):
+            value = Vector(value)
+        object.__setattr__(self, name, value)
+        if name in ("location", "scale", "data", "hide_viewport"):
+            depsgraph_tag(self)
+
+    def _count_users(self):
+        return len(self.users_collection)
+
+    @property
+    def type(self):
+        if isinstance(self.data, Mesh):
+            return 'MESH'
+        if isinstance(self.data, Lattice):
+            return 'LATTICE'
+        return 'EMPTY'
+
+    @property
+    def matrix_world(self):
+        return _matrix_from_loc_rot_scale(list(self.location), self._rotation, list(self.scale))
+
+    @matrix_world.setter
+    def matrix_world(self, value):
+        m = np.array([list(row) for row in value], dtype=float)
+        basis = m[:3, :3]
+        scale = np.linalg.norm(basis, axis=0)
+        safe = np.where(scale == 0, 1.0, scale)
+        object.__setattr__(self, "_rotation", basis / safe[None, :])
+        self.scale = Vector(scale.tolist())
+        self.location = Vector(m[:3, 3].tolist())
+
+    @property
+    def rotation_euler(self):
+        return Vector((0.0, 0.0, 0.0))
+
+    @property
+    def bound_box(self):
+        if isinstance(self.data, Mesh) and len(self.data.vertices):
+            co = self.data._co
+            lo, hi = co.min(axis=0), co.max(axis=0)
+        elif isinstance(self.data, Lattice):
+            lo, hi = np.full(3, -0.5), np.full(3, 0.5)
+        else:
+            lo = hi = np.zeros(3)
+        return [
+            (lo[0], lo[1], lo[2]), (lo[0], lo[1], hi[2]), (lo[0], hi[1], hi[2]), (lo[0], hi[1], lo[2]),
+            (hi[0], lo[1], lo[2]), (hi[0], lo[1], hi[2]), (hi[0], hi[1], hi[2]), (hi[0], hi[1], lo[2]),
+        ]
+
+    def select_set(self, state):
+        self._select = bool(state)
+
+    def select_get(self):
+        return self._select
+
+    def hide_get(self):
+        return self._hidden
+
+    def hide_set(self, state):
+        self._hidden = bool(state)
+
+    def visible_get(self):
+        return not (self._hidden or self.hide_viewport)
+
+    @property
+    def users_collection(self):
+        result = [col for col in data.collections if self in col.objects._items]
+        result += [scene.collection for scene in data.scenes if self in scene.collection.objects._items]
+        return result
+
+    @property
+    def users_scene(self):
+        return [scene for scene in data.scenes if self in scene.objects]
+
+    def to_mesh(self, **kwargs):
+        return _evaluate_mesh(self)
+
+    def to_mesh_clear(self):
+        pass
+
+    def animation_data_create(self):
+        if self.animation_data is None:
+            object.__setattr__(self, "animation_data", AnimData())
+        return self.animation_data
+
+    def animation_data_clear(self):
+        object.__setattr__(self, "animation_data", None)
+
+
+class _FloatItems:
+    """A collection of items backed by one (N, 3) numpy array attribute."""
+
+    def __init__(self, owner, attr, item_cls):
+        self._owner = owner
+        self._attr = attr
+        self._item_cls = item_cls
+
+    def _arrays(self):
+        return self._owner._arrays
+
+    def __len__(self):
+        return len(next(iter(self._owner._arrays.values())))
+
+    def __iter__(self):
+        return (self._item_cls(self._owner, i) for i in range(len(self)))
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self._item_cls(self._owner, i)
+
+    def foreach_get(self, attr, buffer):
+        values = self._owner._arrays[attr].ravel()
+        if len(buffer) != len(values):
+            raise RuntimeError("buffer size mismatch")
+        buffer[:] = values
+
+    def foreach_set(self, attr, buffer):
+        target = self._owner._arrays[attr]
+        if len(buffer) != target.size:
+            raise RuntimeError("buffer size mismatch")
+        target[...] = np.asarray(buffer, dtype=target.dtype).reshape(target.shape)
+        self._owner._tag()
+
+
+class _ArrayItem:
+    def __init__(self, owner, index):
+        self.__dict__["_owner"] = owner
+        self.__dict__["index"] = index
+
+    def __getattr__(self, name):
+        arrays = self.__dict__["_owner"]._arrays
+        if name in arrays:
+            return Vector(arrays[name][self.__dict__["index"]].tolist())
+        raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        arrays = self.__dict__["_owner"]._arrays
+        arrays[name][self.__dict__["index"]] = value
+        self.__dict__["_owner"]._tag()
+
+
+class Mesh(ID):
+    _collection_name = "meshes"
+
+    def __init__(self, name):
+        super().__init__(name)
+        self._arrays = {"co": np.zeros((0, 3), dtype=np.float32)}
+        self.vertices = _FloatItems(self, "co", _ArrayItem)
+        self.edges = []
+        self.loops = []
+        self.polygons = []
+        self.materials = []
+        self.shape_keys = None
+        self.attributes = []
+
+    def _count_users(self):
+        return sum(1 for obj in data.objects if obj.data is self) + self._users
+
+    @property
+    def _co(self):
+        return self._arrays["co"]
+
+    def _tag(self):
+        for obj in data.objects:
+            if obj.data is self:
+                depsgraph_tag(obj)
+
+    def from_pydata(self, vertices, edges, faces):
+        self._arrays["co"] = np.array(vertices, dtype=np.float32).reshape(-1, 3)
+        self.edges = list(edges)
+        self.polygons = list(faces)
+        self.loops = [i for face in faces for i in face]
+
+    def copy(self):
+        mesh = data.meshes.new(self.name)
+        mesh._arrays["co"] = self._co.copy()
+        mesh.edges = list(self.edges)
+        mesh.polygons = list(self.polygons)
+        mesh.loops = list(self.loops)
+        mesh.materials = list(self.materials)
+        return mesh
+
+    def transform(self, matrix):
+        m = np.array([list(row) for row in matrix])
+        co = self._co
+        self._arrays["co"] = (co @ m[:3, :3].T + m[:3, 3]).astype(np.float32)
+
+    def update(self):
+        pass
+
+
+class Lattice(ID):
+    _collection_name = "lattices"
+
+    def __init__(self, name):
+        super().__init__(name)
+        self._dims = [2, 2, 2]
+        self.interpolation_type_u = 'KEY_BSPLINE'
+        self.interpolation_type_v = 'KEY_BSPLINE'
+        self.interpolation_type_w = 'KEY_BSPLINE'
+        self.use_outside = False
+        self.vertex_group = ""
+        self._arrays = {}
+        self.points = _FloatItems(self, "co", _ArrayItem)
+        self._resize()
+
+    def _tag(self):
+        for obj in data.objects:
+            if obj.data is self:
+                depsgraph_tag(obj)
+
+    def _count_users(self):
+        return sum(1 for obj in data.objects if obj.data is self) + self._users
+
+    def _resize(self):
+        u, v, w = self._dims
+
+        def axis(n):
+            return np.linspace(-0.5, 0.5, n) if n > 1 else np.zeros(1)
+        ww, vv, uu = np.meshgrid(axis(w), axis(v), axis(u), indexing="ij")
+        co = np.stack([uu, vv, ww], axis=-1).reshape(-1, 3).astype(np.float32)
+        self._arrays = {"co": co, "co_deform": co.copy()}
+
+    def _dim_property(axis):
+        def getter(self):
+            return self._dims[axis]
+
+        def setter(self, value):
+            if not 1 <= value <= 64:
+                raise ValueError("points out of range")
+            self._dims[axis] = int(value)
+            self._resize()
+        return property(getter, setter)
+
+    points_u = _dim_property(0)
+    points_v = _dim_property(1)
+    points_w = _dim_property(2)
+    del _dim_property
+
+
+class Collection(ID):
+    _collection_name = "collections"
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.objects = CollectionObjects(self)
+        self.children = CollectionChildren(self)
+        self.hide_viewport = False
+
+    @property
+    def all_objects(self):
+        seen = []
+        for obj in self.objects._items:
+            if obj not in seen:
+                seen.append(obj)
+        for child in self.children._items:
+            for obj in child.all_objects:
+                if obj not in seen:
+                    seen.append(obj)
+        return seen
+
+
+class CollectionObjects:
+    def __init__(self, owner):
+        self._owner = owner
+        self._items = []
+
+    def link(self, obj):
+        if obj in self._items:
+            raise RuntimeError("Object '%s' already in collection '%s'" % (obj.name, self._owner.name))
+        self._items.append(obj)
+        depsgraph_tag(self._owner)
+
+    def unlink(self, obj):
+        self._items.remove(obj)
+        depsgraph_tag(self._owner)
+
+    def __iter__(self):
+        return iter(list(self._items))
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key):
+        if isinstance(key, str):
+            return any(obj.name == key for obj in self._items)
+        return key in self._items
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            for obj in self._items:
+                if obj.name == key:
+                    return obj
+            raise KeyError(key)
+        return self._items[key]
+
+    def get(self, key, default=None):
+        for obj in self._items:
+            if obj.name == key:
+                return obj
+        return default
+
+
+class CollectionChildren(CollectionObjects):
+    def link(self, child):
+        self._items.append(child)
+        depsgraph_tag(self._owner)
+
+
+class SceneObjects:
+    def __init__(self, scene):
+        self._scene = scene
+
+    def _all(self):
+        return self._scene.collection.all_objects
+
+    def __iter__(self):
+        return iter(self._all())
+
+    def __len__(self):
+        return len(self._all())
+
+    def __contains__(self, key):
+        if isinstance(key, str):
+            return any(obj.name == key for obj in self._all())
+        return key in self._all()
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            for obj in self._all():
+                if obj.name == key:
+                    return obj
+            raise KeyError(key)
+        return self._all()[key]
+
+    def get(self, key, default=None):
+        for obj in self._all():
+            if obj.name == key:
+                return obj
+        return default
+
+    def foreach_get(self, attr, buffer):
+        values = np.array([np.array([list(r) for r in getattr(obj, attr)]).T.ravel() if attr == "matrix_world"
+                           else np.ravel(getattr(obj, attr)) for obj in self._all()]).ravel()
+        buffer[:] = values
+
+
+class ViewLayerObjects(SceneObjects):
+    def __init__(self, scene):
+        super().__init__(scene)
+        self.active = None
+
+    @property
+    def selected(self):
+        return [obj for obj in self._all() if obj.select_get()]
+
+
+class ViewLayer:
+    def __init__(self, scene):
+        self.objects = ViewLayerObjects(scene)
+        self.depsgraph = Depsgraph(scene)
+
+    def update(self):
+        pass
+
+
+class Scene(ID):
+    _collection_name = "scenes"
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.collection = Collection("Scene Collection")
+        self.objects = SceneObjects(self)
+        self.view_layers = [ViewLayer(self)]
+        self.frame_current = 1
+        self.frame_start = 1
+        self.frame_end = 250
+        self.render = _pytypes.SimpleNamespace(fps=24, fps_base=1.0)
+
+    def frame_set(self, frame, subframe=0.0):
+        self.frame_current = int(frame)
+        for handler in handlers.frame_change_post:
+            handler(self, None)
+
+
+class AnimData:
+    def __init__(self):
+        self.action = None
+        self.action_slot = None
+
+
+class Keyframe:
+    def __init__(self, co):
+        self.co = Vector(co)
+        self.handle_left = Vector(co)
+        self.handle_right = Vector(co)
+        self.interpolation = 'BEZIER'
+
+
+class FCurveKeyframePoints:
+    def __init__(self):
+        self._items = []
+
+    def add(self, count):
+        for _ in range(count):
+            self._items.append(Keyframe((0.0, 0.0)))
+
+    def insert(self, frame, value, **kwargs):
+        for key in self._items:
+            if key.co[0] == frame:
+                key.co = Vector((frame, value))
+                return key
+        key = Keyframe((frame, value))
+        self._items.append(key)
+        self._items.sort(key=lambda k: k.co[0])
+        return key
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __getitem__(self, i):
+        return self._items[i]
+
+    def foreach_get(self, attr, buffer):
+        values = [c for key in self._items for c in getattr(key, attr)]
+        buffer[:] = values
+
+    def foreach_set(self, attr, buffer):
+        values = list(buffer)
+        for i, key in enumerate(self._items):
+            if attr == "interpolation":
+                key.interpolation = values[i]
+            else:
+                setattr(key, attr, Vector(values[2 * i:2 * i + 2]))
+
+
+class FCurve:
+    def __init__(self, data_path, index=0):
+        self.data_path = data_path
+        self.array_index = index
+        self.keyframe_points = FCurveKeyframePoints()
+        self.group = None
+
+    def update(self):
+        self.keyframe_points._items.sort(key=lambda k: k.co[0])
+
+    def evaluate(self, frame):
+        keys = self.keyframe_points._items
+        if not keys:
+            return 0.0
+        if frame <= keys[0].co[0]:
+            return keys[0].co[1]
+        for a, b in zip(keys, keys[1:]):
+            if a.co[0] <= frame <= b.co[0]:
+                t = (frame - a.co[0]) / (b.co[0] - a.co[0])
+                return a.co[1] + t * (b.co[1] - a.co[1])
+        return keys[-1].co[1]
+
+
+class ActionFCurves:
+    def __init__(self):
+        self._items = []
+
+    def new(self, data_path, index=0, action_group=""):
+        if self.find(data_path, index=index) is not None:
+            raise RuntimeError("F-Curve already exists")
+        fcurve = FCurve(data_path, index)
+        self._items.append(fcurve)
+        return fcurve
+
+    def find(self, data_path, index=0):
+        for fcurve in self._items:
+            if fcurve.data_path == data_path and fcurve.array_index == index:
+                return fcurve
+        return None
+
+    def remove(self, fcurve):
+        self._items.remove(fcurve)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+
+class Action(ID):
+    _collection_name = "actions"
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.fcurves = ActionFCurves()
+
+
+class Depsgraph:
+    def __init__(self, scene=None):
+        self.scene = scene
+        self.updates = []
+
+    def id_type_updated(self, id_type):
+        return any(_id_type(update.id) == id_type for update in self.updates)
+
+    def update(self):
+        flush_depsgraph()
+
+
+class DepsgraphUpdate:
+    def __init__(self, id):
+        self.id = id
+        self.is_updated_geometry = True
+        self.is_updated_transform = True
+
+
+def _id_type(id_block):
+    return {Object: 'OBJECT', Mesh: 'MESH', Lattice: 'LATTICE', Collection: 'COLLECTION', Scene: 'SCENE'}.get(
+        type(id_block), 'OTHER')
+
+
+class _VertexGroup:
+    def __init__(self, name, index):
+        self.name = name
+        self.index = index
+
+
+class _VertexGroups(list):
+    def get(self, name):
+        return next((g for g in self if g.name == name), None)
+
+    def new(self, name="Group"):
+        group = _VertexGroup(name, len(self))
+        self.append(group)
+        return group
+
+
+class SpaceView3D:
+    _draw_handlers = []
+
+    @classmethod
+    def draw_handler_add(cls, callback, args, region, event):
+        handle = (callback, args)
+        cls._draw_handlers.append(handle)
+        return handle
+
+    @classmethod
+    def draw_handler_remove(cls, handle, region):
+        cls._draw_handlers.remove(handle)
+
+
+class Event:
+    def __init__(self, type='NONE', value='NOTHING'):
+        self.type = type
+        self.value = value
+
+
+for _cls in (PropertyGroup, Operator, Panel, UIList, Menu, Header, AddonPreferences, UI_UL_list, UILayout, ID,
+             Modifier, Object, Mesh, Lattice, Collection, Scene, Action, AnimData, FCurve, Keyframe, Depsgraph,
+             DepsgraphUpdate, SpaceView3D, Event, bpy_struct):
+    setattr(types, _cls.__name__, _cls)
+types.LatticeModifier = Modifier
+types.Context = object
+types.Window = object
+
+
+# bpy.data
+#################################################
+
+class BlendDataCollection:
+    def __init__(self, id_type):
+        self._type = id_type
+        self._items = []
+
+    def _unique_name(self, name, item=None):
+        names = {other._name for other in self._items if other is not item}
+        base, n = name, 0
+        while name in names:
+            n += 1
+            name = "%s.%03d" % (base, n)
+        return name
+
+    def new(self, name, *args):
+        item = self._type(self._unique_name(name), *args)
+        self._items.append(item)
+        return item
+
+    def remove(self, item, do_unlink=True):
+        self._items.remove(item)
+        if isinstance(item, Object):
+            for col in list(data.collections) + [scene.collection for scene in data.scenes]:
+                if item in col.objects._items:
+                    col.objects._items.remove(item)
+            for obj in data.objects:
+                for mod in obj.modifiers._items:
+                    if mod.object is item:
+                        mod.__dict__["object"] = None
+        if isinstance(item, (Mesh, Lattice)):
+            for obj in data.objects:
+                if obj.data is item:
+                    obj.__dict__["data"] = None
+        _removed.add(id(item))
+
+    def get(self, name, default=None):
+        for item in self._items:
+            if item._name == name:
+                return item
+        return default
+
+    def find(self, name):
+        for i, item in enumerate(self._items):
+            if item._name == name:
+                return i
+        return -1
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            item = self.get(key)
+            if item is None:
+                raise KeyError(key)
+            return item
+        return self._items[key]
+
+    def __contains__(self, key):
+        if isinstance(key, str):
+            return self.get(key) is not None
+        return key in self._items
+
+    def __iter__(self):
+        return iter(list(self._items))
+
+    def __len__(self):
+        return len(self._items)
+
+    def keys(self):
+        return [item._name for item in self._items]
+
+    def values(self):
+        return list(self._items)
+
+
+class MeshDataCollection(BlendDataCollection):
+    def new_from_object(self, obj, preserve_all_data_layers=False, depsgraph=None):
+        mesh = _evaluate_mesh(obj)
+        mesh._name = self._unique_name(obj.data.name if obj.data else obj.name)
+        self._items.append(mesh)
+        return mesh
+
+
+class BlendData:
+    def __init__(self):
+        self.filepath = ""
+        self.is_dirty = False
+        self.is_saved = False
+
+    def _reset(self):
+        self.objects = BlendDataCollection(Object)
+        self.meshes = MeshDataCollection(Mesh)
+        self.lattices = BlendDataCollection(Lattice)
+        self.collections = BlendDataCollection(Collection)
+        self.scenes = BlendDataCollection(Scene)
+        self.actions = BlendDataCollection(Action)
+        self.filepath = ""
+
+
+data = BlendData()
+_removed = set()
+
+
+# Modifier evaluation used by to_mesh() and new_from_object(), by modifier type: a function taking
+# (object, modifier, (V, 3) coordinates) and returning the new coordinates. Types without an evaluator
+# leave the coordinates alone; the tests' conftest registers one for LATTICE.
+evaluators = {}
+
+
+def _evaluate_mesh_cache(obj, mod, co):
+    if mod.cache_format != 'PC2':
+        return co
+    header = np.fromfile(_abspath(mod.filepath), dtype="<i4", count=8)
+    points, samples = int(header[4]), int(header[7])
+    positions = np.fromfile(_abspath(mod.filepath), dtype="<f4", offset=32).reshape(samples, points, 3)
+    sample = min(max(int(context.scene.frame_current - mod.frame_start), 0), samples - 1)
+    return positions[sample].copy()
+
+
+evaluators["MESH_CACHE"] = _evaluate_mesh_cache
+
+
+def _evaluate_mesh(obj):
+    mesh = Mesh(obj.data.name if obj.data else obj.name)
+    co = obj.data._co.copy() if obj.data is not None else np.zeros((0, 3), np.float32)
+    for mod in obj.modifiers._items:
+        if not mod.show_viewport:
+            continue
+        evaluator = evaluators.get(mod.type)
+        if evaluator is not None:
+            co = evaluator(obj, mod, co)
+    mesh._arrays["co"] = np.asarray(co, dtype=np.float32)
+    if obj.data is not None:
+        mesh.edges = list(obj.data.edges)
+        mesh.polygons = list(obj.data.polygons)
+        mesh.loops = list(obj.data.loops)
+        mesh.materials = list(obj.data.materials)
+    return mesh
+
+
+# Depsgraph update simulation
+#################################################
+
+_pending_updates = []
+
+
+def depsgraph_tag(id_block):
+    if id_block not in _pending_updates:
+        _pending_updates.append(id_block)
+
+
+def flush_depsgraph():
+    """Runs depsgraph_update_post handlers with the IDs tagged since the last flush."""
+    if not _pending_updates:
+        return
+    depsgraph = Depsgraph(context.scene)
+    depsgraph.updates = [DepsgraphUpdate(id_block) for id_block in _pending_updates]
+    _pending_updates.clear()
+    for handler in list(handlers.depsgraph_update_post):
+        handler(context.scene, depsgraph)
+
+
+# bpy.context
+#################################################
+
+class WindowManager:
+    def __init__(self):
+        self.timers = []
+        self.modal_handlers = []
+        self.progress = None
+        self.windows = []
+
+    def event_timer_add(self, time_step, window=None):
+        timer = _pytypes.SimpleNamespace(time_step=time_step, window=window)
+        self.timers.append(timer)
+        return timer
+
+    def event_timer_remove(self, timer):
+        self.timers.remove(timer)
+
+    def modal_handler_add(self, operator):
+        self.modal_handlers.append(operator)
+        return True
+
+    def fileselect_add(self, operator):
+        self.modal_handlers.append(operator)
+
+    def invoke_props_dialog(self, operator, **kwargs):
+        return {'RUNNING_MODAL'}
+
+    def progress_begin(self, lo, hi):
+        self.progress = lo
+
+    def progress_update(self, value):
+        self.progress = value
+
+    def progress_end(self):
+        self.progress = None
+
+
+class Area:
+    def __init__(self):
+        self.header_text = None
+        self.type = 'VIEW_3D'
+
+    def header_text_set(self, text):
+        self.header_text = text
+
+    def tag_redraw(self):
+        pass
+
+
+class Workspace:
+    def __init__(self):
+        self.status_text = None
+
+    def status_text_set(self, text):
+        self.status_text = text
+
+
+class Context:
+    def __init__(self):
+        self._reset()
+
+    def _reset(self):
+        self.scene = None
+        self.window_manager = WindowManager()
+        self.window = _pytypes.SimpleNamespace()
+        self.area = Area()
+        self.screen = None
+        self.region = None
+        self.workspace = Workspace()
+        self.mode = 'OBJECT'
+        self.preferences = _pytypes.SimpleNamespace(addons={})
+
+    @property
+    def view_layer(self):
+        return self.scene.view_layers[0]
+
+    @property
+    def selected_objects(self):
+        return [obj for obj in self.scene.objects if obj.select_get()]
+
+    @property
+    def active_object(self):
+        return self.view_layer.objects.active
+
+    @property
+    def object(self):
+        return self.view_layer.objects.active
+
+    @property
+    def blend_data(self):
+        return data
+
+    def evaluated_depsgraph_get(self):
+        flush_depsgraph()
+        return self.view_layer.depsgraph
+
+    def temp_override(self, **kwargs):
+        ctx = self
+
+        class _Override:
+            def __enter__(self):
+                self._saved = {k: ctx.__dict__.get(k) for k in kwargs}
+                ctx.__dict__.update(kwargs)
+                return ctx
+
+            def __exit__(self, *exc):
+                for k, v in self._saved.items():
+                    if v is None:
+                        ctx.__dict__.pop(k, None)
+                    else:
+                        ctx.__dict__[k] = v
+                return False
+        return _Override()
+
+
+context = Context()
+
+
+def reset():
+    """Replaces all data with a fresh file holding one empty scene."""
+    data._reset()
+    _pending_updates.clear()
+    context._reset()
+    context.scene = data.scenes.new("Scene")
+    for name in HANDLER_NAMES:
+        getattr(handlers, name).clear()
+    timers._registered.clear()
+    SpaceView3D._draw_handlers.clear()
+    _ui_lists.clear()
+    reset_stats()
+
+
+# bpy.app
+#################################################
+
+app.version = (4, 2, 0)
+app.version_string = "4.2.0"
+app.background = False
+app.binary_path = "blender"
+app.tempdir = "/tmp/"
+app.online_access = False
+
+for _name in HANDLER_NAMES:
+    setattr(handlers, _name, [])
+
+
+def persistent(func):
+    func._bpy_persistent = True
+    return func
+
+
+handlers.persistent = persistent
+
+
+timers._registered = []
+
+
+def _timer_register(function, first_interval=0.0, persistent=False):
+    timers._registered.append(function)
+
+
+def _timer_unregister(function):
+    timers._registered.remove(function)
+
+
+def _timer_is_registered(function):
+    return function in timers._registered
+
+
+def run_timers():
+    """Runs every registered timer once, dropping those that return None."""
+    for function in list(timers._registered):
+        if function not in timers._registered:
+            continue
+        result = function()
+        if result is None and function in timers._registered:
+            timers._registered.remove(function)
+
+
+timers.register = _timer_register
+timers.unregister = _timer_unregister
+timers.is_registered = _timer_is_registered
+
+
+# bpy.utils
+#################################################
+
+_registered_classes = []
+
+
+def register_class(cls):
+    if cls in _registered_classes:
+        raise ValueError("register_class(...): already registered as a subclass '%s'" % cls.__name__)
+    _registered_classes.append(cls)
+    cls.is_registered = True
+    if issubclass(cls, Operator):
+        ops_handlers[cls.bl_idname] = lambda *args, **kwargs: _run_operator(cls, *args, **kwargs)
+
+
+def unregister_class(cls):
+    _registered_classes.remove(cls)
+    cls.is_registered = False
+    if issubclass(cls, Operator):
+        ops_handlers.pop(cls.bl_idname, None)
+
+
+def _user_resource(resource_type, path="", create=False):
+    import os
+    import tempfile
+    base = os.path.join(tempfile.gettempdir(), "bpy_stand_in", resource_type.lower(), path)
+    if create:
+        os.makedirs(base, exist_ok=True)
+    return base
+
+
+def _extension_path_user(package, path="", create=False):
+    return _user_resource("EXTENSIONS", path=package.replace(".", "_") + ("/" + path if path else ""),
+                          create=create)
+
+
+utils.register_class = register_class
+utils.unregister_class = unregister_class
+utils.user_resource = _user_resource
+utils.extension_path_user = _extension_path_user
+utils.escape_identifier = lambda s: s.replace("\\", "\\\\").replace("\"", "\\\"")
+utils._registered_classes = _registered_classes
+
+
+# bpy.path
+#################################################
+
+def _abspath(p, start=None):
+    import os
+    if p.startswith("//"):
+        base = os.path.dirname(data.filepath) if data.filepath else os.getcwd()
+        return os.path.join(base, p[2:])
+    return p
+
+
+def _basename(p):
+    import os
+    return os.path.basename(p[2:] if p.startswith("//") else p)
+
+
+def _clean_name(name, replace="_"):
+    # Like Blender, everything but A-Z, a-z and 0-9 is replaced
+    return "".join(c if c.isascii() and c.isalnum() else replace for c in name)
+
+
+def _relpath(p, start=None):
+    import os
+    base = os.path.dirname(data.filepath) if data.filepath else os.getcwd()
+    return "//" + os.path.relpath(p, base)
+
+
+path.abspath = _abspath
+path.relpath = _relpath
+path.basename = _basename
+path.clean_name = _clean_name
+
+
+# bpy.ops
+#################################################
+
+class _OpsNamespace:
+    def __init__(self, prefix):
+        self._prefix = prefix
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if not self._prefix:
+            return _OpsNamespace(name)
+        idname = self._prefix + "." + name
+
+        def call(*args, **kwargs):
+            stats["operator_calls"] += 1
+            handler = ops_handlers.get(idname)
+            if handler is None:
+                raise RuntimeError("operator %s not available in the stand-in" % idname)
+            return handler(*args, **kwargs)
+        return call
+
+
+ops_handlers = {}
+ops.object = _OpsNamespace("object")
+ops.wm = _OpsNamespace("wm")
+
+
+def _run_operator(cls, execution_context='EXEC_DEFAULT', undo=None, **kwargs):
+    """Runs a registered operator like bpy.ops does, keeping the instance's reports in last_reports."""
+    operator = cls(**kwargs)
+    if execution_context.startswith('INVOKE') and hasattr(operator, "invoke"):
+        result = operator.invoke(context, Event())
+    else:
+        result = operator.execute(context)
+    last_reports[:] = operator.reports
+    return result
+
+
+# Reports of the last operator run through bpy.ops
+last_reports = []
+
+
+def _modifier_apply(modifier="", **kwargs):
+    obj = context.__dict__.get("object") or context.view_layer.objects.active
+    mod = obj.modifiers.get(modifier)
+    if mod is None:
+        raise RuntimeError("Modifier '%s' not found" % modifier)
+    if obj.data.users > 1:
+        raise RuntimeError("Modifiers cannot be applied to multi-user data")
+    others = [m for m in obj.modifiers._items if m is not mod]
+    states = [m.show_viewport for m in others]
+    for m in others:
+        m.__dict__["show_viewport"] = False
+    mesh = _evaluate_mesh(obj)
+    for m, state in zip(others, states):
+        m.__dict__["show_viewport"] = state
+    obj.data._arrays["co"] = mesh._co
+    obj.modifiers.remove(mod)
+    return {'FINISHED'}
+
+
+def _wm_save_mainfile(filepath=None, **kwargs):
+    data.filepath = filepath or data.filepath
+    for handler in list(handlers.save_post):
+        handler(data.filepath)
+    return {'FINISHED'}
+
+
+ops_handlers["object.modifier_apply"] = _modifier_apply
+ops_handlers["wm.save_mainfile"] = _wm_save_mainfile
+ops_handlers["wm.save_as_mainfile"] = _wm_save_mainfile
+
+
+reset()
@@ -0,0 +1,24 @@
+"""Stand-in for the parts of Blender's gpu module used by the deformation preview.
+
+Every call is appended to `calls`, so tests can check what a draw callback drew.
+"""
+
+calls = []
+
+
+class _Shader:
+    def uniform_float(self, name, value):
+        calls.append(("uniform", name, value))
+
+
+class shader:
+    @staticmethod
+    def from_builtin(name):
+        calls.append(("shader", name))
+        return _Shader()
+
+
+class state:
+    @staticmethod
+    def point_size_set(size):
+        calls.append(("point_size", size))
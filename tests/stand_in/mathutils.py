@@ -0,0 +1,146 @@
+"""Minimal stand-in for the parts of Blender's mathutils module used by the addon."""
+
+import math
+
+
+class Vector:
+    __slots__ = ("_v",)
+
+    def __init__(self, values=(0.0, 0.0, 0.0)):
+        self._v = [float(v) for v in values]
+
+    def __len__(self):
+        return len(self._v)
+
+    def __iter__(self):
+        return iter(self._v)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return Vector(self._v[i])
+        return self._v[i]
+
+    def __setitem__(self, i, value):
+        self._v[i] = float(value)
+
+    def __repr__(self):
+        return "Vector(%r)" % (tuple(self._v),)
+
+    def __eq__(self, other):
+        try:
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        except TypeError:
+            return NotImplemented
+
+    __hash__ = None
+
+    def _zip(self, other, op):
+        return Vector(op(a, b) for a, b in zip(self._v, other))
+
+    def __add__(self, other):
+        return self._zip(other, lambda a, b: a + b)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        return self._zip(other, lambda a, b: a - b)
+
+    def __rsub__(self, other):
+        return self._zip(other, lambda a, b: b - a)
+
+    def __mul__(self, other):
+        if isinstance(other, (int, float)):
+            return Vector(a * other for a in self._v)
+        return self._zip(other, lambda a, b: a * b)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        return Vector(a / other for a in self._v)
+
+    def __neg__(self):
+        return Vector(-a for a in self._v)
+
+    def dot(self, other):
+        return sum(a * b for a, b in zip(self._v, other))
+
+    @property
+    def length(self):
+        return math.sqrt(self.dot(self))
+
+    def copy(self):
+        return Vector(self._v)
+
+    def to_tuple(self):
+        return tuple(self._v)
+
+    x = property(lambda self: self._v[0], lambda self, v: self.__setitem__(0, v))
+    y = property(lambda self: self._v[1], lambda self, v: self.__setitem__(1, v))
+    z = property(lambda self: self._v[2], lambda self, v: self.__setitem__(2, v))
+
+
+class Matrix:
+    def __init__(self, rows=None):
+        if rows is None:
+            rows = [[1.0 if i == j else 0.0 for j in range(4)] for i in range(4)]
+        self._rows = [[float(v) for v in row] for row in rows]
+
+    @classmethod
+    def Identity(cls, size):
+        return cls([[1.0 if i == j else 0.0 for j in range(size)] for i in range(size)])
+
+    @classmethod
+    def Translation(cls, vector):
+        m = cls.Identity(4)
+        for i in range(3):
+            m._rows[i][3] = float(vector[i])
+        return m
+
+    @classmethod
+    def Diagonal(cls, vector):
+        n = len(vector)
+        return cls([[float(vector[i]) if i == j else 0.0 for j in range(n)] for i in range(n)])
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __iter__(self):
+        return (Vector(row) for row in self._rows)
+
+    def __getitem__(self, i):
+        return Vector(self._rows[i])
+
+    def __repr__(self):
+        return "Matrix(%r)" % (self._rows,)
+
+    def to_4x4(self):
+        m = Matrix.Identity(4)
+        for i, row in enumerate(self._rows[:4]):
+            for j, v in enumerate(row[:4]):
+                m._rows[i][j] = v
+        return m
+
+    def to_3x3(self):
+        return Matrix([row[:3] for row in self._rows[:3]])
+
+    def transposed(self):
+        return Matrix([list(col) for col in zip(*self._rows)])
+
+    def inverted(self):
+        import numpy as np
+        return Matrix(np.linalg.inv(np.array(self._rows)).tolist())
+
+    def copy(self):
+        return Matrix(self._rows)
+
+    def __matmul__(self, other):
+        if isinstance(other, Matrix):
+            cols = list(zip(*other._rows))
+            return Matrix([[sum(a * b for a, b in zip(row, col)) for col in cols] for row in self._rows])
+        vec = list(other)
+        n = len(self._rows)
+        if n == 4 and len(vec) == 3:
+            vec4 = vec + [1.0]
+            out = [sum(a * b for a, b in zip(row, vec4)) for row in self._rows]
+            return Vector(out[:3])
+        return Vector(sum(a * b for a, b in zip(row, vec)) for row in self._rows)
@@ -0,0 +1,121 @@
+import math
+
+import numpy as np
+import pytest
+
+from conftest import addon_module
+
+deform = addon_module("deform")
+
+
+def reference_weights(t, interpolation):
+    """ key_curve_position_weights() of Blender's key.cc, one value at a time. """
+    if interpolation == 'KEY_LINEAR':
+        return [0.0, 1.0 - t, t, 0.0]
+    t2 = t * t
+    t3 = t2 * t
+    if interpolation == 'KEY_BSPLINE':
+        return [-0.16666666 * t3 + 0.5 * t2 - 0.5 * t + 0.16666666, 0.5 * t3 - t2 + 0.66666666,
+                -0.5 * t3 + 0.5 * t2 + 0.5 * t + 0.16666666, 0.16666666 * t3]
+    fc = deform.CARDINAL_TENSION[interpolation]
+    return [-fc * t3 + 2 * fc * t2 - fc * t, (2 - fc) * t3 + (fc - 3) * t2 + 1,
+            (fc - 2) * t3 + (3 - 2 * fc) * t2 + fc * t, fc * t3 - fc * t2]
+
+
+def reference_deform(coords, object_matrix, lattice, strength):
+    """ Per-vertex port of BKE_lattice_deform_data_create() and BKE_lattice_deform_data_eval_co(). """
+    pu, pv, pw = lattice.resolution
+    latmat = np.linalg.inv(lattice.matrix) @ object_matrix
+    imat = np.linalg.inv(latmat)
+    fu, fv, fw = [-0.5 if n > 1 else 0.0 for n in lattice.resolution]
+    du, dv, dw = [1.0 / (n - 1) if n > 1 else 0.0 for n in lattice.resolution]
+
+    offsets = []
+    i = 0
+    for w in range(pw):
+        for v in range(pv):
+            for u in range(pu):
+                rest = np.array([fu + u * du, fv + v * dv, fw + w * dw])
+                offsets.append(imat[:3, :3] @ (lattice.points[i] - rest))
+                i += 1
+
+    def axis(x, count, first, step, interpolation):
+        if count > 1:
+            position = (x - first) / step
+            index = math.floor(position)
+            return index, reference_weights(position - index, interpolation)
+        return 0, [0.0, 1.0, 0.0, 0.0]
+
+    def clamp(index, count, stride):
+        return 0 if index <= 0 else (index if index < count else count - 1) * stride
+
+    result = []
+    for co in coords:
+        vec = latmat[:3, :3] @ co + latmat[:3, 3]
+        ui, tu = axis(vec[0], pu, fu, du, lattice.interpolation[0])
+        vi, tv = axis(vec[1], pv, fv, dv, lattice.interpolation[1])
+        wi, tw = axis(vec[2], pw, fw, dw, lattice.interpolation[2])
+        deformed = co.copy()
+        blend = 0.0
+        for ww in range(wi - 1, wi + 3):
+            for vv in range(vi - 1, vi + 3):
+                for uu in range(ui - 1, ui + 3):
+                    weight = strength * tw[ww - wi + 1] * tv[vv - vi + 1] * tu[uu - ui + 1]
+                    if weight == 0.0:
+                        continue
+                    index = clamp(uu, pu, 1) + clamp(vv, pv, pu) + clamp(ww, pw, pu * pv)
+                    deformed = deformed + offsets[index] * weight
+                    if lattice.point_weights is not None:
+                        blend += weight * lattice.point_weights[index]
+        if lattice.point_weights is not None:
+            deformed = co + (deformed - co) * blend
+        result.append(deformed)
+    return np.array(result)
+
+
+def rotation_z(angle):
+    matrix = np.eye(4)
+    matrix[:2, :2] = [[math.cos(angle), -math.sin(angle)], [math.sin(angle), math.cos(angle)]]
+    return matrix
+
+
+@pytest.mark.parametrize("interpolation", [
+    ('KEY_BSPLINE',) * 3,
+    ('KEY_LINEAR',) * 3,
+    ('KEY_CARDINAL', 'KEY_CATMULL_ROM', 'KEY_LINEAR'),
+])
+@pytest.mark.parametrize("resolution", [(2, 2, 2), (4, 3, 5), (1, 3, 2)])
+@pytest.mark.parametrize("point_weighted", [False, True])
+def test_deform_coords_matches_blender(interpolation, resolution, point_weighted):
+    rng = np.random.default_rng(1)
+    lattice_matrix = rotation_z(0.3)
+    lattice_matrix[:3, :3] *= [3, 2, 4]
+    lattice_matrix[:3, 3] = [1, 2, 3]
+    object_matrix = rotation_z(-0.7)
+    object_matrix[:3, 3] = [0.5, 1.5, 2.5]
+    count = int(np.prod(resolution))
+    points = deform.grid_positions(resolution) + rng.normal(0.0, 0.1, (count, 3))
+    point_weights = rng.uniform(0.0, 1.0, count) if point_weighted else None
+    lattice = deform.LatticeState(lattice_matrix, resolution, points, interpolation, point_weights)
+    coords = rng.uniform(-3.0, 3.0, (50, 3))
+
+    result = deform.deform_coords(coords, object_matrix, lattice, 0.7)
+    assert result == pytest.approx(reference_deform(coords, object_matrix, lattice, 0.7), abs=1e-5)
+
+
+def test_uniform_offset_translates_inside_the_lattice():
+    resolution = (4, 4, 4)
+    lattice = deform.LatticeState(np.eye(4), resolution, deform.grid_positions(resolution) + [0.1, 0.0, 0.0],
+                                  deform.DEFAULT_INTERPOLATION, None)
+    coords = np.random.default_rng(2).uniform(-0.4, 0.4, (10, 3))
+    assert deform.deform_coords(coords, np.eye(4), lattice) == pytest.approx(coords + [0.1, 0.0, 0.0])
+
+
+def test_strength_and_vertex_weights_scale_the_displacement():
+    resolution = (2, 2, 2)
+    lattice = deform.LatticeState(np.eye(4), resolution, deform.grid_positions(resolution) + [0.0, 0.0, 1.0],
+                                  deform.DEFAULT_INTERPOLATION, None)
+    coords = np.zeros((2, 3))
+    result = deform.deform_coords(coords, np.eye(4), lattice, 0.5, np.array([1.0, 0.0]))
+    assert result == pytest.approx(np.array([[0.0, 0.0, 0.5], [0.0, 0.0, 0.0]]))
+
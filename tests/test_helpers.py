@@ -0,0 +1,421 @@
+import os
+import sys
+import types
+
+import bpy
+import numpy as np
+import pytest
+
+from conftest import addon_module, move_lattice_points
+
+
+def test_registering_leaves_the_numpy_modules_unloaded(addon):
+    assert "lattice_manager.snapshots" not in sys.modules
+    assert "lattice_manager.pointcache" not in sys.modules
+
+
+def test_calculate_bounding_box_spans_all_objects(lm, make_cube):
+    objects = [make_cube("A", (0, 0, 0)), make_cube("B", (5, 2, -1))]
+    min_coords, max_coords = lm.calculate_bounding_box(objects)
+    assert tuple(min_coords) == pytest.approx((-1, -1, -2))
+    assert tuple(max_coords) == pytest.approx((6, 3, 1))
+
+
+def test_calculate_bounding_box_exact_matches_bound_box_for_cubes(lm, make_cube):
+    objects = [make_cube("A", (1, 2, 3))]
+    exact = lm.calculate_bounding_box(objects, exact=True)
+    boxes = lm.calculate_bounding_box(objects)
+    assert tuple(exact[0]) == pytest.approx(tuple(boxes[0]))
+    assert tuple(exact[1]) == pytest.approx(tuple(boxes[1]))
+
+
+def test_add_lattice_fits_and_links_into_lattices_collection(context, lm, props, managed_scene):
+    objects = managed_scene(3)
+    lm.add_lattice(context, manage_all=True)
+
+    lattice = bpy.data.objects["Lattice 1"]
+    assert [collection.name for collection in lattice.users_collection] == ["Lattices"]
+    assert tuple(lattice.location) == pytest.approx((3, 0, 0))
+    assert tuple(lattice.scale) == pytest.approx((8, 2, 2))
+    for obj in objects:
+        mod = obj.modifiers["Lattice 1"]
+        assert mod.object is lattice
+        assert mod.strength == 0.0
+    assert props.lattice_count == 1
+
+
+def test_lattice_resolution_caps_total_points(lm):
+    assert lm.lattice_resolution([10, 2, 0.5], 1.0, 16, 4096) == (11, 3, 2)
+    points = lm.lattice_resolution([100, 100, 100], 1.0, 64, 512)
+    assert np.prod(points) <= 512
+
+
+def test_oriented_fit_follows_the_principal_axis(context, lm, props, make_cube):
+    mesh = bpy.data.meshes.new("Long")
+    mesh.from_pydata([(x, y, z) for x in (-5, 5) for y in (-0.5, 0.5) for z in (-0.5, 0.5)], [], [])
+    obj = make_cube("Long", mesh=mesh)
+    props.fit_mode = 'ORIENTED'
+    lattice = lm.fit_new_lattice(context, [obj])
+    assert sorted(lattice.scale) == pytest.approx([1, 1, 10])
+
+
+def test_add_lattices_creates_one_lattice_per_spec(context, lm, props, managed_scene):
+    objects = managed_scene(4)
+    specs = [lm.LatticeSpec(objects[:2]), lm.LatticeSpec([]), lm.LatticeSpec(objects[2:])]
+    lattices, timings = lm.add_lattices(context, specs)
+
+    assert [lattice.name for lattice in lattices] == ["Lattice 1", "Lattice 2"]
+    assert all(lattice.users_collection[0].name == "Lattices" for lattice in lattices)
+    assert [list(obj.modifiers.keys()) for obj in objects] == [["Lattice 1"]] * 2 + [["Lattice 2"]] * 2
+    assert timings["lattices"] == 2 and timings["modifiers_added"] == 4
+    assert timings["total"] >= timings["modifiers"]
+    assert props.lattice_count == 2
+
+
+def test_cluster_objects_respects_max_objects(lm):
+    rng = np.random.default_rng(0)
+    corners = rng.uniform(-100, 100, (200, 1, 3)).repeat(8, axis=1)
+    for method in ('GRID', 'KMEANS'):
+        clusters = lm.cluster_objects(corners, method, 20, cell_size=50.0)
+        assert max(len(cluster) for cluster in clusters) <= 20
+        assert sorted(i for cluster in clusters for i in cluster) == list(range(200))
+
+
+def test_expand_instances_replaces_instancers_by_their_objects(context, lm, make_cube):
+    source = make_cube("Source")
+    collection = bpy.data.collections.new("Scatter")
+    collection.objects.link(source)
+    instancers = []
+    for i in range(2):
+        empty = bpy.data.objects.new(f"Instance {i}", None)
+        empty.instance_type = 'COLLECTION'
+        empty.instance_collection = collection
+        instancers.append(empty)
+    assert lm.expand_instances(instancers + [source]) == instancers + [source]
+
+
+def test_lattice_modifier_table_reads_every_stack_once(context, lm, managed_scene):
+    objects = managed_scene(2)
+    lm.add_lattice(context, manage_all=True)
+    objects[0].modifiers.new(name="Displace", type='DISPLACE')
+    rows = lm.lattice_modifier_table(objects)
+    assert [(obj, [mod.name for mod in lattice_mods], [mod.name for mod in other_mods])
+            for obj, lattice_mods, other_mods in rows] == [
+        (objects[0], ["Lattice 1"], ["Displace"]),
+        (objects[1], ["Lattice 1"], []),
+    ]
+
+
+def test_registry_follows_renames_and_members(context, lm, managed_scene):
+    objects = managed_scene(3)
+    lm.add_lattice(context, manage_all=True)
+    lattice = bpy.data.objects["Lattice 1"]
+    uid = lattice.lattice_registry.uid
+
+    lattice.name = "Renamed"
+    assert lm.find_lattice(uid) is lattice
+    assert lm.lattice_members(lattice) == objects
+
+    assert lm.delete_lattice_modifiers(objects[:2], "Lattice 1") == 2
+    assert lm.lattice_members(lattice) == objects[2:]
+
+
+def test_repair_registry_gives_duplicates_their_own_uid(context, lm, managed_scene):
+    objects = managed_scene(2)
+    lm.add_lattice(context, manage_all=True)
+    lattice = bpy.data.objects["Lattice 1"]
+    copy = bpy.data.objects.new("Copy", bpy.data.lattices.new("Copy"))
+    context.scene.collection.objects.link(copy)
+    copy.lattice_registry.uid = lattice.lattice_registry.uid
+    objects[1].modifiers.new(name="Copy", type='LATTICE').object = copy
+
+    stats = lm.repair_lattice_registry()
+    assert stats["reassigned"] == 1
+    assert copy.lattice_registry.uid != lattice.lattice_registry.uid
+    assert lm.find_lattice(copy.lattice_registry.uid) is copy
+
+
+def test_sync_keeps_items_when_modifiers_are_renamed(context, lm, props, managed_scene):
+    objects = managed_scene(2)
+    lm.add_lattice(context, manage_all=True)
+    lm.update_lattice_data(context)
+    item = props.lattice_data[0]
+    item.name = "ui state"
+
+    for obj in objects:
+        obj.modifiers["Lattice 1"].name = "Everything"
+    lm.invalidate_lattice_index()
+    lm.update_lattice_data(context)
+    assert [(item.lattice_name, item.name) for item in props.lattice_data] == [("Everything", "ui state")]
+
+
+def test_strength_presets_round_trip(context, lm, props, managed_scene):
+    objects = managed_scene(2)
+    lm.add_lattice(context, manage_all=True)
+    lm.update_lattice_data(context)
+    item = props.lattice_data[0]
+    item.strength = 0.4
+    preset = lm.save_strength_preset(props, "Partial")
+
+    item.strength = 1.0
+    # Slider writes are queued for a timer outside of background mode
+    lm.flush_pending_strength(context)
+    assert [obj.modifiers["Lattice 1"].strength for obj in objects] == [1.0, 1.0]
+    assert lm.apply_strength_preset(context, preset) == {"Lattice 1": pytest.approx(0.4)}
+    assert [obj.modifiers["Lattice 1"].strength for obj in objects] == pytest.approx([0.4, 0.4])
+
+
+def test_apply_lattice_modifier_batch_bakes_the_deformation(context, lm, managed_scene):
+    objects = managed_scene(2)
+    lm.add_lattice(context, manage_all=True)
+    move_lattice_points(bpy.data.objects["Lattice 1"], (0.0, 0.0, 0.25))
+    for obj in objects:
+        obj.modifiers["Lattice 1"].strength = 1.0
+    before = [lm.evaluated_vertex_coords(obj, context.evaluated_depsgraph_get()) for obj in objects]
+
+    applied, failed = lm.apply_lattice_modifier_batch(context, objects, "Lattice 1")
+    assert applied == objects and failed == []
+    for obj, expected in zip(objects, before):
+        assert "Lattice 1" not in obj.modifiers
+        co = np.empty(len(obj.data.vertices) * 3, dtype=np.float32)
+        obj.data.vertices.foreach_get("co", co)
+        assert co.reshape(-1, 3) == pytest.approx(expected, abs=1e-5)
+
+
+@pytest.mark.parametrize("operation", ["apply", "delete"])
+def test_batch_worker_handles_every_lattice_in_one_pass(context, addon, lm, managed_scene, monkeypatch, operation):
+    objects = managed_scene(3)
+    lm.add_lattice(context, manage_all=True)
+    lm.add_lattice_to_objects(context, objects[:1])
+    monkeypatch.setitem(sys.modules, "addon_loader", types.SimpleNamespace(load_addon=lambda: addon))
+    batch = addon_module("batch")
+
+    result = batch.run_worker(batch.parse_args(["--worker", "--operation", operation, "--no-save"]))
+    assert [len(obj.modifiers) for obj in objects] == [0, 0, 0]
+    if operation == "apply":
+        assert result["lattices"] == {"Lattice 1": {"applied": 3, "failed": []},
+                                      "Lattice 2": {"applied": 1, "failed": []}}
+    else:
+        assert result["lattices"] == {"Lattice 1": {"removed": 3}, "Lattice 2": {"removed": 1}}
+
+
+def test_snapshots_restore_and_blend(context, lm, props, managed_scene):
+    managed_scene(1)
+    lm.add_lattice(context, manage_all=True)
+    lm.update_lattice_data(context)
+    item = props.lattice_data[0]
+    lattice = item.lattice_object
+    rest = lm.lattice_points(lattice).copy()
+
+    lm.take_lattice_snapshot(item, "Rest")
+    move_lattice_points(lattice, (1.0, 0.0, 0.0))
+    lm.take_lattice_snapshot(item, "Moved")
+
+    assert lm.restore_lattice_snapshot(item, "Rest", 0.5)
+    assert lm.lattice_points(lattice) == pytest.approx(rest + [0.5, 0, 0])
+    assert lm.restore_lattice_snapshot(item, "Moved", 0.25, blend_from="Rest")
+    assert lm.lattice_points(lattice) == pytest.approx(rest + [0.25, 0, 0])
+    assert not lm.restore_lattice_snapshot(item, "Missing")
+
+    lattice.data.points_u = 3
+    assert not lm.restore_lattice_snapshot(item, "Rest")
+
+
+def test_snapshots_of_a_duplicated_lattice_stay_apart(context, lm, props, managed_scene, make_cube):
+    managed_scene(1)
+    lm.add_lattice(context, manage_all=True)
+    other = make_cube("Other", (10.0, 0.0, 0.0))
+    copy = bpy.data.objects.new("Lattice 1.001", bpy.data.lattices.new("Lattice 1.001"))
+    context.scene.collection.objects.link(copy)
+    lattice = bpy.data.objects["Lattice 1"]
+    # Duplicating a lattice copies its registry uid
+    copy.lattice_registry.uid = lattice.lattice_registry.uid
+    other.modifiers.new(name="Copy", type='LATTICE').object = copy
+    context.scene.managed_objects.add().object = other
+    lm.update_lattice_data(context)
+    item = lm.find_lattice_data(props, "Lattice 1")
+    copy_item = lm.find_lattice_data(props, "Copy")
+    rest = lm.lattice_points(lattice).copy()
+
+    lm.take_lattice_snapshot(item, "Snapshot")
+    move_lattice_points(copy, (1.0, 0.0, 0.0))
+    lm.take_lattice_snapshot(copy_item, "Snapshot")
+    assert copy.lattice_registry.uid != lattice.lattice_registry.uid
+
+    move_lattice_points(lattice, (0.0, 2.0, 0.0))
+    assert lm.restore_lattice_snapshot(item, "Snapshot")
+    assert lm.lattice_points(lattice) == pytest.approx(rest)
+
+
+def test_saving_writes_the_listed_snapshots_to_the_sidecar(context, lm, props, managed_scene, tmp_path):
+    managed_scene(1)
+    lm.add_lattice(context, manage_all=True)
+    lm.update_lattice_data(context)
+    filepath = str(tmp_path / "shot.blend")
+    bpy.ops.wm.save_mainfile(filepath=filepath)
+    sidecar = str(tmp_path / "shot_lattice_snapshots.npz")
+    assert not os.path.exists(sidecar)
+
+    lm.take_lattice_snapshot(props.lattice_data[0], "Rest")
+    bpy.ops.wm.save_mainfile(filepath=filepath)
+    with np.load(sidecar) as data:
+        assert len(data.files) == 1
+
+
+def test_unlinked_managed_objects_are_left_out(context, lm, managed_scene):
+    objects = managed_scene(3)
+    objects[2].location = (100.0, 0.0, 0.0)
+    context.scene.collection.objects.unlink(objects[2])
+
+    lm.add_lattice(context, manage_all=True)
+    assert [len(obj.modifiers) for obj in objects] == [1, 1, 0]
+    assert tuple(bpy.data.objects["Lattice 1"].scale) == pytest.approx((5, 2, 2))
+
+
+def test_sources_of_instanced_collections_stay_managed(context, props, make_cube):
+    source = make_cube("Source")
+    context.scene.collection.objects.unlink(source)
+    collection = bpy.data.collections.new("Scatter")
+    collection.objects.link(source)
+    instancer = bpy.data.objects.new("Instance", None)
+    instancer.instance_type = 'COLLECTION'
+    instancer.instance_collection = collection
+    context.scene.collection.objects.link(instancer)
+    for obj in context.scene.objects:
+        obj.select_set(obj is instancer)
+
+    bpy.ops.object.lattice_manage_selected()
+    assert bpy.ops.object.lattice_add_to_all() == {'FINISHED'}
+    assert list(source.modifiers.keys()) == ["Lattice 1"]
+
+
+def test_lookups_go_through_the_registry_uid(context, lm, props, managed_scene):
+    objects = managed_scene(2)
+    bpy.ops.object.lattice_add_to_all()
+    lattice = bpy.data.objects["Lattice 1"]
+    item = props.lattice_data[0]
+    assert item.lattice_uid == lattice.lattice_registry.uid
+
+    lattice.name = "Renamed"
+    assert lm.lattice_data_lattice(item) is lattice
+    assert lm.objects_with_modifier(context, "Lattice 1") == objects
+    bpy.ops.object.toggle_lattice_visibility(lattice_name="Lattice 1")
+    assert lattice.hide_viewport
+
+
+def test_registry_lookup_gives_duplicates_a_new_uid(context, lm, managed_scene):
+    managed_scene(1)
+    lm.add_lattice(context, manage_all=True)
+    lattice = bpy.data.objects["Lattice 1"]
+    copy = bpy.data.objects.new("Lattice 1.001", bpy.data.lattices.new("Lattice 1.001"))
+    copy.lattice_registry.uid = lattice.lattice_registry.uid
+
+    assert lm.find_lattice(lattice.lattice_registry.uid) is lattice
+    assert copy.lattice_registry.uid not in ("", lattice.lattice_registry.uid)
+    assert lm.find_lattice(copy.lattice_registry.uid) is copy
+
+
+def preview_points(lm):
+    lm._draw_lattice_preview()
+    return np.array(lm._preview["batch"].content["pos"])
+
+
+@pytest.mark.stand_in
+def test_preview_draws_the_deformed_vertices(context, lm, props, managed_scene):
+    objects = managed_scene(2)
+    bpy.ops.object.lattice_add_to_all()
+    move_lattice_points(bpy.data.objects["Lattice 1"], (0.0, 0.0, 0.5))
+    props.lattice_data[0].strength = 1.0
+    lm.flush_pending_strength(context)
+    bpy.ops.object.lattice_preview(lattice_name="Lattice 1")
+
+    expected = []
+    for obj in objects:
+        matrix = np.array(obj.matrix_world)
+        expected.append(obj.to_mesh()._co @ matrix[:3, :3].T + matrix[:3, 3])
+    assert preview_points(lm) == pytest.approx(np.concatenate(expected), abs=1e-5)
+
+    bpy.ops.object.lattice_preview(lattice_name="Lattice 1")
+    assert lm._preview["handler"] is None and not lm._preview["objects"]
+
+
+@pytest.mark.stand_in
+def test_preview_redraws_read_only_what_updates_dropped(context, lm, props, managed_scene, monkeypatch):
+    objects = managed_scene(2)
+    bpy.ops.object.lattice_add_to_all()
+    props.lattice_data[0].strength = 1.0
+    bpy.flush_depsgraph()
+    lattice = bpy.data.objects["Lattice 1"]
+    deform = sys.modules["lattice_manager.deform"]
+    calls = []
+    for name in ("mesh_coords", "lattice_state", "object_displacement"):
+        function = getattr(deform, name)
+        monkeypatch.setattr(deform, name, lambda *args, name=name, function=function: calls.append(name)
+                            or function(*args))
+
+    def redraw():
+        calls.clear()
+        bpy.reset_stats()
+        points = preview_points(lm)
+        return sorted(calls), bpy.stats["modifier_reads"], points
+
+    bpy.ops.object.lattice_preview(lattice_name="Lattice 1")
+    first = redraw()
+    assert first[0] == ["lattice_state"] + ["mesh_coords"] * 2 + ["object_displacement"] * 2
+    # Nothing changed: the cached batch is drawn as it is
+    assert redraw()[:2] == ([], 0)
+
+    move_lattice_points(lattice, (0.0, 0.0, 1.0))
+    bpy.flush_depsgraph()
+    moved = redraw()
+    assert moved[0] == ["lattice_state", "object_displacement", "object_displacement"]
+    assert moved[2][:, 2].mean() > first[2][:, 2].mean()
+
+    # A new strength blends the cached displacements again
+    props.lattice_data[0].strength = 0.5
+    calls_made, reads, points = redraw()
+    assert (calls_made, reads) == ([], 0)
+    assert first[2][:, 2].mean() < points[:, 2].mean() < moved[2][:, 2].mean()
+
+    # The stand-in reports every object update as a geometry update
+    objects[0].location = (0.0, 0.0, 5.0)
+    bpy.flush_depsgraph()
+    assert redraw()[0] == ["mesh_coords", "object_displacement"]
+
+    update = bpy.types.DepsgraphUpdate(objects[1])
+    update.is_updated_geometry = False
+    depsgraph = bpy.types.Depsgraph(context.scene)
+    depsgraph.updates = [update]
+    lm.invalidate_lattice_preview(depsgraph)
+    # A transform keeps the mesh coords
+    assert redraw()[0] == ["object_displacement"]
+
+
+def test_profile_counts_each_object_once_per_call(addon, props, managed_scene):
+    managed_scene(4)
+    props.profiling_enabled = True
+    bpy.ops.object.lattice_add_to_all()
+    props.profiling_enabled = False
+
+    records = {record["name"]: record for record in addon.instrumentation.records}
+    # The corners, the modifiers and the index rebuild each visit the four objects
+    assert records["add_lattice_modifiers"]["objects"] == 4
+    assert records["object.lattice_add_to_all.execute"]["objects"] == 4
+    assert records["object.lattice_add_to_all.execute"]["modifiers"] == 4
+
+
+@pytest.mark.stand_in
+def test_lattice_list_order_is_recomputed_after_undo(context, lm, props, managed_scene):
+    objects = managed_scene(2)
+    lm.add_lattice_to_objects(context, objects[:1])
+    lm.add_lattice_to_objects(context, objects[1:])
+    lm.update_lattice_data(context)
+    ui_list = bpy._instantiate(lm.LATTICE_UL_lattices)
+    ui_list.use_filter_sort_alpha = True
+    assert ui_list.filter_items(context, props, "lattice_data")[1] == [0, 1]
+
+    # Undo restores lattice_data in place, with the same length and without a sync
+    first, second = props.lattice_data
+    first.lattice_name, second.lattice_name = "B", "A"
+    lm._on_file_changed()
+    assert ui_list.filter_items(context, props, "lattice_data")[1] == [1, 0]
@@ -0,0 +1,316 @@
+import itertools
+import os
+import types
+
+import bpy
+import numpy as np
+import pytest
+
+from conftest import move_lattice_points
+
+
+def select(context, objects):
+    for obj in context.scene.objects:
+        obj.select_set(obj in objects)
+
+
+def test_manage_selected_skips_non_meshes(context, props, make_cube):
+    cube = make_cube("Cube")
+    empty = bpy.data.objects.new("Empty", None)
+    context.scene.collection.objects.link(empty)
+    select(context, [cube, empty])
+
+    assert bpy.ops.object.lattice_manage_selected() == {'FINISHED'}
+    assert props.is_managing
+    assert [item.object for item in context.scene.managed_objects] == [cube]
+
+    assert bpy.ops.object.lattice_unmanage_all() == {'FINISHED'}
+    assert not props.is_managing
+    assert len(context.scene.managed_objects) == 0
+
+
+def test_add_to_selected_only_deforms_the_selection(context, props, managed_scene):
+    objects = managed_scene(3)
+    select(context, objects[:1])
+    assert bpy.ops.object.lattice_add_to_selected() == {'FINISHED'}
+    assert [len(obj.modifiers) for obj in objects] == [1, 0, 0]
+    assert [item.lattice_name for item in props.lattice_data] == ["Lattice 1"]
+
+
+@pytest.mark.parametrize("fit_mode", ['AXIS_ALIGNED', 'ORIENTED'])
+def test_adding_to_an_empty_selection_is_cancelled(context, props, managed_scene, fit_mode):
+    managed_scene(2)
+    props.fit_mode = fit_mode
+    select(context, [])
+    assert bpy.ops.object.lattice_add_to_selected() == {'CANCELLED'}
+    assert not any(obj.type == 'LATTICE' for obj in bpy.data.objects)
+
+
+def test_add_by_cluster_splits_distant_groups(context, props, make_cube):
+    objects = [make_cube(f"Cube {i}", (i * 3.0 + (100.0 if i >= 2 else 0.0), 0.0, 0.0)) for i in range(4)]
+    select(context, objects)
+    bpy.ops.object.lattice_manage_selected()
+
+    assert bpy.ops.object.lattice_add_by_cluster(method='GRID', cell_size=50.0, max_objects=10) == {'FINISHED'}
+    assert [list(obj.modifiers.keys()) for obj in objects] == [["Lattice 1"]] * 2 + [["Lattice 2"]] * 2
+    assert sorted(item.lattice_name for item in props.lattice_data) == ["Lattice 1", "Lattice 2"]
+
+
+def test_select_and_deselect_objects_with_modifier(context, managed_scene, make_cube):
+    objects = managed_scene(2)
+    bpy.ops.object.lattice_add_to_all()
+    other = make_cube("Other", (10.0, 0.0, 0.0))
+    select(context, [])
+
+    bpy.ops.object.select_objects_with_modifier(modifier_name="Lattice 1")
+    assert set(context.selected_objects) == set(objects)
+    bpy.ops.object.deselect_objects_with_modifier(modifier_name="Lattice 1")
+    assert context.selected_objects == []
+    assert not other.select_get()
+
+
+def set_strength(context, lm, props, strength):
+    props.lattice_data[0].strength = strength
+    # Outside of background mode the slider's write waits for a timer
+    lm.flush_pending_strength(context)
+
+
+def test_apply_lattice_modifier_per_object(context, lm, props, managed_scene):
+    objects = managed_scene(2)
+    bpy.ops.object.lattice_add_to_all()
+    move_lattice_points(bpy.data.objects["Lattice 1"], (0.0, 0.5, 0.0))
+    set_strength(context, lm, props, 1.0)
+
+    assert bpy.ops.object.apply_lattice_modifier(modifier_name="Lattice 1") == {'FINISHED'}
+    assert all(len(obj.modifiers) == 0 for obj in objects)
+    assert len(props.lattice_data) == 0
+    co = np.empty(24, dtype=np.float32)
+    objects[0].data.vertices.foreach_get("co", co)
+    # Lattice points move in lattice space, the lattice is two units deep
+    assert co.reshape(-1, 3)[:, 1].mean() == pytest.approx(1.0, abs=1e-5)
+
+
+def test_apply_bakes_modifiers_hidden_in_the_viewport(context, lm, props, managed_scene):
+    objects = managed_scene(2)
+    bpy.ops.object.lattice_add_to_all()
+    move_lattice_points(bpy.data.objects["Lattice 1"], (0.0, 0.5, 0.0))
+    set_strength(context, lm, props, 1.0)
+    for obj in objects:
+        obj.modifiers["Lattice 1"].show_viewport = False
+
+    assert bpy.ops.object.apply_lattice_modifier(modifier_name="Lattice 1") == {'FINISHED'}
+    for obj in objects:
+        co = np.empty(24, dtype=np.float32)
+        obj.data.vertices.foreach_get("co", co)
+        assert co.reshape(-1, 3)[:, 1].mean() == pytest.approx(1.0, abs=1e-5)
+
+
+def test_apply_lattice_modifier_shared_keeps_meshes_shared(context, lm, props, make_cube):
+    first = make_cube("First")
+    second = make_cube("Second", (3.0, 0.0, 0.0), mesh=first.data)
+    select(context, [first, second])
+    bpy.ops.object.lattice_manage_selected()
+    bpy.ops.object.lattice_add_to_all()
+    set_strength(context, lm, props, 1.0)
+
+    bpy.ops.object.apply_lattice_modifier(modifier_name="Lattice 1", mode='SHARED')
+    assert first.data is second.data
+    assert first.data.users == 2
+
+
+def test_apply_measures_only_the_applied_meshes(context, lm, managed_scene, make_cube, monkeypatch):
+    objects = managed_scene(2)
+    bpy.ops.object.lattice_add_to_all()
+    make_cube("Other", (10.0, 0.0, 0.0))
+    measured = []
+    mesh_memory = lm.mesh_memory
+
+    def recording_mesh_memory(meshes):
+        meshes = list(meshes)
+        measured.append(sorted(mesh.name for mesh in meshes))
+        return mesh_memory(meshes)
+    monkeypatch.setattr(lm, "mesh_memory", recording_mesh_memory)
+
+    bpy.ops.object.apply_lattice_modifier(modifier_name="Lattice 1")
+    # One reading before and one after, of the objects' meshes and then of their results
+    assert measured == [sorted(obj.data.name for obj in objects)] * 2
+
+
+@pytest.mark.stand_in
+def test_modal_apply_runs_in_batches_until_esc(context, lm, managed_scene, monkeypatch):
+    objects = managed_scene(5)
+    bpy.ops.object.lattice_add_to_all()
+    monkeypatch.setattr(lm, "APPLY_BATCH_SIZE", 2)
+    # Each perf_counter() call advances one unit, so a timer tick has time for exactly one batch
+    monkeypatch.setattr(lm, "APPLY_TIME_BUDGET", 1.5)
+    monkeypatch.setattr(lm, "time", types.SimpleNamespace(perf_counter=itertools.count().__next__))
+    wm = context.window_manager
+
+    assert bpy.ops.object.apply_lattice_modifier('INVOKE_DEFAULT', modifier_name="Lattice 1") == {'RUNNING_MODAL'}
+    [operator] = wm.modal_handlers
+    # Other events are held back while the queue holds modifiers
+    assert operator.modal(context, bpy.types.Event('X', 'PRESS')) == {'RUNNING_MODAL'}
+    assert all("Lattice 1" in obj.modifiers for obj in objects)
+
+    for applied in (2, 4):
+        assert operator.modal(context, bpy.types.Event('TIMER')) == {'RUNNING_MODAL'}
+        assert wm.progress == applied
+        assert sum("Lattice 1" not in obj.modifiers for obj in objects) == applied
+
+    assert operator.modal(context, bpy.types.Event('ESC', 'PRESS')) == {'CANCELLED'}
+    assert wm.timers == [] and wm.progress is None
+    assert sum("Lattice 1" in obj.modifiers for obj in objects) == 1
+    [(level, message)] = operator.reports
+    assert level == {'WARNING'}
+    assert message.startswith("Cancelled: applied lattice modifier 'Lattice 1' to 4 of 5 objects.")
+
+
+def test_strength_keyframes_are_added_and_overwritten(context, lm, props, managed_scene):
+    objects = managed_scene(2)
+    bpy.ops.object.lattice_add_to_all()
+    props.lattice_data[0].strength = 0.75
+    bpy.ops.object.lattice_preset_save(preset_name="Strong")
+    context.scene.frame_current = 10
+    assert bpy.ops.object.lattice_preset_keyframe(preset_name="Strong") == {'FINISHED'}
+
+    def keys(obj):
+        fcurve = obj.animation_data.action.fcurves.find('modifiers["Lattice 1"].strength')
+        return [tuple(point.co) for point in fcurve.keyframe_points]
+    assert [keys(obj) for obj in objects] == [[pytest.approx((10.0, 0.75))]] * 2
+
+    lm.keyframe_modifier_strengths([(obj, "Lattice 1", 0.25) for obj in objects], 10)
+    lm.keyframe_modifier_strengths([(objects[0], "Lattice 1", 1.0)], 5)
+    assert keys(objects[0]) == [pytest.approx((5.0, 1.0)), pytest.approx((10.0, 0.25))]
+    assert keys(objects[1]) == [pytest.approx((10.0, 0.25))]
+
+
+def test_delete_lattice_modifier(context, props, managed_scene):
+    objects = managed_scene(2)
+    bpy.ops.object.lattice_add_to_all()
+    lattice = bpy.data.objects["Lattice 1"]
+
+    assert bpy.ops.object.delete_lattice_modifier(modifier_name="Lattice 1") == {'FINISHED'}
+    assert all("Lattice 1" not in obj.modifiers for obj in objects)
+    assert len(props.lattice_data) == 0
+    # The lattice object itself stays
+    assert bpy.data.objects.get("Lattice 1") is lattice
+
+
+def test_bulk_operators_act_on_managed_objects(context, props, managed_scene):
+    objects = managed_scene(2)
+    bpy.ops.object.lattice_add_to_all()
+    bpy.ops.object.lattice_add_to_all()
+    assert [len(obj.modifiers) for obj in objects] == [2, 2]
+
+    select(context, objects[:1])
+    assert bpy.ops.object.delete_all_lattice_modifiers() == {'FINISHED'}
+    assert [len(obj.modifiers) for obj in objects] == [0, 2]
+
+    assert bpy.ops.object.apply_all_lattice_modifiers(scope='MANAGED') == {'FINISHED'}
+    assert [len(obj.modifiers) for obj in objects] == [0, 0]
+    assert len(props.lattice_data) == 0
+
+
+def test_presets_through_operators(context, props, managed_scene):
+    objects = managed_scene(2)
+    bpy.ops.object.lattice_add_to_all()
+    props.lattice_data[0].strength = 0.75
+    assert bpy.ops.object.lattice_preset_save(preset_name="Strong") == {'FINISHED'}
+
+    props.lattice_data[0].strength = 0.0
+    assert bpy.ops.object.lattice_preset_apply(preset_name="Strong") == {'FINISHED'}
+    assert props.lattice_data[0].strength == pytest.approx(0.75)
+    assert [obj.modifiers["Lattice 1"].strength for obj in objects] == pytest.approx([0.75, 0.75])
+
+    assert bpy.ops.object.lattice_preset_apply(preset_name="Missing") == {'CANCELLED'}
+    bpy.ops.object.lattice_preset_remove(preset_name="Strong")
+    assert len(props.strength_presets) == 0
+
+
+def test_snapshot_operators(context, props, managed_scene):
+    managed_scene(1)
+    bpy.ops.object.lattice_add_to_all()
+    lattice = bpy.data.objects["Lattice 1"]
+    rest = np.empty(len(lattice.data.points) * 3, dtype=np.float32)
+    lattice.data.points.foreach_get("co_deform", rest)
+
+    assert bpy.ops.object.lattice_snapshot_take(snapshot_name="") == {'CANCELLED'}
+    assert bpy.ops.object.lattice_snapshot_take(snapshot_name="Rest") == {'FINISHED'}
+    move_lattice_points(lattice, (0.0, 0.0, 2.0))
+    assert bpy.ops.object.lattice_snapshot_restore(lattice_name="Lattice 1", snapshot_name="Rest") == {'FINISHED'}
+    points = np.empty_like(rest)
+    lattice.data.points.foreach_get("co_deform", points)
+    assert points == pytest.approx(rest)
+
+    bpy.ops.object.lattice_snapshot_remove(lattice_name="Lattice 1", snapshot_name="Rest")
+    assert len(props.lattice_data[0].snapshots) == 0
+    assert bpy.ops.object.lattice_snapshot_restore(lattice_name="Lattice 1", snapshot_name="Rest") == {'CANCELLED'}
+
+
+def test_repair_registry_operator(context, managed_scene):
+    objects = managed_scene(2)
+    bpy.ops.object.lattice_add_to_all()
+    lattice = bpy.data.objects["Lattice 1"]
+    lattice.lattice_registry.members.clear()
+
+    assert bpy.ops.object.lattice_repair_registry() == {'FINISHED'}
+    assert [ref.object for ref in lattice.lattice_registry.members] == objects
+
+
+def test_bake_toggle_and_free_cache(context, lm, props, managed_scene, tmp_path):
+    objects = managed_scene(2)
+    bpy.ops.object.lattice_add_to_all()
+    set_strength(context, lm, props, 1.0)
+    lattice = bpy.data.objects["Lattice 1"]
+    move_lattice_points(lattice, (0.0, 0.0, 1.0))
+    directory = str(tmp_path) + os.sep
+
+    result = bpy.ops.object.lattice_bake_cache(lattice_name="Lattice 1", frame_start=1, frame_end=4,
+                                               directory=directory, batch_size=1)
+    assert result == {'FINISHED'}
+    assert props.lattice_data[0].bake_state == 'CACHE'
+    assert len(os.listdir(tmp_path)) == 2
+    for obj in objects:
+        assert not obj.modifiers["Lattice 1"].show_viewport
+        assert obj.modifiers["Lattice 1 Cache"].type == 'MESH_CACHE'
+
+    bpy.ops.object.lattice_cache_toggle(lattice_name="Lattice 1", use_cache=False)
+    assert props.lattice_data[0].bake_state == 'LIVE'
+    assert all(obj.modifiers["Lattice 1"].show_viewport for obj in objects)
+
+    bpy.ops.object.lattice_cache_free(lattice_name="Lattice 1")
+    assert props.lattice_data[0].bake_state == 'NONE'
+    assert os.listdir(tmp_path) == []
+    assert all(list(obj.modifiers.keys()) == ["Lattice 1"] for obj in objects)
+
+
+@pytest.mark.parametrize("batch_size", [1, 64])
+def test_bake_gives_objects_with_similar_names_their_own_files(context, props, make_cube, tmp_path, batch_size):
+    objects = [make_cube("Cube.001"), make_cube("Cube_001", (3.0, 0.0, 0.0))]
+    select(context, objects)
+    bpy.ops.object.lattice_manage_selected()
+    bpy.ops.object.lattice_add_to_all()
+
+    bpy.ops.object.lattice_bake_cache(lattice_name="Lattice 1", frame_start=1, frame_end=2,
+                                      directory=str(tmp_path) + os.sep, batch_size=batch_size)
+    filepaths = {obj.modifiers["Lattice 1 Cache"].filepath for obj in objects}
+    assert len(filepaths) == 2
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(filepath) for filepath in filepaths)
+
+
+def test_bake_rejects_reversed_frame_range(context, managed_scene, tmp_path):
+    managed_scene(1)
+    bpy.ops.object.lattice_add_to_all()
+    result = bpy.ops.object.lattice_bake_cache(lattice_name="Lattice 1", frame_start=5, frame_end=1,
+                                               directory=str(tmp_path))
+    assert result == {'CANCELLED'}
+    assert os.listdir(tmp_path) == []
+
+
+@pytest.mark.stand_in
+def test_cluster_operator_reports_the_timing(context, managed_scene):
+    managed_scene(3)
+    bpy.ops.object.lattice_add_by_cluster(method='KMEANS', cluster_count=2, max_objects=0)
+    [(level, message)] = bpy.last_reports
+    assert level == {'INFO'}
+    assert message.startswith("Added 2 lattices to 3 managed objects in ") and message.endswith(" ms.")
@@ -0,0 +1,130 @@
+""" Complexity bounds of the hot paths, measured with the stand-in's counters.
+
+Each test builds the same setup at two scene sizes and checks that the work counted by bpy.stats
+either stays the same or grows with the objects actually involved, never with the size of the scene.
+"""
+
+import bpy
+import pytest
+
+pytestmark = pytest.mark.stand_in
+
+SCENE_SIZES = (10, 200)
+
+
+def new_file(lm):
+    """ Starts over in an empty file, like loading one in Blender. """
+    bpy.reset()
+    lm.register_handlers()
+    lm.invalidate_lattice_index()
+    lm.invalidate_lattice_registry()
+
+
+def scene_with_lattice(context, lm, make_cube, managed_count, affected_count, unmanaged_count=0):
+    """ Manages managed_count cubes and deforms the first affected_count of them with "Lattice 1". """
+    objects = [make_cube(f"Cube {i}", (i * 3.0, 0.0, 0.0)) for i in range(managed_count)]
+    for i in range(unmanaged_count):
+        make_cube(f"Other {i}", (i * 3.0, 10.0, 0.0))
+    for obj in context.scene.objects:
+        obj.select_set(obj in objects)
+    bpy.ops.object.lattice_manage_selected()
+    lm.add_lattice_to_objects(context, objects[:affected_count])
+    lm.update_lattice_data(context)
+    bpy.flush_depsgraph()
+    return objects
+
+
+def draw_panel(context, lm):
+    panel = lm.OBJECT_PT_LatticeManager()
+    panel.draw(context)
+    return panel.layout
+
+
+def counted(function, *args, **kwargs):
+    bpy.reset_stats()
+    function(*args, **kwargs)
+    return dict(bpy.stats)
+
+
+def test_panel_redraw_does_not_read_modifier_stacks(context, lm, make_cube):
+    costs = []
+    for size in SCENE_SIZES:
+        new_file(lm)
+        scene_with_lattice(bpy.context, lm, make_cube, size, size)
+        draw_panel(bpy.context, lm)
+        costs.append(counted(draw_panel, bpy.context, lm))
+    assert [cost["modifier_reads"] for cost in costs] == [0, 0]
+
+
+def test_lattice_list_draws_only_visible_rows(context, lm, make_cube):
+    rows = []
+    for size in SCENE_SIZES:
+        new_file(lm)
+        objects = scene_with_lattice(bpy.context, lm, make_cube, size, 0)
+        for obj in objects:
+            lm.add_lattice_to_objects(bpy.context, [obj])
+        lm.update_lattice_data(bpy.context)
+        rows.append(counted(draw_panel, bpy.context, lm)["list_rows_drawn"])
+    assert rows == [lm.LATTICE_LIST_ROWS] * 2
+
+
+@pytest.mark.parametrize("operator", ["select_objects_with_modifier", "deselect_objects_with_modifier"])
+def test_selecting_reads_only_the_affected_objects(context, lm, make_cube, operator):
+    costs = []
+    for size in SCENE_SIZES:
+        new_file(lm)
+        scene_with_lattice(bpy.context, lm, make_cube, size, 5, unmanaged_count=size)
+        costs.append(counted(getattr(bpy.ops.object, operator), "EXEC_DEFAULT", modifier_name="Lattice 1"))
+    assert costs[0]["modifier_reads"] == costs[1]["modifier_reads"] <= 5
+
+
+def test_strength_flush_reads_no_modifier_stacks(context, lm, make_cube):
+    costs = []
+    for size in SCENE_SIZES:
+        new_file(lm)
+        objects = scene_with_lattice(bpy.context, lm, make_cube, size, size)
+        lm.gather_lattice_modifiers(bpy.context)
+        costs.append(counted(lm.update_strength, bpy.context, "Lattice 1", 0.5, True))
+        assert all(obj.modifiers["Lattice 1"].strength == 0.5 for obj in objects)
+    assert [cost["modifier_reads"] for cost in costs] == [0, 0]
+
+
+def test_depsgraph_update_reads_only_the_updated_objects(context, lm, make_cube):
+    costs = []
+    for size in SCENE_SIZES:
+        new_file(lm)
+        objects = scene_with_lattice(bpy.context, lm, make_cube, size, size)
+        lm.gather_lattice_modifiers(bpy.context)
+        objects[0].location = (0.0, 0.0, 1.0)
+        costs.append(counted(bpy.flush_depsgraph))
+        # A transform does not change the lattice modifiers, the index stays valid
+        assert lm._lattice_index["valid"]
+    assert costs[0]["modifier_reads"] == costs[1]["modifier_reads"] <= 1
+
+
+def test_apply_batch_evaluates_shared_meshes_once(context, lm, make_cube):
+    meshes = []
+    for size in SCENE_SIZES:
+        new_file(lm)
+        first = make_cube("Cube 0")
+        objects = [first] + [make_cube(f"Cube {i}", (0.0, 0.0, 0.0), mesh=first.data) for i in range(1, size)]
+        lm.add_lattice_to_objects(bpy.context, objects)
+        before = len(bpy.data.meshes)
+        applied, failed = lm.apply_lattice_modifier_batch(bpy.context, objects, "Lattice 1", shared=True)
+        assert len(applied) == size and not failed
+        meshes.append(len(bpy.data.meshes) - before)
+    # The shared mesh is replaced by one result, however many objects use it
+    assert meshes == [0, 0]
+
+
+@pytest.mark.parametrize("operator", ["delete_lattice_modifier", "apply_lattice_modifier"])
+def test_single_lattice_operators_read_each_stack_once(context, lm, make_cube, monkeypatch, operator):
+    costs = []
+    for size in SCENE_SIZES:
+        new_file(lm)
+        scene_with_lattice(bpy.context, lm, make_cube, size, 5, unmanaged_count=size)
+        with monkeypatch.context() as patch:
+            # Only the operator's own lookups, not the lattice_data refresh that follows them
+            patch.setattr(lm, "update_lattice_data", lambda context: None)
+            costs.append(counted(getattr(bpy.ops.object, operator), "EXEC_DEFAULT", modifier_name="Lattice 1"))
+    assert costs[0]["modifier_reads"] == costs[1]["modifier_reads"] == 5
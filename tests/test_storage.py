@@ -0,0 +1,105 @@
+import os
+
+import numpy as np
+import pytest
+
+from conftest import addon_module
+
+pointcache = addon_module("pointcache")
+
+
+@pytest.fixture
+def snapshots():
+    """ A fresh copy of the snapshots module, its store is module state. """
+    return addon_module("snapshots")
+
+
+def points(value, count=100):
+    return np.full((count, 3), value, dtype=np.float32)
+
+
+def test_put_copies_and_get_returns_the_snapshot(snapshots):
+    source = points(1.0)
+    snapshots.put("a/Rest", source)
+    source[:] = 5.0
+    assert snapshots.get("a/Rest") == pytest.approx(points(1.0))
+    assert snapshots.get("a/Missing") is None
+    assert snapshots.memory_usage() == source.nbytes
+
+    snapshots.remove("a/Rest")
+    assert snapshots.get("a/Rest") is None
+    assert snapshots.memory_usage() == 0
+
+
+def test_eviction_keeps_the_most_recently_used(snapshots):
+    snapshots.set_memory_limit(points(0).nbytes * 2)
+    snapshots.put("a", points(1))
+    snapshots.put("b", points(2))
+    snapshots.get("a")
+    snapshots.put("c", points(3))
+
+    # Without a sidecar the least recently used snapshot is lost
+    assert snapshots.get("b") is None
+    assert snapshots.get("a") is not None and snapshots.get("c") is not None
+    assert snapshots.memory_usage() == points(0).nbytes * 2
+
+
+def test_evicted_snapshots_spill_to_the_sidecar(snapshots, tmp_path):
+    sidecar = snapshots.sidecar_path(str(tmp_path / "shot.blend"))
+    assert sidecar == str(tmp_path / "shot") + snapshots.SIDECAR_SUFFIX
+    snapshots.save(sidecar, [])
+    snapshots.set_memory_limit(points(0).nbytes)
+
+    snapshots.put("a", points(1))
+    snapshots.put("b", points(2))
+    assert snapshots.memory_usage() == points(0).nbytes
+    # Read back from the sidecar, which evicts "b" in turn
+    assert snapshots.get("a") == pytest.approx(points(1))
+    assert snapshots.get("b") == pytest.approx(points(2))
+
+
+def test_save_rewrites_the_sidecar_with_the_given_keys(snapshots, tmp_path):
+    sidecar = str(tmp_path / "shot") + snapshots.SIDECAR_SUFFIX
+    snapshots.put("a", points(1))
+    snapshots.put("b", points(2))
+    assert snapshots.save(sidecar, ["a", "missing"]) == 1
+
+    with np.load(sidecar) as data:
+        assert data.files == ["a"]
+    snapshots.clear()
+    assert snapshots.get("a") == pytest.approx(points(1))
+    assert snapshots.get("b") is None
+
+
+def test_set_sidecar_drops_the_previous_files_snapshots(snapshots, tmp_path):
+    snapshots.put("a", points(1))
+    snapshots.set_sidecar(str(tmp_path / "other.npz"))
+    assert snapshots.get("a") is None
+    assert snapshots.memory_usage() == 0
+
+
+def test_blend(snapshots):
+    assert snapshots.blend(points(0), points(2), 0.25) == pytest.approx(points(0.5))
+    target = points(2)
+    assert snapshots.blend(points(0), target, 1.0) is target
+
+
+def test_pc2_round_trip(tmp_path):
+    filepath = str(tmp_path / "cache" / "Cube.pc2")
+    positions = pointcache.create_pc2(filepath, 8, 3, start_frame=1.0)
+    positions[:] = np.arange(3 * 8 * 3, dtype=np.float32).reshape(3, 8, 3)
+    positions.flush()
+    del positions
+
+    assert os.path.getsize(filepath) == pointcache.HEADER.itemsize + 3 * 8 * 3 * 4
+    header, read = pointcache.read_pc2(filepath)
+    assert header["signature"] == pointcache.SIGNATURE
+    assert (int(header["points"]), int(header["samples"]), float(header["start_frame"])) == (8, 3, 1.0)
+    assert np.array_equal(read, np.arange(72, dtype=np.float32).reshape(3, 8, 3))
+
+
+def test_read_pc2_rejects_other_files(tmp_path):
+    filepath = tmp_path / "not_a_cache.pc2"
+    filepath.write_bytes(b"\0" * 64)
+    with pytest.raises(ValueError):
+        pointcache.read_pc2(str(filepath))